@@ -0,0 +1,14 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: __main__
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Run the command-line interface with ``python -m aliqat``.
+"""
+
+import sys
+from .cli import main
+
+sys.exit(main())
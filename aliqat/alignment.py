@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: alignment
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+What if the fields have just moved over a little?
+
+Conflating records position by position smears every column after a field
+that's been padded (or shifted) by a character or two.  Aligning each record
+with the graph first (by an edit distance in which a character costs nothing
+where its class is already in the graph's mask) lines the fields back up.
+A record's character that doesn't line up with any of the graph's positions
+becomes a new position (which was empty in every earlier record), and the
+graph's positions that don't line up with any of the record's characters
+are empty in the record.
+
+The alignment only considers the cells of the edit distance matrix that lie
+within a band (of a given width, on either side) around the diagonal, so
+its cost is proportional to the length of the records times the width of
+the band (plus the difference between the record's length and the graph's).
+A batch of records is aligned a group of records of about the same length at
+a time, and each group a row of the matrix (for every record) at a time, so
+a record of an odd length doesn't widen the band for the rest.
+"""
+
+from array import array
+from typing import Iterable, List, Tuple
+import numpy as np
+from .graphs import CharClass, Graph, NO_LITERAL, _chunks, encode_ragged
+from .instruments import ACTIVE as _INSTRUMENTED, count as _count, stage
+
+_FIT = 0  #: the cost of a character that fits the graph's position
+#: the cost of a character whose class fits, but which differs from the
+#: position's literal
+_LITERAL = 1
+_INFINITY = 1 << 40  #: the cost of the cells outside the band
+
+# the moves through the edit distance matrix
+_DIAGONAL, _UP, _LEFT = 0, 1, 2
+
+
+def _moves(graph: Graph,
+           codes: np.ndarray,
+           lengths: np.ndarray,
+           band: int) -> Tuple[np.ndarray, int]:
+    """
+    Fill in the banded edit distance matrix of each record in a batch.
+
+    :param graph: the graph
+    :param codes: the records' code points (one row per record)
+    :param lengths: the records' lengths
+    :param band: the width of the band (on either side of the diagonal)
+    :return: a tuple containing the best move into each cell (one matrix
+        per record, with a row for each of the longest record's characters
+        and a column for each diagonal in the band) and the diagonal of the
+        first column
+    """
+    masks, literals = graph._views()
+    m = len(masks)
+    # (A sentinel at the end stands for the positions beyond the graph, so
+    # there's always something to look up.)
+    masks = np.append(masks, masks.dtype.type(0))
+    literals = np.append(literals, np.uint16(NO_LITERAL))
+    classes = graph._classifier.classify_codes(codes)
+    # Every record's last cell must be within the band.
+    lo = min(0, m - int(lengths.max())) - band
+    hi = max(0, m - int(lengths.min())) + band
+    # The column for each diagonal (and the graph positions in each row).
+    diagonals = np.arange(lo, hi + 1)
+    # A character whose class doesn't fit (or a gap) costs more than every
+    # literal that differs, so the literals only break ties.
+    misfit = codes.shape[1] + m + 1
+    # The cost of skipping each of the graph's positions.
+    skip = np.where(
+        masks & masks.dtype.type(CharClass.EMPTY), _FIT, misfit
+    ).astype(np.int64)
+    moves = np.empty(
+        (len(codes), codes.shape[1] + 1, len(diagonals)), dtype=np.int8)
+    # The first row skips the graph's first positions.
+    j = diagonals
+    inside = (j >= 0) & (j <= m)
+    before = np.concatenate(([0], np.cumsum(skip[:m])))
+    row = np.where(inside, before[np.clip(j, 0, m)], _INFINITY)
+    row = np.broadcast_to(row, (len(codes), len(diagonals))).copy()
+    moves[:, 0] = _LEFT
+    for i in range(1, codes.shape[1] + 1):
+        j = i + diagonals  # the graph position after each cell
+        inside = (j >= 0) & (j <= m)
+        # Lining the record's character up with the graph's position...
+        p = np.clip(j - 1, 0, m)
+        literal = literals[p]
+        sub = np.where(
+            (classes[:, i - 1, np.newaxis] & ~masks[p]) != 0,
+            misfit,
+            np.where(
+                (literal != NO_LITERAL) &
+                (codes[:, i - 1, np.newaxis] != literal),
+                _LITERAL, _FIT))
+        diagonal = np.where(j >= 1, row + sub, _INFINITY)
+        # ...or making it a new position.
+        up = np.full_like(row, _INFINITY)
+        up[:, :-1] = row[:, 1:] + misfit
+        best = np.minimum(diagonal, up)
+        move = np.where(diagonal <= up, _DIAGONAL, _UP).astype(np.int8)
+        # Skipping the graph's positions is a running minimum along the row.
+        gap = np.where(inside & (j >= 1), skip[p], _INFINITY)
+        gap[0] = 0
+        total = np.cumsum(gap)
+        row = total + np.minimum.accumulate(best - total, axis=1)
+        row = np.minimum(np.where(inside, row, _INFINITY), _INFINITY)
+        moves[:, i] = np.where(row < best, _LEFT, move)
+    return moves, lo
+
+
+def _trace(moves: np.ndarray,
+           lengths: np.ndarray,
+           m: int,
+           lo: int) -> Tuple[np.ndarray, Tuple[np.ndarray, ...]]:
+    """
+    Follow the best moves back from each record's last cell.
+
+    :param moves: the best moves (see :py:func:`_moves`)
+    :param lengths: the records' lengths
+    :param m: the number of positions in the graph
+    :param lo: the diagonal of the first column
+    :return: a tuple containing the record character lined up with each of
+        the graph's positions (one row per record, with -1 where there
+        isn't one) and the record, the gap (the graph position it comes
+        before) and the character of each new position
+    """
+    n = len(lengths)
+    aligned = np.full((n, m), -1, dtype=np.int64)
+    inserted: List[Tuple[np.ndarray, ...]] = []
+    r = np.arange(n)
+    i = lengths.astype(np.int64)
+    j = np.full(n, m, dtype=np.int64)
+    while len(r):
+        move = moves[r, i, j - i - lo]
+        d = move == _DIAGONAL
+        aligned[r[d], j[d] - 1] = i[d] - 1
+        u = move == _UP
+        inserted.append((r[u], j[u], i[u] - 1))
+        i = i - (d | u)
+        j = j - (d | (move == _LEFT))
+        going = (i > 0) | (j > 0)
+        r, i, j = r[going], i[going], j[going]
+    if not inserted:
+        return aligned, tuple(np.zeros(0, dtype=np.int64) for _ in range(3))
+    return aligned, tuple(np.concatenate(a) for a in zip(*inserted))
+
+
+def _align(graph: Graph,
+           codes: np.ndarray,
+           lengths: np.ndarray,
+           band: int) -> Tuple[np.ndarray, Tuple[np.ndarray, ...]]:
+    """
+    Line a batch of records up with a graph, a group of records whose lengths
+    are within the band's width of each other at a time.
+
+    :param graph: the graph
+    :param codes: the records' code points (one row per record)
+    :param lengths: the records' lengths
+    :param band: the width of the band (on either side of the diagonal)
+    :return: the alignments (see :py:func:`_trace`)
+    """
+    m = len(graph)
+    aligned = np.full((len(lengths), m), -1, dtype=np.int64)
+    inserted: List[Tuple[np.ndarray, ...]] = []
+    order = np.argsort(lengths, kind='stable')
+    ordered = lengths[order]
+    start = 0
+    while start < len(order):
+        stop = int(np.searchsorted(ordered, ordered[start] + band, 'right'))
+        group = order[start:stop]
+        _lengths = lengths[group]
+        moves, lo = _moves(
+            graph, codes[group, :int(_lengths.max())], _lengths, band)
+        _aligned, (rows, gaps, chars) = _trace(moves, _lengths, m, lo)
+        del moves
+        aligned[group] = _aligned
+        inserted.append((group[rows], gaps, chars))
+        start = stop
+    if not inserted:
+        return aligned, tuple(np.zeros(0, dtype=np.int64) for _ in range(3))
+    return aligned, tuple(np.concatenate(a) for a in zip(*inserted))
+
+
+def align(graph: Graph,
+          record: str or bytes,
+          band: int = 4) -> Tuple[int, ...]:
+    """
+    Line a record up with a graph.
+
+    :param graph: the graph
+    :param record: the record
+    :param band: the width of the band (on either side of the diagonal)
+    :return: the graph position each of the record's characters is lined up
+        with (or -1, for the ones that aren't lined up with any of them)
+    :raises ValueError: if the band's width is negative
+    """
+    if band < 0:
+        raise ValueError('The band must not be negative.')
+    codes, lengths = encode_ragged([record])
+    aligned, _ = _align(graph, codes, lengths, band)
+    positions = np.full(len(record), -1, dtype=np.int64)
+    found = aligned[0] >= 0
+    positions[aligned[0][found]] = np.flatnonzero(found)
+    return tuple(positions.tolist())
+
+
+def conflate_aligned(graph: Graph,
+                     records: Iterable[str or bytes],
+                     band: int = 4,
+                     batch_size: int = 1000):
+    """
+    Conflate records into a graph, lining each one up with the graph first.
+    The records in a batch are all lined up with the graph as it was before
+    the batch.
+
+    :param graph: the graph
+    :param records: the records
+    :param band: the width of the band (on either side of the diagonal)
+    :param batch_size: the number of records lined up at once
+    :raises ValueError: if the band's width is negative
+    """
+    if band < 0:
+        raise ValueError('The band must not be negative.')
+    for batch in _chunks(records, batch_size):
+        with stage('encode'):
+            codes, lengths = encode_ragged(batch)
+        with stage('align'):
+            aligned, (rows, gaps, chars) = _align(
+                graph, codes, lengths, band)
+        with stage('conflate'):
+            _conflate(graph, codes, aligned, rows, gaps, chars)
+
+
+def _conflate(graph: Graph,
+              codes: np.ndarray,
+              aligned: np.ndarray,
+              rows: np.ndarray,
+              gaps: np.ndarray,
+              chars: np.ndarray):
+    """
+    Conflate a batch of aligned records into a graph.
+
+    :param graph: the graph
+    :param codes: the records' code points (one row per record)
+    :param aligned: the character lined up with each of the graph's
+        positions (see :py:func:`_trace`)
+    :param rows: the record of each new position
+    :param gaps: the gap in which each new position goes
+    :param chars: the character of each new position
+    """
+    n, m = aligned.shape
+    if _INSTRUMENTED:
+        _count('records', n)
+    # Each record's new positions in a gap are its consecutive characters, so
+    # they're numbered from the first of them...
+    first = np.full((n, m + 1), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first, (rows, gaps), chars)
+    rank = chars - first[rows, gaps]
+    # ...and each gap gets as many new positions as any record needs.
+    widths = np.zeros(m + 1, dtype=np.int64)
+    np.maximum.at(widths, gaps, rank + 1)
+    shift = np.cumsum(widths)
+    old = np.arange(m) + shift[:m]  # where the graph's positions go
+    new = gaps + shift[gaps] - widths[gaps] + rank  # the new positions
+    width = m + int(shift[m])
+    # Lay the records out the way the graph will be laid out.
+    laid = np.zeros((n, width), dtype=codes.dtype)
+    present = np.zeros((n, width), dtype=bool)
+    r, j = np.nonzero(aligned >= 0)
+    laid[r, old[j]] = codes[r, aligned[r, j]]
+    present[r, old[j]] = True
+    laid[rows, new] = codes[rows, chars]
+    present[rows, new] = True
+    masks, literals = graph._views()
+    _masks = np.full(width, CharClass.EMPTY, dtype=masks.dtype)
+    _literals = np.full(width, NO_LITERAL, dtype=np.uint16)
+    _masks[old], _literals[old] = masks, literals
+    del masks, literals  # (The graph's buffers are about to be replaced.)
+    classes = graph._classifier.classify_codes(laid)
+    classes[~present] = CharClass.EMPTY
+    _masks |= np.bitwise_or.reduce(classes, axis=0)
+    _literals[~(present & (laid == _literals)).all(axis=0)] = NO_LITERAL
+    graph._masks = array(graph._masks.typecode, _masks.tobytes())
+    graph._literals = array('H', _literals.tobytes())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: cli
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Type it in.
+"""
+
+import argparse
+import sys
+from typing import List
+from .snapshots import merge_snapshots
+
+
+def _merge(args: argparse.Namespace) -> int:
+    """
+    Merge snapshot files.
+
+    :param args: the parsed arguments
+    :return: the exit code
+    """
+    count = merge_snapshots(args.inputs, args.output)
+    print('Merged {} graphs from {} files into {}.'.format(
+        count, len(args.inputs), args.output), file=sys.stderr)
+    return 0
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Run the command-line interface.
+
+    :param argv: the command-line arguments
+    :return: the exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='aliqat', description='smart ALI parsing tools')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+    merge = commands.add_parser(
+        'merge', help='merge graph snapshot files',
+        description='Merge graph snapshot files, conflating the graphs that '
+                    'have the same key.')
+    merge.add_argument('inputs', nargs='+', help='the snapshot files')
+    merge.add_argument(
+        '-o', '--output', required=True,
+        help='the merged snapshot file (which may be one of the inputs)')
+    merge.set_defaults(run=_merge)
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as ex:
+        print('{}: error: {}'.format(parser.prog, ex), file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: clustering
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Which of these records belong together?
+
+A clusterer sorts unlabelled records into families, each with a graph
+learned from its members, so that a feed that mixes several layouts yields a
+graph for each layout (rather than one that accepts anything).
+
+Finding a record's family doesn't mean comparing it with every family.  The
+record's character classes are cut into bands of a few positions and each
+band (with its position) is looked up in an index of the bands the families'
+members have had.  Only the families that share the most bands with the
+record are compared with it.  The index only remembers the families that
+have had each band most recently, so a band that most families share (a
+common prefix, say) costs no more to look up than any other.
+
+.. code-block:: python
+
+    clusterer = Clusterer(max_distance=0.1)
+    for batch in feed:
+        clusterer.add_many(batch)
+    for family in clusterer.families:
+        print(family.records, family.graph)
+"""
+
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from .graphs import (
+    CharClass, Classifier, DEFAULT_CLASSIFIER, Graph, encode_ragged
+)
+from .instruments import stage
+
+# a band of a record's character classes (and the index of the band)
+_Key = Tuple[int, bytes]
+
+
+class Family(object):
+    """
+    A family is a group of records that share a layout.
+    """
+    __slots__ = ('index', 'graph', 'records')
+
+    def __init__(self, index: int, graph: Graph):
+        """
+
+        :param index: the family's position among the clusterer's families
+        :param graph: the graph learned from the family's first record
+        """
+        self.index: int = index  #: the family's position
+        self.graph: Graph = graph  #: the graph learned from the members
+        self.records: int = 1  #: the number of members
+
+
+class Clusterer(object):
+    """
+    A clusterer assigns each record it's given to the family whose graph it
+    fits best (widening the graph to take it in) or, if it doesn't fit any of
+    them well enough, starts a new family.
+
+    A record's distance from a family is the fraction of its positions (or
+    the family graph's, if there are more of them) at which its character
+    classes aren't already in the graph.  Literals don't count, since a
+    family learned from a single record holds nothing else.
+    """
+    def __init__(self,
+                 max_distance: float = 0.1,
+                 band_width: int = 8,
+                 probes: int = 8,
+                 postings: int = 32,
+                 classifier: Classifier = None):
+        """
+
+        :param max_distance: the greatest distance at which a record joins a
+            family
+        :param band_width: the number of positions in each band
+        :param probes: the greatest number of families a record is compared
+            with
+        :param postings: the greatest number of families the index remembers
+            for each band
+        :param classifier: the classifier used to classify characters
+        :raises ValueError: if the band width, the number of probes or the
+            number of postings is less than 1
+        """
+        if band_width < 1:
+            raise ValueError('The band width must be at least 1.')
+        if probes < 1:
+            raise ValueError('At least one family must be probed.')
+        if postings < 1:
+            raise ValueError('At least one family must be remembered.')
+        self._max_distance = max_distance
+        self._band_width = band_width
+        self._probes = probes
+        self._postings = postings
+        self._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        self._families: List[Family] = []
+        # the families whose members have had each band (most recently last)
+        self._index: Dict[_Key, 'OrderedDict[int, None]'] = {}
+
+    def __len__(self):
+        return len(self._families)
+
+    @property
+    def families(self) -> List[Family]:
+        """
+        Get the families.
+
+        :return: the families (in the order they were started)
+        """
+        return self._families
+
+    def add(self, record: str or bytes) -> Family:
+        """
+        Assign a record to a family.
+
+        :param record: the record
+        :return: the record's family
+        """
+        return self.add_many([record])[0]
+
+    def add_many(self, records: Iterable[str or bytes]) -> List[Family]:
+        """
+        Assign a batch of records to families (in order, so a family started
+        by one record may take in the next).
+
+        :param records: the records
+        :return: each record's family
+        """
+        with stage('encode'):
+            codes, lengths = encode_ragged(records)
+        with stage('cluster'):
+            classes = self._classifier.classify_codes(codes)
+            return [
+                self._assign(codes[i], classes[i], n)
+                for i, n in enumerate(lengths.tolist())
+            ]
+
+    def _keys(self, classes: np.ndarray) -> List[_Key]:
+        """
+        Cut a record's character classes into bands.
+
+        :param classes: the record's character classes
+        :return: the bands
+        """
+        w = self._band_width
+        # (Empty records have a band of their own.)
+        return [
+            (b, classes[s:s + w].tobytes())
+            for b, s in enumerate(range(0, max(len(classes), 1), w))
+        ]
+
+    def _assign(self,
+                codes: np.ndarray,
+                classes: np.ndarray,
+                n: int) -> Family:
+        """
+        Assign a record to a family.
+
+        :param codes: the record's code points (which may be padded)
+        :param classes: the record's character classes (which may be padded)
+        :param n: the record's length
+        :return: the record's family
+        """
+        codes, classes = codes[:n], classes[:n]
+        keys = self._keys(classes)
+        votes = Counter(
+            f for key in keys for f in self._index.get(key, ()))
+        best, distance = None, None
+        for f, _ in votes.most_common(self._probes):
+            d = self._distance(self._families[f].graph, classes)
+            if distance is None or d < distance:
+                best, distance = self._families[f], d
+        if best is None or distance > self._max_distance:
+            best = Family(
+                len(self._families),
+                Graph._from_codes(codes, classifier=self._classifier))
+            self._families.append(best)
+        else:
+            best.graph._conflate_codes(
+                codes[np.newaxis],
+                None if n == len(best.graph) else np.array([n]))
+            best.records += 1
+        for key in keys:
+            families = self._index.get(key)
+            if families is None:
+                families = self._index[key] = OrderedDict()
+            elif best.index in families:
+                families.move_to_end(best.index)
+                continue
+            families[best.index] = None
+            if len(families) > self._postings:
+                families.popitem(last=False)
+        return best
+
+    @staticmethod
+    def _distance(graph: Graph, classes: np.ndarray) -> float:
+        """
+        Measure how far a record is from a family's graph.
+
+        :param graph: the family's graph
+        :param classes: the record's character classes
+        :return: the fraction of the positions at which the record doesn't
+            fit
+        """
+        masks = graph._views()[0]
+        n, m = len(classes), len(masks)
+        k = min(n, m)
+        bad = int(np.count_nonzero(classes[:k] & ~masks[:k]))
+        # The positions beyond the end of the record are empty, and the ones
+        # beyond the end of the graph were empty in every member.
+        bad += int(np.count_nonzero(
+            (masks[k:] & masks.dtype.type(CharClass.EMPTY)) == 0))
+        bad += n - k
+        return bad / max(n, m, 1)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: counting
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Graphs that remember how often they've seen things.
+"""
+
+from typing import Iterable, Tuple
+import numpy as np
+from .graphs import (
+    CharClass, Classifier, DEFAULT_CLASSIFIER, Graph, NO_LITERAL,
+    encode_records
+)
+
+#: the number of class bits (unless the classifier has a lattice)
+CLASS_BITS: int = CharClass.ANY.bit_length()
+LITERALS: int = 0x100  #: the number of code points counted as literals
+COUNTS: np.dtype = np.dtype(np.int64)  #: the type of the counts
+
+
+class CountingGraph(object):
+    """
+    A counting graph keeps, for each position, the number of records in which
+    each character class bit was seen and the number of times each literal
+    value (among the first 256 code points) was seen.  An ordinary
+    :py:class:`Graph` can be derived from the counts at any support
+    threshold, so rare (noisy) classes can be filtered out without learning
+    the records again.
+
+    Counting a small batch only touches the literal counts of the code
+    points that are in it, so keeping a graph current a few records at a
+    time costs time in proportion to the records (not the counts).
+    """
+    __slots__ = ('_width', '_total', '_classes', '_literals', '_classifier')
+
+    def __init__(self, width: int, classifier: Classifier = None):
+        """
+
+        :param width: the length of the records
+        :param classifier: the classifier used to classify characters
+        """
+        self._width = width
+        self._total = 0
+        self._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        self._classes = np.zeros(
+            (width, self._classifier.bits), dtype=COUNTS)
+        self._literals = np.zeros((width, LITERALS), dtype=COUNTS)
+
+    def __len__(self):
+        return self._width
+
+    @property
+    def total(self) -> int:
+        """
+        Get the number of records counted.
+
+        :return: the number of records
+        """
+        return self._total
+
+    @property
+    def class_counts(self) -> np.ndarray:
+        """
+        Get the class counts.
+
+        :return: an array with one row per position and one column per
+            character class bit (:py:attr:`CharClass.EMPTY` first)
+        """
+        return self._classes.copy()
+
+    @property
+    def literal_counts(self) -> np.ndarray:
+        """
+        Get the literal counts.
+
+        :return: an array with one row per position and one column per code
+            point
+        """
+        return self._literals.copy()
+
+    def update(self,
+               records: Iterable[str or bytes],
+               weights: Iterable[int] = None):
+        """
+        Count a batch of records.
+
+        :param records: the records (each must be as long as this graph)
+        :param weights: the number of times each record was seen (by
+            default, once apiece)
+        :raises ValueError: if a record's length doesn't match the graph's,
+            or if the number of weights doesn't match the number of records
+        """
+        self._count_codes(
+            encode_records(records, self._width),
+            np.asarray(list(weights), dtype=np.int64)
+            if weights is not None else None)
+
+    def _count_codes(self, codes: np.ndarray, weights: np.ndarray = None):
+        """
+        Count a batch of records, encoded as a 2-D array of code points.
+
+        :param codes: the code points (one row per record)
+        :param weights: the number of times each record was seen
+        """
+        if codes.shape[1] != self._width:
+            raise ValueError(
+                'Every record must have a length of {}.'.format(self._width))
+        if weights is not None and len(weights) != codes.shape[0]:
+            raise ValueError('Every record must have a weight.')
+        if codes.shape[0] == 0:
+            return  # There's nothing to do.
+        masks = self._classifier.classify_codes(codes)
+        # (one row per record, position and class bit)
+        bits = (masks[..., np.newaxis] >> np.arange(
+            self._classes.shape[1], dtype=masks.dtype)) & 1
+        self._classes += (
+            bits.sum(axis=0, dtype=np.int64) if weights is None
+            else (weights @ bits.reshape(len(bits), -1)).reshape(
+                self._classes.shape)
+        )
+        # Count the literals by giving each (position, code point) pair its
+        # own bin.
+        narrow = codes < LITERALS
+        bins = (
+            np.arange(self._width, dtype=np.int64) * LITERALS + codes
+        )[narrow]
+        flat = self._literals.reshape(-1)
+        w = (
+            np.broadcast_to(weights[:, np.newaxis], codes.shape)[narrow]
+            if weights is not None else None
+        )
+        if codes.shape[0] == 1:
+            # A single record fills each bin once (at most).
+            flat[bins] += w.astype(COUNTS) if w is not None else 1
+        elif len(bins) * 8 < len(flat):
+            # Small batches only touch the bins they fill.
+            np.add.at(flat, bins, w.astype(COUNTS) if w is not None else 1)
+        else:
+            flat += np.bincount(
+                bins, weights=w, minlength=len(flat)).astype(COUNTS)
+        self._total += (
+            int(weights.sum()) if weights is not None else codes.shape[0])
+
+    def merge(self, other: 'CountingGraph'):
+        """
+        Add another counting graph's counts to this one's.
+
+        :param other: the other counting graph
+        :raises ValueError: if the other graph's length doesn't match this
+            graph's
+        """
+        if len(other) != self._width:
+            raise ValueError(
+                'The graphs must have the same length ({}).'.format(
+                    self._width))
+        self._classes += other._classes
+        self._literals += other._literals
+        self._total += other._total
+
+    def top_literals(self, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the most frequently seen literals at each position.
+
+        :param k: the number of literals to get for each position
+        :return: a tuple containing the code points and their counts (each an
+            array with one row per position and `k` columns, most frequent
+            first)
+        """
+        order = np.argsort(-self._literals, axis=1, kind='mergesort')[:, :k]
+        return order, self._literals[
+            np.arange(self._width)[:, np.newaxis], order
+        ]
+
+    def masks(self, threshold: float = 0.0) -> np.ndarray:
+        """
+        Derive the character class masks from the counts.  Classes seen in
+        fewer than the threshold fraction of the records are ignored.
+
+        :param threshold: the support threshold (a fraction of the records)
+        :return: the character class mask at each position
+        """
+        return self._masks(max(threshold * self._total, 1))
+
+    def _masks(self, support: float) -> np.ndarray:
+        """
+        Derive the character class masks from the counts.
+
+        :param support: the number of records in which a class must have
+            been seen
+        :return: the character class mask at each position
+        """
+        # Keep the class bits with enough support.
+        kept = self._classes >= support
+        return (
+            kept << np.arange(self._classes.shape[1], dtype=np.int64)
+        ).sum(axis=1).astype(self._classifier.dtype)
+
+    def graph(self, threshold: float = 0.0) -> Graph:
+        """
+        Derive a graph from the counts.  Classes (and literals) seen in fewer
+        than the threshold fraction of the records are ignored, so a
+        threshold of zero produces the same graph as conflating the records.
+        A position keeps a literal if that literal is the only value (among
+        the ones that aren't ignored) that was seen there.
+
+        :param threshold: the support threshold (a fraction of the records)
+        :return: the graph
+        :raises ValueError: if no records have been counted
+        """
+        if self._total == 0:
+            raise ValueError('No records have been counted.')
+        support = max(threshold * self._total, 1)
+        masks = self._masks(support)
+        # Find the most frequent literal and the most frequent value after
+        # it (where code points that aren't counted as literals are lumped
+        # together).
+        codes, counts = self.top_literals(2)
+        first, second = counts[:, 0], counts[:, 1]
+        others = self._total - self._literals.sum(axis=1)
+        literal = (
+            (first >= support) &
+            (np.maximum(second, others) < support) &
+            (masks == self._classifier.classify_codes(codes[:, 0]))
+        )
+        return Graph.from_arrays(
+            masks,
+            np.where(literal, codes[:, 0], NO_LITERAL),
+            classifier=self._classifier
+        )
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: dedup
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Didn't we just see this one?
+"""
+
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, Tuple
+from .counting import CountingGraph
+from .instruments import ACTIVE as _INSTRUMENTED, count as _count
+
+
+class RecordCache(object):
+    """
+    A record cache remembers the records it has seen recently (the least
+    recently seen are forgotten first) and how many times it has seen each of
+    them.  Conflating a record into a graph a second time can't change the
+    graph, so only the records the cache hasn't seen need to be conflated.
+
+    .. code-block:: python
+
+        cache = RecordCache()
+        g = conflate_batch(cache.filter(records))
+
+    The counts can be fed to a :py:class:`aliqat.counting.CountingGraph` (see
+    :py:meth:`feed`) so that frequencies aren't lost.
+    """
+    __slots__ = ('_capacity', '_counts', '_evicted', '_hits', '_misses')
+
+    def __init__(self, capacity: int = 65536):
+        """
+
+        :param capacity: the maximum number of records to remember
+        """
+        if capacity < 1:
+            raise ValueError('The capacity must be at least 1.')
+        self._capacity = capacity
+        self._counts: OrderedDict = OrderedDict()
+        # the counts of the records that have been forgotten since the last
+        # flush
+        self._evicted: List[Tuple[str or bytes, int]] = []
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, record: str or bytes):
+        return _key(record) in self._counts
+
+    @property
+    def capacity(self) -> int:
+        """
+        Get the maximum number of records this cache remembers.
+
+        :return: the capacity
+        """
+        return self._capacity
+
+    @property
+    def hits(self) -> int:
+        """
+        Get the number of records this cache had already seen.
+
+        :return: the number of duplicates
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Get the number of records this cache hadn't seen (or had forgotten).
+
+        :return: the number of records that had to be conflated
+        """
+        return self._misses
+
+    def add(self, record: str or bytes) -> bool:
+        """
+        Count a record.
+
+        :param record: the record
+        :return: `True` if the record is new (and so should be conflated)
+        """
+        key = _key(record)
+        counts = self._counts
+        n = counts.get(key)
+        if n is not None:
+            counts[key] = n + 1
+            counts.move_to_end(key)
+            self._hits += 1
+            if _INSTRUMENTED:
+                _count('duplicates')
+            return False
+        counts[key] = 1
+        self._misses += 1
+        if len(counts) > self._capacity:
+            forgotten = counts.popitem(last=False)
+            if forgotten[1]:
+                self._evicted.append(forgotten)
+        return True
+
+    def filter(self,
+               records: Iterable[str or bytes]) -> Iterator[str or bytes]:
+        """
+        Count records and pass on the new ones.
+
+        :param records: the records
+        :return: an iterator over the new records
+        """
+        add = self.add
+        for record in records:
+            if add(record):
+                yield record
+
+    def unique(self, records: Iterable[str or bytes]) -> List[str or bytes]:
+        """
+        Count records and get the new ones.
+
+        :param records: the records
+        :return: the new records
+        """
+        return list(self.filter(records))
+
+    def flush(self) -> List[Tuple[str or bytes, int]]:
+        """
+        Get the counts collected since the last flush, then reset them.  (The
+        records themselves are still remembered.)
+
+        .. note::
+
+            The counts of records that have been forgotten are kept until the
+            next flush, so flush regularly.
+
+        :return: the records and the number of times each was seen
+        """
+        flushed, self._evicted = self._evicted, []
+        counts = self._counts
+        for key, n in counts.items():
+            if n:
+                flushed.append((key, n))
+                counts[key] = 0
+        return flushed
+
+    def feed(self, graph: CountingGraph) -> List[Tuple[str or bytes, int]]:
+        """
+        Flush the counts into a counting graph.
+
+        :param graph: the counting graph
+        :return: the counts of the records that don't fit the graph (because
+            their lengths differ from the graph's)
+        """
+        width = len(graph)
+        flushed = self.flush()
+        fits = [(r, n) for r, n in flushed if len(r) == width]
+        if fits:
+            records, weights = zip(*fits)
+            graph.update(records, weights)
+        return [(r, n) for r, n in flushed if len(r) != width]
+
+
+def _key(record: str or bytes) -> str or bytes:
+    """
+    Get a record in a form that can be hashed.
+
+    :param record: the record
+    :return: the record (as bytes, if it's some other bytes-like object)
+    """
+    return record if isinstance(record, (str, bytes)) else bytes(record)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: fields
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Where does one thing end and the next begin?
+"""
+
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from .graphs import CharClass, Graph, NO_LITERAL
+
+
+class Field(NamedTuple):
+    """
+    A field is a run of positions in a record.
+    """
+    start: int  #: the position at which the field starts
+    stop: int  #: the position at which the field stops
+    #: the character classes seen in the field (a plain mask if the graph's
+    #: classifier has a lattice)
+    mask: CharClass or int
+    literal: Optional[str]  #: the field's text (if it's a literal separator)
+
+    @property
+    def is_literal(self) -> bool:
+        """
+        Is this field a literal separator?
+
+        :return: `True` if the field is a literal separator
+        """
+        return self.literal is not None
+
+    @property
+    def is_blank(self) -> bool:
+        """
+        Is this field blank (nothing but empty characters)?
+
+        :return: `True` if the field is blank
+        """
+        return self.literal is None and self.mask == CharClass.EMPTY
+
+    @property
+    def is_padded(self) -> bool:
+        """
+        Is this field padded (are empty characters seen along with others)?
+
+        :return: `True` if the field is padded
+        """
+        return (
+            self.literal is None and
+            self.mask != CharClass.EMPTY and
+            bool(self.mask & CharClass.EMPTY)
+        )
+
+
+def infer_fields(graph: Graph) -> List[Field]:
+    """
+    Infer the fields in a graph.  A run of positions that hold literals is a
+    separator.  Otherwise, positions belong to the same field if they've seen
+    the same (non-empty) character classes, so a column that's sometimes
+    empty joins its neighbours (as it would in a padded field).
+
+    :param graph: the graph
+    :return: the fields, in order
+    """
+    masks, literals = graph.masks, graph.literals
+    is_literal = literals != NO_LITERAL
+    # Columns that have seen nothing but empty characters keep their empty
+    # bit, and every literal column gets the same key.
+    kinds = np.where(
+        masks == CharClass.EMPTY, masks,
+        masks & ~masks.dtype.type(CharClass.EMPTY))
+    kinds = np.where(is_literal, -1, kinds.astype(np.int64))
+    # Find the positions at which the kind changes.
+    bounds = np.concatenate((
+        [0], np.flatnonzero(kinds[1:] != kinds[:-1]) + 1, [len(kinds)]
+    )) if len(kinds) else np.array([0])
+    # Masks from a lattice aren't members of CharClass.
+    cls = CharClass if graph._classifier.lattice is None else int
+    fields: List[Field] = []
+    for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        fields.append(Field(
+            start=start,
+            stop=stop,
+            mask=cls(int(np.bitwise_or.reduce(masks[start:stop]))),
+            literal=(
+                ''.join(chr(c) for c in literals[start:stop].tolist())
+                if is_literal[start] else None
+            )
+        ))
+    return fields
+
+
+class FieldParser(object):
+    """
+    A field parser cuts fields out of records without copying them.
+    """
+    __slots__ = ('_fields', '_slices')
+
+    def __init__(self, fields: Iterable[Field]):
+        """
+
+        :param fields: the fields to cut out
+        """
+        self._fields: Tuple[Field, ...] = tuple(fields)
+        self._slices: Tuple[slice, ...] = tuple(
+            slice(f.start, f.stop) for f in self._fields
+        )
+
+    @classmethod
+    def from_graph(cls,
+                   graph: Graph,
+                   literals: bool = False,
+                   blanks: bool = False) -> 'FieldParser':
+        """
+        Create a parser for the fields inferred from a graph.
+
+        :param graph: the graph
+        :param literals: `True` to include the literal separators
+        :param blanks: `True` to include the blank fields
+        :return: the parser
+        """
+        return cls(
+            f for f in infer_fields(graph)
+            if (literals or not f.is_literal) and (blanks or not f.is_blank)
+        )
+
+    @property
+    def fields(self) -> Tuple[Field, ...]:
+        """
+        Get the fields this parser cuts out.
+
+        :return: the fields
+        """
+        return self._fields
+
+    def parse(self,
+              record: str or bytes) -> Tuple[memoryview or str, ...]:
+        """
+        Cut the fields out of a record.  Bytes-like records produce
+        memoryviews of the record (so nothing is copied).
+
+        :param record: the record
+        :return: the fields
+        """
+        view = record if isinstance(record, str) else memoryview(record)
+        return tuple(map(view.__getitem__, self._slices))
+
+    def parse_block(self,
+                    buffer: bytes or memoryview,
+                    stride: int) -> List[np.ndarray]:
+        """
+        Cut the fields out of a block of fixed-length records that sit next
+        to one another in a buffer.
+
+        :param buffer: the buffer
+        :param stride: the distance between the starts of the records
+        :return: a 2-D array for each field with one row per record (each a
+            view of the buffer, so nothing is copied)
+        """
+        rows = np.frombuffer(buffer, dtype=np.uint8)
+        rows = rows[:len(rows) - len(rows) % stride].reshape(-1, stride)
+        return [rows[:, s] for s in self._slices]
@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: framing
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Where does one record stop and the next one start?
+
+A framer cuts records out of a raw byte stream that arrives in arbitrary
+pieces.  Each framer owns a reusable buffer that the stream is read into
+(directly, with :py:meth:`Framer.buffer` and :py:meth:`Framer.commit`, or
+by copying each piece in with :py:meth:`Framer.feed`) and the records it
+returns are :py:class:`memoryview` slices of that buffer, so nothing is
+copied to cut them out.
+
+.. code-block:: python
+
+    framer = StxEtxFramer()
+    while True:
+        n = sock.recv_into(framer.buffer())
+        records = framer.commit(n) if n else framer.flush()
+        ...
+
+A framer holds on to at most :py:attr:`Framer.max_frame` bytes of a frame
+that hasn't ended.  If a frame runs on any longer (because the end of it was
+lost, say), its bytes are discarded and the framer waits for the start of
+the next one.
+
+.. note::
+
+    The records a framer returns are only valid until the next time it's
+    given more bytes, since their bytes may be moved (to make room) or
+    overwritten.  Copy the ones that need to last (with :py:class:`bytes`).
+"""
+
+from abc import ABC, abstractmethod
+from typing import List
+
+STX: bytes = b'\x02'  #: the byte at the start of a frame
+ETX: bytes = b'\x03'  #: the byte at the end of a frame
+CRLF: bytes = b'\r\n'  #: the bytes between delimited records
+MAX_FRAME: int = 0x10000  #: the default length of the longest frame
+
+
+class Framer(ABC):
+    """
+    A framer keeps the bytes of the frame it's in the middle of (and not
+    much else) between reads, so it's cheap to keep one for each of many
+    connections.  (Subclasses decide where the frames are.)
+    """
+    __slots__ = ('_buffer', '_start', '_end', '_discarded', '_max_frame')
+
+    def __init__(self, size: int = 4096, max_frame: int = MAX_FRAME):
+        """
+
+        :param size: the initial size of the buffer (which grows, if a frame
+            doesn't fit)
+        :param max_frame: the greatest number of bytes kept for a frame that
+            hasn't ended
+        :raises ValueError: if the longest frame is shorter than one byte
+        """
+        if max_frame < 1:
+            raise ValueError('The longest frame must be at least 1 byte.')
+        self._buffer = bytearray(size)
+        self._start = 0  # where the unframed bytes start
+        self._end = 0  # where the unframed bytes end
+        self._discarded = 0
+        self._max_frame = max_frame
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def discarded(self) -> int:
+        """
+        Get the number of bytes discarded because they weren't part of a
+        (complete) frame.
+
+        :return: the number of bytes
+        """
+        return self._discarded
+
+    @property
+    def max_frame(self) -> int:
+        """
+        Get the greatest number of bytes kept for a frame that hasn't ended.
+
+        :return: the number of bytes
+        """
+        return self._max_frame
+
+    def buffer(self, size: int = 1) -> memoryview:
+        """
+        Get the free space at the end of the buffer, into which the next
+        bytes should be read.
+
+        :param size: the minimum amount of space
+        :return: the free space
+        """
+        buf, start, end = self._buffer, self._start, self._end
+        if len(buf) - end < size:
+            pending = end - start
+            if pending + size > len(buf):
+                # Grow the buffer.  (Any records still being looked at keep
+                # the old one.)
+                grown = bytearray(max(len(buf) * 2, pending + size))
+                grown[:pending] = buf[start:end]
+                self._buffer = buf = grown
+            else:
+                # Move the unframed bytes to the front.
+                buf[:pending] = buf[start:end]
+            self._start, self._end = 0, pending
+        return memoryview(buf)[self._end:]
+
+    def commit(self, n: int) -> List[memoryview]:
+        """
+        Frame the bytes that have been read into the buffer.
+
+        :param n: the number of bytes read
+        :return: the complete records
+        """
+        self._end += n
+        records = self._frame(memoryview(self._buffer))
+        if self._end - self._start > self._max_frame:
+            self._overflow()
+        return records
+
+    def feed(self, data: bytes or memoryview) -> List[memoryview]:
+        """
+        Frame more bytes.
+
+        :param data: the bytes (or any bytes-like object)
+        :return: the complete records
+        """
+        n = len(data)
+        self.buffer(n)[:n] = data
+        return self.commit(n)
+
+    def flush(self) -> List[memoryview]:
+        """
+        Frame whatever's left at the end of the stream.
+
+        :return: the last records (if there are any)
+        """
+        records = self._last(memoryview(self._buffer))
+        self._discarded += self._end - self._start
+        self._start = self._end = 0
+        return records
+
+    def _overflow(self):
+        """
+        Discard the bytes of a frame that's run on too long.
+        """
+        self._discarded += self._end - self._start
+        self._start = self._end
+
+    @abstractmethod
+    def _frame(self, view: memoryview) -> List[memoryview]:
+        """
+        Cut the complete records out of the unframed bytes (and move the
+        start of the unframed bytes past them).
+
+        :param view: a view of the whole buffer
+        :return: the records
+        """
+
+    def _last(self, view: memoryview) -> List[memoryview]:
+        """
+        Cut a record out of the bytes left at the end of the stream (and move
+        the start of the unframed bytes past it).
+
+        :param view: a view of the whole buffer
+        :return: the record (if there is one)
+        """
+        return []
+
+
+class DelimitedFramer(Framer):
+    """
+    A delimited framer cuts records at a delimiter (a carriage return and a
+    line feed, say).  Empty records are skipped, and the last record doesn't
+    need a delimiter.  A record that runs on too long is discarded up to the
+    next delimiter.
+    """
+    __slots__ = ('_delimiter', '_skipping')
+
+    def __init__(self,
+                 delimiter: bytes = CRLF,
+                 size: int = 4096,
+                 max_frame: int = MAX_FRAME):
+        """
+
+        :param delimiter: the bytes between records
+        :param size: the initial size of the buffer
+        :param max_frame: the greatest number of bytes kept for a record
+            that hasn't ended
+        :raises ValueError: if the delimiter is empty
+        """
+        if not delimiter:
+            raise ValueError('The delimiter must not be empty.')
+        super().__init__(size, max_frame)
+        self._delimiter = bytes(delimiter)
+        self._skipping = False  # Are we discarding a record that's too long?
+
+    def _overflow(self):
+        # Keep whatever might be the start of the delimiter.
+        keep = min(len(self._delimiter) - 1, self._end - self._start)
+        self._discarded += self._end - self._start - keep
+        self._start = self._end - keep
+        self._skipping = True
+
+    def _frame(self, view: memoryview) -> List[memoryview]:
+        buf, delimiter = self._buffer, self._delimiter
+        step = len(delimiter)
+        records: List[memoryview] = []
+        start, end = self._start, self._end
+        i = buf.find(delimiter, start, end)
+        if self._skipping:
+            if i == -1:
+                self._overflow()
+                return records
+            # The rest of the record that was too long ends here.
+            self._discarded += i + step - start
+            self._skipping = False
+            start = i + step
+            i = buf.find(delimiter, start, end)
+        while i != -1:
+            if i - start > self._max_frame:
+                self._discarded += i + step - start  # It's too long.
+            elif i > start:
+                records.append(view[start:i])
+            start = i + step
+            i = buf.find(delimiter, start, end)
+        self._start = start
+        return records
+
+    def _last(self, view: memoryview) -> List[memoryview]:
+        if self._skipping:
+            self._skipping = False
+            return []  # (The rest is discarded.)
+        start, end = self._start, self._end
+        self._start = end
+        return [view[start:end]] if end > start else []
+
+
+class StxEtxFramer(Framer):
+    """
+    An STX/ETX framer cuts out the records between the start-of-text and
+    end-of-text bytes (optionally followed by a block check character or
+    two, which are skipped).  Bytes outside the frames are discarded, as are
+    frames that are interrupted by the start of another and frames that run
+    on too long without an ETX.
+    """
+    __slots__ = ('_trailer',)
+
+    def __init__(self,
+                 trailer: int = 0,
+                 size: int = 4096,
+                 max_frame: int = MAX_FRAME):
+        """
+
+        :param trailer: the number of bytes (such as a longitudinal
+            redundancy check) that follow each ETX
+        :param size: the initial size of the buffer
+        :param max_frame: the greatest number of bytes kept for a frame that
+            hasn't ended
+        """
+        super().__init__(size, max_frame)
+        self._trailer = trailer
+
+    def _frame(self, view: memoryview) -> List[memoryview]:
+        buf, trailer = self._buffer, self._trailer
+        records: List[memoryview] = []
+        start, end = self._start, self._end
+        while start < end:
+            s = buf.find(STX, start, end)
+            if s == -1:
+                # There's nothing here but noise.
+                self._discarded += end - start
+                start = end
+                break
+            self._discarded += s - start
+            start = s
+            e = buf.find(ETX, s + 1, end)
+            # If another frame starts first, this one's garbled.
+            restart = buf.find(STX, s + 1, e if e != -1 else end)
+            if restart != -1:
+                self._discarded += restart - s
+                start = restart
+                continue
+            if e == -1 or e + 1 + trailer > end:
+                break  # We'll have to wait for the rest of it.
+            if e - s - 1 > self._max_frame:
+                self._discarded += e + 1 + trailer - s  # It's too long.
+            else:
+                records.append(view[s + 1:e])
+            start = e + 1 + trailer
+        self._start = start
+        return records
+
+
+class FixedFramer(Framer):
+    """
+    A fixed-length framer cuts records of a given length, each optionally
+    followed by a delimiter (which isn't checked).  The last record doesn't
+    need a delimiter.
+    """
+    __slots__ = ('_length', '_step')
+
+    def __init__(self,
+                 length: int,
+                 delimiter: bytes = b'',
+                 size: int = 4096,
+                 max_frame: int = MAX_FRAME):
+        """
+
+        :param length: the length of each record
+        :param delimiter: the bytes that follow each record
+        :param size: the initial size of the buffer
+        :param max_frame: the greatest number of bytes kept for a record
+            that hasn't ended
+        :raises ValueError: if the length isn't positive, or if a record
+            (and its delimiter) is longer than the longest frame
+        """
+        if length < 1:
+            raise ValueError('The length must be at least 1.')
+        if length + len(delimiter) > max_frame:
+            raise ValueError(
+                'The records must be no longer than {} bytes.'.format(
+                    max_frame))
+        super().__init__(size, max_frame)
+        self._length = length
+        self._step = length + len(delimiter)
+
+    def _frame(self, view: memoryview) -> List[memoryview]:
+        length, step = self._length, self._step
+        start = self._start
+        stop = start + (self._end - start) // step * step
+        self._start = stop
+        return [view[i:i + length] for i in range(start, stop, step)]
+
+    def _last(self, view: memoryview) -> List[memoryview]:
+        start = self._start
+        if not self._length <= self._end - start < self._step:
+            return []
+        self._start = self._end
+        return [view[start:start + self._length]]
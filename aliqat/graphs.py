@@ -9,7 +9,22 @@
 Say something descriptive about the 'grids' module.
 """
 
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from enum import IntFlag
+from functools import lru_cache
+from itertools import islice
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Tuple
+)
+import numpy as np
+from .instruments import ACTIVE as _INSTRUMENTED, count as _count, stage
 
 
 class CharClass(IntFlag):
@@ -43,45 +58,996 @@ class CharClass(IntFlag):
         :raises KeyError: if no single-character string representation is
         defined
         """
-        return {
-            CharClass.EMPTY: '∅',
-            CharClass.ALPHA: 'α',
-            CharClass.DIGIT: 'ℝ',
-            CharClass.SPECIAL: '¿',
-            CharClass.ANY: 'ω',
-            CharClass.ALPHA | CharClass.DIGIT: 'π',
-            CharClass.ALPHA | CharClass.EMPTY: '∀',
-            CharClass.ALPHA | CharClass.SPECIAL: 'غ',
-            CharClass.DIGIT | CharClass.EMPTY: '𝕌',
-            CharClass.DIGIT | CharClass.SPECIAL: '⊕',
-            CharClass.SPECIAL | CharClass.EMPTY: '٭',
-            CharClass.ANY ^ CharClass.EMPTY: '●',
-            CharClass.ANY ^ CharClass.ALPHA: '◒',
-            CharClass.ANY ^ CharClass.DIGIT: '◔',
-            CharClass.ANY ^ CharClass.SPECIAL: '◎'
-        }[i]
+        return GLYPHS[i]
+
+
+#: the single-character string representation of each character class mask
+GLYPHS = {
+    CharClass.EMPTY: '∅',
+    CharClass.ALPHA: 'α',
+    CharClass.DIGIT: 'ℝ',
+    CharClass.SPECIAL: '¿',
+    CharClass.ANY: 'ω',
+    CharClass.ALPHA | CharClass.DIGIT: 'π',
+    CharClass.ALPHA | CharClass.EMPTY: '∀',
+    CharClass.ALPHA | CharClass.SPECIAL: 'غ',
+    CharClass.DIGIT | CharClass.EMPTY: '𝕌',
+    CharClass.DIGIT | CharClass.SPECIAL: '⊕',
+    CharClass.SPECIAL | CharClass.EMPTY: '٭',
+    CharClass.ANY ^ CharClass.EMPTY: '●',
+    CharClass.ANY ^ CharClass.ALPHA: '◒',
+    CharClass.ANY ^ CharClass.DIGIT: '◔',
+    CharClass.ANY ^ CharClass.SPECIAL: '◎'
+}
+NO_GLYPH: str = '\ufffd'  #: the glyph for masks that have no other glyph
+# the code point of each mask's glyph, indexed by mask
+_GLYPH_CODES: np.ndarray = np.full(0x100, ord(NO_GLYPH), dtype=np.uint32)
+_GLYPH_CODES[list(GLYPHS)] = [ord(g) for g in GLYPHS.values()]
+
+#: the tests that may define the classes in a :py:class:`Lattice`, by name
+PREDICATES: Dict[str, Callable[[str], bool]] = {
+    'alpha': str.isalpha,
+    'alnum': str.isalnum,
+    'digit': str.isdigit,
+    'lower': str.islower,
+    'upper': str.isupper,
+    'space': str.isspace,
+    'printable': str.isprintable
+}
+MAX_BITS: int = 32  #: the most bits a character class mask may have
+# the array type codes for masks, by the number of bytes in a mask
+_TYPECODES: Dict[int, str] = {array(t).itemsize: t for t in 'LIHB'}
+_BRAILLE: int = 0x2800  # the Braille patterns (one dot per bit)
+_PRIVATE: int = 0xf0000  # the first supplementary private use code point
+# the number of code points in each of the two private use planes (less the
+# noncharacters at the end of each)
+_PLANE: int = 0xfffe
+
+
+class ClassDef(NamedTuple):
+    """
+    The definition of a character class in a :py:class:`Lattice`.
+    """
+    name: str  #: the name of the class
+    glyph: str  #: the single character that represents the class
+    chars: str = ''  #: the characters in the class
+    #: the name of a test (see :py:data:`PREDICATES`) that the rest of the
+    #: characters in the class pass
+    predicate: str = None
+
+
+class Lattice(object):
+    """
+    A lattice describes a set of character classes that's finer than
+    :py:class:`CharClass`: upper and lower case letters, hexadecimal digits,
+    particular separators, and so on.  Each class is a bit in the character
+    class mask.  The lowest bit is always :py:attr:`CharClass.EMPTY` and the
+    classes follow, in order.  A character belongs to the first class that
+    contains it or, if none does, to every class (the top of the lattice).
+
+    .. code-block:: python
+
+        lattice = Lattice([
+            ClassDef('HEX', 'h', 'ABCDEF'),
+            ClassDef('UPPER', 'A', predicate='upper'),
+            ClassDef('LOWER', 'a', predicate='lower'),
+            ClassDef('DIGIT', 'ℝ', predicate='digit'),
+            ClassDef('DASH', '‐', '-')
+        ])
+        g = Graph(record, classifier=Classifier(lattice=lattice))
+
+    Masks take a byte for up to 8 bits, two bytes for up to 16 and four
+    bytes for up to 32 (see :py:data:`MAX_BITS`).
+
+    Masks are rendered with the glyph of their class (or the glyph given for
+    them, if there is one).  Other masks get a generated glyph: the Braille
+    pattern whose dots are the mask's bits (for lattices of up to 8 bits) or
+    else a private use character whose code point is offset by the mask.
+    There are only enough private use characters for the masks below
+    ``0x1fffc``, so the other masks (which only lattices of more than 17
+    bits have) are rendered as :py:data:`NO_GLYPH` unless they're given
+    glyphs.  (Ask for them strictly to find the ones that need glyphs.)
+    """
+    __slots__ = ('_classes', '_glyphs', '_bits', '_dtype', '_named', '_table')
+
+    def __init__(self,
+                 classes: Iterable[ClassDef],
+                 glyphs: Mapping[int, str] = None):
+        """
+
+        :param classes: the classes (in order)
+        :param glyphs: the glyphs for particular masks (such as the
+            combinations of classes that are seen most often)
+        :raises ValueError: if there are too few or too many classes, or if
+            a class is defined incorrectly
+        """
+        self._classes: Tuple[ClassDef, ...] = tuple(
+            ClassDef(*c) for c in classes)
+        self._bits = len(self._classes) + 1
+        if not self._classes or self._bits > MAX_BITS:
+            raise ValueError(
+                'A lattice must have between 1 and {} classes.'.format(
+                    MAX_BITS - 1))
+        names = [c.name for c in self._classes]
+        if len(set(names)) != len(names) or {'EMPTY', 'ANY'} & set(names):
+            raise ValueError(
+                'The class names must be unique (and neither EMPTY nor ANY).')
+        for c in self._classes:
+            if len(c.glyph) != 1:
+                raise ValueError(
+                    'The glyph for {} must be a single character.'.format(
+                        c.name))
+            if c.predicate is not None and c.predicate not in PREDICATES:
+                raise ValueError('{} is not a predicate.'.format(c.predicate))
+        self._dtype = np.dtype(
+            np.uint8 if self._bits <= 8
+            else np.uint16 if self._bits <= 16 else np.uint32)
+        self._glyphs: Dict[int, str] = dict(glyphs or {})
+        if any(len(g) != 1 for g in self._glyphs.values()):
+            raise ValueError('Every glyph must be a single character.')
+        self._named: Dict[int, str] = {
+            CharClass.EMPTY: GLYPHS[CharClass.EMPTY],
+            self.top: GLYPHS[CharClass.ANY]
+        }
+        self._named.update(
+            (1 << i, c.glyph) for i, c in enumerate(self._classes, 1))
+        self._named.update(self._glyphs)
+        # Narrow lattices get a lookup table (indexed by mask) for glyphs.
+        self._table: np.ndarray = (
+            self._generate(np.arange(1 << self._bits, dtype=np.uint32))
+            if self._bits <= 16 else None
+        )
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Lattice) and
+            self._classes == other._classes and
+            self._glyphs == other._glyphs
+        )
+
+    def __hash__(self):
+        return hash((self._classes, tuple(sorted(self._glyphs.items()))))
+
+    def __reduce__(self):
+        return Lattice, (self._classes, self._glyphs)
+
+    @property
+    def classes(self) -> Tuple[ClassDef, ...]:
+        """
+        Get the classes' definitions.
+
+        :return: the classes (in order)
+        """
+        return self._classes
+
+    @property
+    def bits(self) -> int:
+        """
+        Get the number of bits in a mask (including the empty bit).
+
+        :return: the number of bits
+        """
+        return self._bits
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        Get the type of an array of masks.
+
+        :return: the type
+        """
+        return self._dtype
+
+    @property
+    def top(self) -> int:
+        """
+        Get the mask that has every bit set.
+
+        :return: the mask
+        """
+        return (1 << self._bits) - 1
+
+    def mask(self, *names: str) -> int:
+        """
+        Get the mask that has the bits of some classes set.
+
+        :param names: the names of the classes (which may include ``EMPTY``
+            and ``ANY``)
+        :return: the mask
+        :raises ValueError: if there's no such class
+        """
+        bits = {c.name: 1 << i for i, c in enumerate(self._classes, 1)}
+        bits.update(EMPTY=CharClass.EMPTY, ANY=self.top)
+        m = 0
+        for name in names:
+            if name not in bits:
+                raise ValueError('There is no {} class.'.format(name))
+            m |= bits[name]
+        return m
+
+    def classify(self, c: str) -> int:
+        """
+        Classify a single (non-empty) character the long way.
+
+        :param c: the character
+        :return: the character class mask
+        """
+        for i, cls in enumerate(self._classes, 1):
+            if c in cls.chars or (
+                    cls.predicate is not None and PREDICATES[cls.predicate](c)
+            ):
+                return 1 << i
+        return self.top
+
+    def glyph(self, mask: int, strict: bool = False) -> str:
+        """
+        Get the single-character string representation of a mask.
+
+        :param mask: the mask
+        :param strict: `True` to raise an error (rather than return
+            :py:data:`NO_GLYPH`) if the mask has no glyph
+        :return: the glyph
+        :raises ValueError: if the mask has no glyph (and `strict` is `True`)
+        """
+        return chr(int(self.glyph_codes(np.array([mask]), strict)[0]))
+
+    def glyph_codes(self,
+                    masks: np.ndarray,
+                    strict: bool = False) -> np.ndarray:
+        """
+        Get the code points of the glyphs of an array of masks.
+
+        :param masks: the masks
+        :param strict: `True` to raise an error (rather than use
+            :py:data:`NO_GLYPH`) if a mask has no glyph
+        :return: the code points
+        :raises ValueError: if a mask has no glyph (and `strict` is `True`)
+        """
+        if self._table is not None:
+            return self._table[masks]
+        return self._generate(masks, strict)
+
+    def _generate(self,
+                  masks: np.ndarray,
+                  strict: bool = False) -> np.ndarray:
+        """
+        Generate the code points of the glyphs of an array of masks.
+
+        :param masks: the masks
+        :param strict: `True` to raise an error (rather than use
+            :py:data:`NO_GLYPH`) if a mask has no glyph
+        :return: the code points
+        :raises ValueError: if a mask has no glyph (and `strict` is `True`)
+        """
+        masks = masks.astype(np.uint32)
+        # The masks run through the private use planes (skipping the
+        # noncharacters at the end of the first).
+        codes = (
+            _BRAILLE + masks if self._bits <= 8
+            else _PRIVATE + masks + (masks >= _PLANE) * 2
+        ).astype(np.uint32)
+        named = np.zeros(masks.shape, dtype=bool)
+        for m, g in self._named.items():
+            hit = masks == m
+            codes[hit] = ord(g)
+            named |= hit
+        if self._bits > 8:
+            missing = ~named & (masks >= 2 * _PLANE)
+            if strict and missing.any():
+                raise ValueError(
+                    'The mask {:#x} has no glyph.'.format(
+                        int(masks[missing][0])))
+            codes[missing] = ord(NO_GLYPH)
+        return codes
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize this lattice (as JSON).
+
+        :return: the bytes
+        """
+        return json.dumps({
+            'classes': [list(c) for c in self._classes],
+            'glyphs': {str(m): g for m, g in self._glyphs.items()}
+        }, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, data: bytes or memoryview) -> 'Lattice':
+        """
+        Create a lattice from the bytes produced by :py:meth:`to_bytes`.
+
+        :param data: the bytes
+        :return: the lattice
+        :raises ValueError: if the bytes aren't a serialized lattice
+        """
+        try:
+            spec = json.loads(str(data, 'utf-8'))
+            return cls(
+                (ClassDef(*c) for c in spec['classes']),
+                {int(m): g for m, g in spec['glyphs'].items()})
+        except (KeyError, TypeError, AttributeError) as ex:
+            raise ValueError('The data is not a lattice.') from ex
+
+
+EMPTY_CHARS: str = ' \r\n'  #: the characters classified as empty
+SPECIAL_CHARS: str = '+-,:*!?<>.'  #: the characters classified as special
+
+
+class Classifier(object):
+    """
+    A classifier assigns a :py:class:`CharClass` to characters.  The classes
+    of the first 256 code points are computed once, up front, and stored in a
+    lookup table so that whole strings (or bytes) can be classified in a
+    single pass.
+
+    A classifier may also assign the finer classes of a :py:class:`Lattice`,
+    in which case the masks may be wider than a byte.
+    """
+    def __init__(self,
+                 empty: Iterable[str] = EMPTY_CHARS,
+                 special: Iterable[str] = SPECIAL_CHARS,
+                 lattice: Lattice = None):
+        """
+
+        :param empty: the characters classified as empty
+        :param special: the characters classified as special (unless there's
+            a lattice, whose classes are used instead)
+        :param lattice: the lattice of character classes (by default,
+            :py:class:`CharClass`)
+        """
+        self._empty = frozenset(empty)
+        self._special = frozenset(special) if lattice is None else frozenset()
+        self._lattice = lattice
+        self._dtype: np.dtype = (
+            lattice.dtype if lattice is not None else np.dtype(np.uint8))
+        # Build the lookup table (and friends).
+        self._flags: List[int] = [
+            self._classify(chr(c)) for c in range(0x100)
+        ]
+        self._array: np.ndarray = np.array(self._flags, dtype=self._dtype)
+        # Wider masks can't be translated from bytes to bytes.
+        self._table: bytes = (
+            self._array.tobytes() if self._dtype.itemsize == 1 else None)
+
+    def __reduce__(self):
+        # The lookup table is cheap to rebuild, so we only pickle the lists.
+        return Classifier, (
+            ''.join(sorted(self._empty)), ''.join(sorted(self._special)),
+            self._lattice
+        )
+
+    @property
+    def empty(self) -> frozenset:
+        """
+        Get the characters classified as empty.
+
+        :return: the empty characters
+        """
+        return self._empty
+
+    @property
+    def special(self) -> frozenset:
+        """
+        Get the characters classified as special.
+
+        :return: the special characters
+        """
+        return self._special
+
+    @property
+    def lattice(self) -> Lattice or None:
+        """
+        Get the lattice of character classes.
+
+        :return: the lattice (or `None` if the classifier assigns the classes
+            of :py:class:`CharClass`)
+        """
+        return self._lattice
+
+    @property
+    def dtype(self) -> np.dtype:
+        """
+        Get the type of an array of character class masks.
+
+        :return: the type
+        """
+        return self._dtype
+
+    @property
+    def typecode(self) -> str:
+        """
+        Get the :py:mod:`array` type code of character class masks.
+
+        :return: the type code
+        """
+        return _TYPECODES[self._dtype.itemsize]
+
+    @property
+    def bits(self) -> int:
+        """
+        Get the number of bits in a character class mask.
+
+        :return: the number of bits
+        """
+        return (
+            self._lattice.bits if self._lattice is not None
+            else CharClass.ANY.bit_length()
+        )
+
+    @property
+    def table(self) -> bytes or None:
+        """
+        Get the lookup table (suitable for :py:meth:`bytes.translate`) that
+        maps each of the first 256 code points to its character class.
+
+        :return: the lookup table (or `None` if the masks are wider than a
+            byte)
+        """
+        return self._table
+
+    def same_as(self, other: 'Classifier') -> bool:
+        """
+        Does another classifier classify characters the same way?
+
+        :param other: the other classifier
+        :return: `True` if the classifiers are interchangeable
+        """
+        return other is self or (
+            self._empty == other._empty and
+            self._special == other._special and
+            self._lattice == other._lattice
+        )
+
+    def glyph_codes(self,
+                    masks: np.ndarray,
+                    strict: bool = False) -> np.ndarray:
+        """
+        Get the code points of the glyphs (the single-character string
+        representations) of an array of masks.
+
+        :param masks: the masks
+        :param strict: `True` to raise an error (rather than use
+            :py:data:`NO_GLYPH`) if a mask has no glyph
+        :return: the code points
+        :raises ValueError: if a mask has no glyph (and `strict` is `True`,
+            see :py:class:`Lattice`)
+        """
+        if self._lattice is not None:
+            return self._lattice.glyph_codes(masks, strict)
+        return _GLYPH_CODES[masks]
+
+    def _classify(self, c: str) -> int:
+        """
+        Classify a single character the long way.
+
+        :param c: the character
+        :return: the character class
+        """
+        if c in self._empty:
+            return CharClass.EMPTY
+        elif self._lattice is not None:
+            return self._lattice.classify(c)
+        elif c.isdigit():
+            return CharClass.DIGIT
+        elif c.isalpha():
+            return CharClass.ALPHA
+        elif c in self._special:
+            return CharClass.SPECIAL
+        else:
+            return CharClass.ANY
+
+    def classify_char(self, c: str) -> int:
+        """
+        Classify a single character.
+
+        :param c: the character
+        :return: the character class
+        """
+        o = ord(c)
+        return self._flags[o] if o < 0x100 else self._classify(c)
+
+    def classify(self, s: str or bytes) -> bytes:
+        """
+        Classify every character in a string (or every byte in a bytes-like
+        object).
+
+        :param s: the string or bytes
+        :return: the character class mask of each character (as the bytes of
+            an array of masks, if they're wider than a byte)
+        """
+        if isinstance(s, str):
+            try:
+                s = s.encode('latin-1')
+            except UnicodeEncodeError:
+                # We'll have to look at the code points.
+                return self.classify_codes(
+                    np.frombuffer(s.encode('utf-32-le'), dtype=np.uint32)
+                ).tobytes()
+        if isinstance(s, (bytes, bytearray)) and self._table is not None:
+            return s.translate(self._table)
+        return self._array[np.frombuffer(s, dtype=np.uint8)].tobytes()
+
+    def classify_codes(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Classify an array of code points.
+
+        :param codes: the code points
+        :return: an array of character class masks with the same shape
+        """
+        if codes.dtype != np.uint8:
+            if codes.size == 0 or codes.max() <= 0xff:
+                codes = codes.astype(np.uint8)
+            else:
+                return self._classify_wide(codes)
+        if self._table is None:
+            return self._array[codes]
+        # Let the lookup table do the work.
+        return np.frombuffer(
+            bytearray(codes.tobytes().translate(self._table)),
+            dtype=np.uint8
+        ).reshape(codes.shape)
+
+    def _classify_wide(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Classify an array of code points, some of which lie beyond the lookup
+        table.
+
+        :param codes: the code points
+        :return: an array of character class masks with the same shape
+        """
+        masks = self._array[np.minimum(codes, 0xff)]
+        # Code points outside the table are (hopefully) rare, so we just
+        # classify each distinct one the long way.
+        wide = codes > 0xff
+        uniq, inverse = np.unique(codes[wide], return_inverse=True)
+        masks[wide] = np.array(
+            [self._classify(chr(c)) for c in uniq.tolist()],
+            dtype=self._dtype
+        )[inverse]
+        return masks
+
+
+DEFAULT_CLASSIFIER: Classifier = Classifier()  #: the default classifier
+
+
+NO_LITERAL: int = 0xffff  #: marks a graph position that holds no literal
+
+
+@lru_cache(maxsize=64)
+def _classifier(empty: str,
+                special: str,
+                lattice: Lattice = None) -> Classifier:
+    """
+    Get a classifier (sharing one with every other graph that uses the same
+    characters).
+
+    :param empty: the characters classified as empty
+    :param special: the characters classified as special
+    :param lattice: the lattice of character classes
+    :return: the classifier
+    """
+    if (lattice is None and
+            frozenset(empty) == DEFAULT_CLASSIFIER.empty and
+            frozenset(special) == DEFAULT_CLASSIFIER.special):
+        return DEFAULT_CLASSIFIER
+    return Classifier(empty, special, lattice)
+
+
+GRAPH_MAGIC: bytes = b'AQGR'  #: the bytes at the start of a serialized graph
+GRAPH_VERSION: int = 1  #: the version of the serialized graph format
+# magic, version, flags, the size of a mask, (padding), length
+_GRAPH_HEADER = struct.Struct('<4sBBBxI')
+# the lengths of the empty and special characters (encoded as UTF-8)
+_CLASSIFIER_HEADER = struct.Struct('<II')
+_HAS_CLASSIFIER: int = 0x01  #: the flag set if a graph has its own classifier
+_HAS_LATTICE: int = 0x02  #: the flag set if a graph's classifier has a lattice
+_LATTICE_HEADER = struct.Struct('<I')  # the length of the lattice
+
 
 class Graph(object):
+    """
+    A graph describes the shape of a record, position by position.  Each
+    position holds a character class mask and, for as long as every record
+    conflated into the graph agrees upon it, the exact (literal) character.
+
+    The masks and literals are kept in compact arrays: one byte per position
+    for the masks (or more, if the classifier's :py:class:`Lattice` needs
+    them) and a parallel buffer of (BMP) code points for the literals,
+    where :py:data:`NO_LITERAL` marks positions that no longer hold an exact
+    character.
+
+    Records may have different lengths.  A record that's shorter than the
+    graph is treated as though its missing positions were empty (so they
+    gain the :py:attr:`CharClass.EMPTY` bit and lose their literals) and,
+    likewise, a longer record extends the graph with positions that every
+    earlier record was missing.
+    """
+    __slots__ = ('_masks', '_literals', '_classifier')
+
+    def __init__(self,
+                 s: str or bytes,
+                 classifier: Classifier = None,
+                 min_size: int = 0):
+        """
+
+        :param s: the record (a string or a bytes-like object)
+        :param classifier: the classifier used to classify characters
+        :param min_size: the minimum number of positions in the graph (the
+            positions beyond the end of the record are empty)
+        """
+        self._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        self._init_codes(_record_codes(s if s is not None else ' '))
+        if len(self._masks) < min_size:
+            self._grow(min_size)
+        if _INSTRUMENTED:
+            _count('records')
+
+    def _init_codes(self, codes: np.ndarray):
+        """
+        Initialize this graph from a record's code points.
+
+        :param codes: the code points
+        """
+        self._masks = array(
+            self._classifier.typecode,
+            self._classifier.classify_codes(codes).tobytes())
+        # Code points beyond the BMP can't be kept as literals.
+        self._literals = array('H', (
+            codes if codes.dtype == np.uint8
+            else np.where(codes > 0xffff, NO_LITERAL, codes)
+        ).astype(np.uint16).tobytes())
+
+    def _grow(self, size: int):
+        """
+        Add empty positions (that hold no literals) to the end of this graph.
 
-    def __init__(self, s: str):  # TODO: Optional parameter to set minimum size.
-        self._graph = list(s) if s is not None else [' ']
+        :param size: the new number of positions
+        """
+        n = size - len(self._masks)
+        if _INSTRUMENTED:
+            _count('extensions', n)
+        self._masks.extend(array(self._masks.typecode, (CharClass.EMPTY,)) * n)
+        self._literals.extend(array('H', (NO_LITERAL,)) * n)
+
+    @classmethod
+    def _from_codes(cls,
+                    codes: np.ndarray,
+                    classifier: Classifier = None) -> 'Graph':
+        """
+        Create a graph from a record's code points.
+
+        :param codes: the code points
+        :param classifier: the classifier used to classify characters
+        :return: the graph
+        """
+        g = cls.__new__(cls)
+        g._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        g._init_codes(codes)
+        return g
+
+    @classmethod
+    def from_arrays(cls,
+                    masks: Iterable[int],
+                    literals: Iterable[int],
+                    classifier: Classifier = None) -> 'Graph':
+        """
+        Create a graph from its character class masks and literals.
+
+        :param masks: the character class mask at each position
+        :param literals: the literal code point at each position (or
+            :py:data:`NO_LITERAL` where the position holds no literal)
+        :param classifier: the classifier used to classify characters
+        :return: the graph
+        :raises ValueError: if the masks and literals have different lengths
+        """
+        g = cls.__new__(cls)
+        g._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        g._masks = array(
+            g._classifier.typecode,
+            np.asarray(masks, dtype=g._classifier.dtype).tobytes())
+        g._literals = array(
+            'H', np.asarray(literals, dtype=np.uint16).tobytes())
+        if len(g._masks) != len(g._literals):
+            raise ValueError('The masks and literals must have equal lengths.')
+        return g
+
+    @classmethod
+    def from_bytes(cls,
+                   data: bytes or memoryview,
+                   classifier: Classifier = None) -> 'Graph':
+        """
+        Create a graph from the bytes produced by :py:meth:`to_bytes`.
+
+        :param data: the bytes (or any bytes-like object)
+        :param classifier: the classifier used to classify characters (by
+            default, the one the graph was serialized with)
+        :return: the graph
+        :raises ValueError: if the bytes aren't a serialized graph
+        """
+        with memoryview(data) as view, view.cast('B') as view:
+            if len(view) < _GRAPH_HEADER.size:
+                raise ValueError('The data is too short to be a graph.')
+            magic, version, flags, mask_size, n = _GRAPH_HEADER.unpack_from(
+                view)
+            if magic != GRAPH_MAGIC:
+                raise ValueError('The data is not a graph.')
+            if version != GRAPH_VERSION or mask_size not in _TYPECODES:
+                raise ValueError(
+                    'Version {} graphs (with {}-byte masks) are not '
+                    'supported.'.format(version, mask_size))
+            offset = _GRAPH_HEADER.size
+            embedded = DEFAULT_CLASSIFIER
+            if flags & _HAS_CLASSIFIER:
+                e, sp = _CLASSIFIER_HEADER.unpack_from(view, offset)
+                offset += _CLASSIFIER_HEADER.size
+                empty, special = (
+                    str(view[offset:offset + e], 'utf-8'),
+                    str(view[offset + e:offset + e + sp], 'utf-8'))
+                offset += e + sp
+                lattice = None
+                if flags & _HAS_LATTICE:
+                    (k,) = _LATTICE_HEADER.unpack_from(view, offset)
+                    offset += _LATTICE_HEADER.size
+                    lattice = Lattice.from_bytes(view[offset:offset + k])
+                    offset += k
+                embedded = _classifier(empty, special, lattice)
+            g = cls.__new__(cls)
+            g._classifier = classifier if classifier is not None else embedded
+            if g._classifier.dtype.itemsize != mask_size:
+                raise ValueError(
+                    'The classifier does not use {}-byte masks.'.format(
+                        mask_size))
+            # The masks are aligned, and the literals start on an even
+            # offset.
+            offset += -offset % mask_size
+            stop = offset + n * mask_size
+            start = stop + stop % 2
+            if len(view) < start + 2 * n:
+                raise ValueError('The data is truncated.')
+            g._masks = array(_TYPECODES[mask_size])
+            g._masks.frombytes(view[offset:stop])
+            g._literals = array('H')
+            g._literals.frombytes(view[start:start + 2 * n])
+        if sys.byteorder != 'little':
+            g._masks.byteswap()
+            g._literals.byteswap()
+        return g
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize this graph.  The result holds a short header, the
+        classifier's characters and lattice (unless the graph uses the
+        default classifier), the masks (as little-endian integers, aligned
+        to their size), and the literals (as little-endian 16-bit code
+        points).
+
+        :return: the bytes
+        """
+        head = []
+        flags = 0
+        classifier = self._classifier
+        if not classifier.same_as(DEFAULT_CLASSIFIER):
+            flags |= _HAS_CLASSIFIER
+            empty, special = (
+                ''.join(sorted(chars)).encode('utf-8')
+                for chars in (classifier.empty, classifier.special)
+            )
+            head.extend((
+                _CLASSIFIER_HEADER.pack(len(empty), len(special)),
+                empty, special))
+            if classifier.lattice is not None:
+                flags |= _HAS_LATTICE
+                lattice = classifier.lattice.to_bytes()
+                head.extend((_LATTICE_HEADER.pack(len(lattice)), lattice))
+        n = len(self._masks)
+        size = self._masks.itemsize
+        head.insert(0, _GRAPH_HEADER.pack(GRAPH_MAGIC, GRAPH_VERSION, flags,
+                                          size, n))
+        offset = sum(len(h) for h in head)
+        head.append(b'\0' * (-offset % size))
+        offset += -offset % size + n * size
+        masks, literals = self._masks, self._literals
+        if sys.byteorder != 'little':
+            masks = array(masks.typecode, masks)
+            literals = array('H', literals)
+            masks.byteswap()
+            literals.byteswap()
+        return b''.join(head + [
+            masks.tobytes(), b'\0' * (offset % 2), literals.tobytes()
+        ])
+
+    def __len__(self):
+        return len(self._masks)
 
     def __iter__(self):
-        return iter(self._graph)
+        # Masks from a lattice aren't members of CharClass.
+        cls = CharClass if self._classifier.lattice is None else int
+        for m, l in zip(self._masks, self._literals):
+            yield chr(l) if l != NO_LITERAL else cls(m)
 
-    def conflate(self, other: 'Graph'):
-        i = 0
-        for c in other:
-            # Conflate the current value at the specified index in this graph
-            # with the value from the other graph.
-            try:
-                self._graph[i] = self._conflate(self._graph[i], c)
-            except IndexError:
-                self._graph.extend(self._conflate(self._graph[i], c))
-            i += 1
+    def __getstate__(self):
+        # There's no need to pickle the default classifier.
+        return self._masks, self._literals, (
+            self._classifier
+            if self._classifier is not DEFAULT_CLASSIFIER else None
+        )
+
+    def __setstate__(self, state):
+        self._masks, self._literals, classifier = state
+        self._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+
+    @property
+    def masks(self) -> np.ndarray:
+        """
+        Get a copy of the character class masks.
+
+        :return: the character class mask at each position
+        """
+        return np.array(self._masks, dtype=self._classifier.dtype)
+
+    @property
+    def literals(self) -> np.ndarray:
+        """
+        Get a copy of the literal code points.
+
+        :return: the literal code point at each position (or
+            :py:data:`NO_LITERAL` where the position holds no literal)
+        """
+        return np.array(self._literals, dtype=np.uint16)
+
+    def _views(self, stop: int = None):
+        """
+        Get writable (zero-copy) views of the masks and literals.
+
+        .. note::
+
+            The buffers can't be resized while the views are alive.
+
+        :param stop: the position at which the views stop
+        :return: a tuple containing the masks and the literals
+        """
+        return (
+            np.frombuffer(self._masks, dtype=self._classifier.dtype)[:stop],
+            np.frombuffer(self._literals, dtype=np.uint16)[:stop]
+        )
+
+    def conflate(self, other: 'Graph' or str or bytes):
+        """
+        Conflate another graph (or a record) into this one.
+
+        :param other: the other graph, or a record (a string or a bytes-like
+            object)
+        :raises ValueError: if the other graph's classifier uses a different
+            lattice
+        """
+        if not isinstance(other, Graph):
+            # There's no need to make a graph out of the record.
+            codes = _record_codes(other)
+            self._conflate_codes(
+                codes[np.newaxis],
+                None if len(codes) == len(self._masks)
+                else np.array([len(codes)]))
+            return
+        if other._classifier.lattice != self._classifier.lattice:
+            raise ValueError('The graphs use different lattices.')
+        if _INSTRUMENTED:
+            _count('graphs')
+        # The positions this graph doesn't have yet were empty in every
+        # record conflated so far.
+        m = len(other)
+        if m > len(self._masks):
+            self._grow(m)
+        masks, literals = self._views()
+        other_masks, other_literals = other._views()
+        masks[:m] |= other_masks
+        literals[:m][literals[:m] != other_literals] = NO_LITERAL
+        # ...and the positions the other graph doesn't have were empty in
+        # every record conflated into it.
+        masks[m:] |= np.uint8(CharClass.EMPTY)
+        literals[m:] = NO_LITERAL
+
+    def conflate_many(self, records: Iterable[str or bytes]):
+        """
+        Conflate a batch of records into this graph in a single vectorized
+        pass.  The batch is encoded as a 2-D array of character class masks
+        (one row per record, with shorter records padded) which is reduced
+        with a bitwise OR along the record axis.  The result is the same as
+        calling :py:meth:`conflate` once for each record: a position keeps
+        its exact character only if the graph and every record agree on it.
+
+        :param records: the records
+        """
+        with stage('encode'):
+            codes, lengths = encode_ragged(records)
+        with stage('conflate'):
+            self._conflate_codes(codes, lengths)
+
+    def conflate_aligned(self,
+                         records: Iterable[str or bytes],
+                         band: int = 4):
+        """
+        Conflate a batch of records into this graph, lining each one up with
+        the graph first (so fields that have been padded or shifted by a few
+        characters still fall into the same positions).
+
+        :param records: the records
+        :param band: the greatest number of characters by which a record
+            may be shifted (beyond the difference between its length and
+            the graph's)
+        :raises ValueError: if the band is negative
+        """
+        from .alignment import conflate_aligned  # (It imports this module.)
+        conflate_aligned(self, records, band)
+
+    def _conflate_codes(self,
+                        codes: np.ndarray,
+                        lengths: np.ndarray = None):
+        """
+        Conflate a batch of records, encoded as a 2-D array of code points,
+        into this graph.
+
+        :param codes: the code points (one row per record)
+        :param lengths: the length of each record (if the records are padded,
+            in which case the codes beyond the end of each record are
+            ignored)
+        :raises ValueError: if the records aren't padded and their length
+            doesn't match the graph's
+        """
+        n = len(self._masks)
+        width = codes.shape[1]
+        if lengths is None and width != n:
+            raise ValueError(
+                'Every record must have a length of {}.'.format(n))
+        if codes.shape[0] == 0:
+            return  # There's nothing to do.
+        if _INSTRUMENTED:
+            _count('records', codes.shape[0])
+        if width > n:
+            self._grow(width)
+        masks, literals = self._views()
+        classes = self._classifier.classify_codes(codes)
+        agree = codes == literals[:width]
+        if lengths is not None and lengths.min() < width:
+            # The positions beyond the end of a record are empty.
+            absent = np.arange(width) >= lengths[:, np.newaxis]
+            classes[absent] = CharClass.EMPTY
+            agree &= ~absent
+        # OR all the records' masks together, position by position.
+        masks[:width] |= np.bitwise_or.reduce(classes, axis=0)
+        # Positions keep their literals only if every record agrees.
+        literals[:width][~agree.all(axis=0)] = NO_LITERAL
+        # The positions beyond the end of every record are empty.
+        masks[width:] |= np.uint8(CharClass.EMPTY)
+        literals[width:] = NO_LITERAL
+
+    def compile(self):
+        """
+        Compile this graph into a matcher that checks records against it.
+
+        .. note::
+
+            The matcher takes a snapshot of the graph, so it won't see
+            records that are conflated into the graph later.
+
+        :return: the matcher
+        :rtype: :py:class:`aliqat.matchers.Matcher`
+        """
+        from .matchers import Matcher  # (The matchers module imports this.)
+        with stage('compile'):
+            return Matcher(self)
 
     @staticmethod
-    def _conflate(a: str or CharClass, b: str or CharClass):
+    def _conflate(a: str or CharClass,
+                  b: str or CharClass,
+                  classifier: Classifier = None):
         # If the values are equal, return either one.
         if a == b:
             return a
@@ -95,31 +1061,27 @@ class Graph(object):
         if isinstance(b, str) and len(b) != 1:
             raise ValueError('b must be a single character, flag, or None.')
         # Encode each value.
-        a_enc = Graph._encode(a)
-        b_enc = Graph._encode(b)
+        a_enc = Graph._encode(a, classifier)
+        b_enc = Graph._encode(b, classifier)
         # The conflation result is a's encoding OR (binary) b's encoding.
         return a_enc | b_enc
 
 
     @staticmethod
-    def _encode(c: str) -> CharClass:
-        # TODO: Move special lists of characters to a more visible location!!!
+    def _encode(c: str, classifier: Classifier = None) -> CharClass:
+        if _INSTRUMENTED:
+            _count('encodes')
         # If the argument is already character class (or just an int)...
         if isinstance(c, int):
             return c  # ...we already have our answer.
+        if c is None:
+            return CharClass.EMPTY
         if len(c) != 1:  # Sanity check!  # TODO: Use common logic for check.
             raise ValueError('c must be a single character or None.')
         # Classify the input.
-        if c is None or c in [' ', '\r', '\n']:  # TODO: Move character lists!
-            return CharClass.EMPTY
-        elif c.isdigit():
-            return CharClass.DIGIT
-        elif c.isalpha():
-            return CharClass.ALPHA
-        elif c in ['+', '-', ',', ':', '*', '!', '?', '<', '>', '.']:  # TODO: Move character lists!
-            return CharClass.SPECIAL
-        else:
-            return CharClass.ANY
+        return (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        ).classify_char(c)
 
     @staticmethod
     def _str(i: str or CharClass):
@@ -129,11 +1091,442 @@ class Graph(object):
             return i
 
     def __str__(self):
-        x = [self._str(i) for i in self._graph]
-        return ''.join([self._str(i) for i in self._graph])
+        return render_codes(
+            *self._views(), classifier=self._classifier
+        ).tobytes().decode('utf-32-le')
+
+
+
+def render_codes(masks: np.ndarray,
+                 literals: np.ndarray,
+                 classifier: Classifier = None) -> np.ndarray:
+    """
+    Get the code points of the characters that represent positions: the
+    literal, if the position holds one, or else the glyph for its mask (see
+    :py:data:`GLYPHS` and :py:meth:`Classifier.glyph_codes`).
+
+    :param masks: the character class masks
+    :param literals: the literal code points
+    :param classifier: the classifier that assigned the masks
+    :return: the code points (as little-endian 32-bit integers, so their
+        bytes can be decoded as UTF-32)
+    """
+    glyphs = (
+        classifier if classifier is not None else DEFAULT_CLASSIFIER
+    ).glyph_codes(masks)
+    return np.where(literals != NO_LITERAL, literals, glyphs).astype('<u4')
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of (at most) a given size.
+
+    :param iterable: the iterable
+    :param size: the maximum size of each chunk
+    :return: an iterator over the chunks
+    """
+    it = iter(iterable)
+    chunk = list(islice(it, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(it, size))
+
+
+def _record_codes(record: str or bytes) -> np.ndarray:
+    """
+    Get the code points of a single record.
+
+    :param record: the record (a string or a bytes-like object)
+    :return: the code points
+    """
+    if isinstance(record, str):
+        try:
+            return np.frombuffer(record.encode('latin-1'), dtype=np.uint8)
+        except UnicodeEncodeError:
+            return np.frombuffer(record.encode('utf-32-le'), dtype=np.uint32)
+    return np.frombuffer(record, dtype=np.uint8)
+
+
+def encode_ragged(records: Iterable[str or bytes]) -> Tuple[np.ndarray,
+                                                            np.ndarray]:
+    """
+    Encode a batch of records that may have different lengths as a 2-D
+    array of code points.  Records shorter than the longest one are padded
+    (with zeros).
+
+    :param records: the records (strings or bytes-like objects)
+    :return: a tuple containing an array with one row per record and one
+        column per character (of the longest record) and an array of the
+        records' lengths
+    """
+    records = list(records)
+    lengths = np.fromiter(
+        (len(r) for r in records), dtype=np.int64, count=len(records))
+    width = int(lengths.max()) if len(records) else 0
+    if not len(records) or lengths.min() == width:
+        return encode_records(records, width), lengths
+    if isinstance(records[0], str):
+        # Numpy pads the shorter strings.
+        return np.array(
+            records, dtype='U{}'.format(width)
+        ).view(np.uint32).reshape(len(records), width), lengths
+    codes = np.zeros((len(records), width), dtype=np.uint8)
+    for i, record in enumerate(records):
+        codes[i, :len(record)] = np.frombuffer(record, dtype=np.uint8)
+    return codes, lengths
+
+
+def encode_records(records: Iterable[str or bytes],
+                   width: int) -> np.ndarray:
+    """
+    Encode a batch of records as a 2-D array of code points.
+
+    :param records: the records (strings or bytes-like objects)
+    :param width: the length every record must have
+    :return: an array with one row per record and one column per character
+    :raises ValueError: if a record's length doesn't match the width
+    """
+    records = list(records)
+    for record in records:
+        if len(record) != width:
+            raise ValueError(
+                'Every record must have a length of {}.'.format(width))
+    if width == 0 or not records:
+        return np.zeros((len(records), width), dtype=np.uint32)
+    if isinstance(records[0], str):
+        return np.array(
+            records, dtype='U{}'.format(width)
+        ).view(np.uint32).reshape(len(records), width)
+    # Bytes-like records are copied once, into a single buffer.
+    return np.frombuffer(
+        b''.join(records), dtype=np.uint8
+    ).reshape(len(records), width)
+
+
+def conflate_batch(records: Iterable[str],
+                   chunk_size: int = 10000,
+                   classifier: Classifier = None,
+                   workers: int = None) -> Graph:
+    """
+    Create a graph by conflating many records (which may have different
+    lengths).  The records are conflated in vectorized chunks (see
+    :py:meth:`Graph.conflate_many`).
+
+    Since conflation is associative and commutative, the chunks may also be
+    conflated in parallel by a pool of worker processes, each of which
+    returns a partial graph.  The partial graphs are then conflated into the
+    result, which is identical to the one the serial path produces.
+
+    :param records: the records
+    :param chunk_size: the number of records conflated in each pass
+    :param classifier: the classifier used to classify characters
+    :param workers: the number of worker processes (`None` or 1 to conflate
+        the records in this process)
+    :return: the conflated graph
+    :raises ValueError: if there are no records
+    """
+    with stage('conflate_batch'):
+        return _conflate_batch(records, chunk_size, classifier, workers)
+
+
+def _conflate_batch(records: Iterable[str],
+                    chunk_size: int,
+                    classifier: Classifier or None,
+                    workers: int or None) -> Graph:
+    """
+    Create a graph by conflating many records (see
+    :py:func:`conflate_batch`).
+    """
+    if workers is not None and workers > 1:
+        g = _reduce(
+            _map(workers, conflate_batch,
+                 ((chunk, chunk_size, classifier)
+                  for chunk in _chunks(records, chunk_size)))
+        )
+        if g is None:
+            raise ValueError('At least one record is required.')
+        return g
+    it = iter(records)
+    try:
+        g = Graph(next(it), classifier=classifier)
+    except StopIteration:
+        raise ValueError('At least one record is required.')
+    for chunk in _chunks(it, chunk_size):
+        g.conflate_many(chunk)
+    return g
+
+
+def _map(workers: int,
+         fn: Callable,
+         args: Iterable[tuple]) -> Iterator:
+    """
+    Call a function in a pool of worker processes for each set of arguments,
+    keeping a bounded number of calls in flight.
+
+    :param workers: the number of worker processes
+    :param fn: the function
+    :param args: the arguments for each call
+    :return: an iterator over the results (in the order of the arguments)
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for a in args:
+            pending.append(pool.submit(fn, *a))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _reduce(graphs: Iterable[Graph or None]) -> Graph or None:
+    """
+    Conflate partial graphs (each learned from a shard of the same records)
+    into one.
+
+    :param graphs: the partial graphs (`None` for a shard without records)
+    :return: the conflated graph (or `None` if there were no records)
+    """
+    g = None
+    for partial in graphs:
+        if partial is None:
+            continue
+        if g is None:
+            g = partial
+            continue
+        g.conflate(partial)
+    return g
+
+
+def learn_from_file(path: str,
+                    record_length: int = None,
+                    delimiter: bytes = b'\r\n',
+                    chunk_size: int = 10000,
+                    classifier: Classifier = None,
+                    workers: int = None) -> Graph:
+    """
+    Create a graph by conflating every record in an ALI dump file.  The file
+    is memory-mapped and its records are fed to the conflation engine in
+    fixed-size chunks without decoding them.
+
+    If a record length is given, the file is read as a sequence of
+    fixed-length records, each followed by the delimiter (which may be
+    empty).  Otherwise the records are separated by the delimiter (and may
+    have different lengths) and empty records (blank lines) are skipped.
+
+    The file may also be split into shards that are learned in parallel by a
+    pool of worker processes.  The result is identical to the one the serial
+    path produces.
+
+    :param path: the path to the file
+    :param record_length: the length of each record
+    :param delimiter: the bytes that separate (or terminate) the records
+    :param chunk_size: the number of records conflated in each pass
+    :param classifier: the classifier used to classify characters
+    :param workers: the number of worker processes (`None` or 1 to learn the
+        file in this process)
+    :return: the conflated graph
+    :raises ValueError: if the record length isn't positive or the file
+        contains no records
+    """
+    with stage('learn_from_file'):
+        return _learn_from_file(
+            path, record_length, delimiter, chunk_size, classifier, workers)
+
+
+def _learn_from_file(path: str,
+                     record_length: int or None,
+                     delimiter: bytes or None,
+                     chunk_size: int,
+                     classifier: Classifier or None,
+                     workers: int or None) -> Graph:
+    """
+    Create a graph by conflating every record in an ALI dump file (see
+    :py:func:`learn_from_file`).
+    """
+    delimiter = delimiter if delimiter is not None else b''
+    if record_length is None and not delimiter:
+        raise ValueError('A record length or a delimiter is required.')
+    if record_length is not None and record_length <= 0:
+        raise ValueError('The record length must be positive.')
+    size = os.stat(path).st_size
+    if size == 0:
+        raise ValueError('The file contains no records.')
+    if workers is not None and workers > 1:
+        # Fixed-length records are sharded by record, delimited records by
+        # byte offset (each shard takes the records that start within it).
+        total = (
+            _fixed_count(size, record_length, delimiter)
+            if record_length is not None else size
+        )
+        step = max(-(-total // (workers * _SHARDS_PER_WORKER)), 1)
+        g = _reduce(
+            _map(workers, _learn_shard,
+                 ((path, record_length, delimiter, chunk_size, classifier,
+                   start, start + step)
+                  for start in range(0, total, step)))
+        )
+    else:
+        g = _learn_shard(
+            path, record_length, delimiter, chunk_size, classifier)
+    if g is None:
+        raise ValueError('The file contains no records.')
+    return g
+
+
+_SHARDS_PER_WORKER: int = 4  #: the number of file shards for each worker
+
+
+def _learn_shard(path: str,
+                 record_length: int or None,
+                 delimiter: bytes,
+                 chunk_size: int,
+                 classifier: Classifier or None,
+                 start: int = 0,
+                 stop: int = None) -> Graph or None:
+    """
+    Create a graph by conflating a shard of the records in an ALI dump file.
+
+    :param path: the path to the file
+    :param record_length: the length of each record
+    :param delimiter: the bytes that separate (or terminate) the records
+    :param chunk_size: the number of records conflated in each pass
+    :param classifier: the classifier used to classify characters
+    :param start: where the shard starts (a record index for fixed-length
+        records, otherwise a byte offset)
+    :param stop: where the shard stops
+    :return: the conflated graph (or `None` if the shard has no records)
+    """
+    g: Graph = None
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        chunks = (
+            _fixed_chunks(
+                mm, record_length, delimiter, chunk_size, start, stop)
+            if record_length is not None
+            else _delimited_chunks(mm, delimiter, chunk_size, start, stop)
+        )
+        codes = None
+        try:
+            for codes, lengths in chunks:
+                if g is None:
+                    g = Graph._from_codes(
+                        codes[0] if lengths is None
+                        else codes[0, :lengths[0]],
+                        classifier=classifier)
+                g._conflate_codes(codes, lengths)
+            codes = None
+        finally:
+            chunks.close()
+        # If something went wrong, the traceback may still hold views of the
+        # memory map, in which case it's closed when they're collected.
+        mm.close()
+    return g
+
+
+def _fixed_count(size: int, record_length: int, delimiter: bytes) -> int:
+    """
+    Count the fixed-length records in a file.
+
+    :param size: the size of the file
+    :param record_length: the length of each record
+    :param delimiter: the bytes that follow each record
+    :return: the number of records
+    :raises ValueError: if the file doesn't hold whole records
+    """
+    count, remainder = divmod(size, record_length + len(delimiter))
+    # (The last record doesn't need to be followed by the delimiter.)
+    if record_length <= 0 or remainder not in (0, record_length):
+        raise ValueError(
+            'The file does not contain whole records of length {}.'.format(
+                record_length))
+    return count + (1 if remainder else 0)
+
+
+def _fixed_chunks(mm: mmap.mmap,
+                  record_length: int,
+                  delimiter: bytes,
+                  chunk_size: int,
+                  start: int = 0,
+                  stop: int = None) -> Iterator[Tuple[np.ndarray, None]]:
+    """
+    Walk through the fixed-length records in a memory map.
+
+    :param mm: the memory map
+    :param record_length: the length of each record
+    :param delimiter: the bytes that follow each record
+    :param chunk_size: the number of records in each chunk
+    :param start: the index of the first record
+    :param stop: the index at which to stop
+    :return: an iterator over the chunks (zero-copy views of the memory
+        map), each with `None` for its records' lengths (since they aren't
+        padded)
+    :raises ValueError: if the memory map doesn't hold whole records
+    """
+    stride = record_length + len(delimiter)
+    count = _fixed_count(len(mm), record_length, delimiter)
+    stop = count if stop is None else min(stop, count)
+    # The last record may not be followed by the delimiter, in which case
+    # it gets a chunk of its own.
+    whole = min(stop, len(mm) // stride)
+    expected = np.frombuffer(delimiter, dtype=np.uint8)
+    for i in range(start, whole, chunk_size):
+        rows = np.frombuffer(
+            mm, dtype=np.uint8,
+            count=(min(i + chunk_size, whole) - i) * stride,
+            offset=i * stride
+        ).reshape(-1, stride)
+        if not (rows[:, record_length:] == expected).all():
+            raise ValueError('The records are not followed by the delimiter.')
+        yield rows[:, :record_length], None
+        del rows
+    if max(start, whole) < stop:
+        yield np.frombuffer(
+            mm, dtype=np.uint8, count=record_length, offset=whole * stride
+        ).reshape(1, record_length), None
 
 
+def _delimited_chunks(mm: mmap.mmap,
+                      delimiter: bytes,
+                      chunk_size: int,
+                      start: int = 0,
+                      stop: int = None) -> Iterator[Tuple[np.ndarray,
+                                                          np.ndarray]]:
+    """
+    Walk through the delimited records in a memory map.
 
+    :param mm: the memory map
+    :param delimiter: the bytes that separate the records
+    :param chunk_size: the number of records in each chunk
+    :param start: the offset at which to start (the first record is the
+        first one that starts at or after this offset)
+    :param stop: the offset at which to stop (the last record is the last
+        one that starts before this offset)
+    :return: an iterator over the chunks (see :py:func:`encode_ragged`)
+    """
+    size = len(mm)
+    stop = size if stop is None else min(stop, size)
+    if start > 0:
+        # Skip ahead to the end of the delimiter that ends at (or after) the
+        # start.
+        p = mm.find(delimiter, max(start - len(delimiter), 0))
+        start = p + len(delimiter) if p >= 0 else size
+    view = memoryview(mm)
+    try:
+        chunk: List[memoryview] = []
+        while start < stop:
+            end = mm.find(delimiter, start)
+            end = end if end >= 0 else size
+            if end > start:  # Skip empty records.
+                chunk.append(view[start:end])
+                if len(chunk) == chunk_size:
+                    yield encode_ragged(chunk)
+                    chunk = []
+            start = end + len(delimiter)
+        if chunk:
+            yield encode_ragged(chunk)
+        del chunk
+    finally:
+        view.release()
 
 
 def graph(s: str) -> Graph:
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: ingest
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Keep the graphs current while the records keep coming.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Hashable, List, Set, Tuple
+from .dedup import RecordCache
+from .framing import DelimitedFramer, Framer
+from .graphs import Classifier, Graph
+from .matchers import Matcher
+
+
+class Source(object):
+    """
+    A source is the state kept for each link that feeds records to an
+    :py:class:`Ingester`.
+    """
+    __slots__ = (
+        'key', 'graph', 'matcher', 'records', 'mismatches', 'cache'
+    )
+
+    def __init__(self, key: Hashable):
+        """
+
+        :param key: the key that identifies the source
+        """
+        self.key: Hashable = key  #: the key that identifies the source
+        self.graph: Graph = None  #: the graph learned from the source
+        self.matcher: Matcher = None  #: the compiled graph
+        self.records: int = 0  #: the number of records received
+        #: the number of records that didn't match the graph (as it was when
+        #: they arrived)
+        self.mismatches: int = 0
+        #: the cache of records already conflated (if the ingester skips
+        #: duplicates)
+        self.cache: RecordCache = None
+
+
+def _peer(transport: asyncio.Transport) -> Hashable:
+    """
+    Get the key of the source at the other end of a connection.
+
+    :param transport: the connection's transport
+    :return: the peer's address
+    """
+    return transport.get_extra_info('peername')
+
+
+# (Reading into the framer's buffer needs Python 3.7.  Before that, each
+# chunk is copied into it.)
+_Protocol = getattr(asyncio, 'BufferedProtocol', asyncio.Protocol)
+
+
+class _Connection(_Protocol):
+    """
+    A connection reads a source's bytes straight into its framer's buffer
+    and puts the records on the ingester's queue.  When the queue is full, it
+    stops reading until the records it's holding have been put on the queue.
+    """
+    def __init__(self, ingester: 'Ingester'):
+        """
+
+        :param ingester: the ingester
+        """
+        self._ingester = ingester
+        self._framer: Framer = ingester._framer()
+        self._transport: asyncio.Transport = None
+        self._key: Hashable = None
+        # the records waiting for room on the queue
+        self._waiting: Deque[Tuple[Hashable, bytes]] = deque()
+
+    def connection_made(self, transport: asyncio.Transport):
+        self._transport = transport
+        self._key = self._ingester._source(transport)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._framer.buffer(self._ingester._read_size)
+
+    def buffer_updated(self, nbytes: int):
+        self._put(self._framer.commit(nbytes))
+
+    def data_received(self, data: bytes):
+        self._put(self._framer.feed(data))
+
+    def eof_received(self):
+        self._put(self._framer.flush())
+
+    def _put(self, records: List[memoryview]):
+        """
+        Put records on the queue (or hold on to them until there's room).
+
+        :param records: the records
+        """
+        # The records are views of the framer's buffer, which is about to be
+        # reused, so they're copied onto the queue.
+        queue, waiting = self._ingester._queue, self._waiting
+        for record in records:
+            item = (self._key, bytes(record))
+            if waiting:
+                waiting.append(item)
+                continue
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                waiting.append(item)
+                self._transport.pause_reading()
+                self._ingester._track(asyncio.ensure_future(self._drain()))
+
+    async def _drain(self):
+        """
+        Put the waiting records on the queue, then start reading again.
+        """
+        while self._waiting:
+            await self._ingester._queue.put(self._waiting[0])
+            self._waiting.popleft()
+        if not self._transport.is_closing():
+            self._transport.resume_reading()
+
+
+class Ingester(object):
+    """
+    An ingester reads ALI records from TCP connections and keeps a graph (and
+    a compiled matcher) for each source up to date.  Each connection gets its
+    own :py:class:`aliqat.framing.Framer` to cut the records out of the
+    stream (by default, at the delimiter), and the bytes are read straight
+    into the framer's buffer.
+
+    Connections put their records on a bounded queue.  When the queue is full
+    they stop reading (so TCP flow control pushes back on the sender) until
+    there's room.  A single consumer takes records off the queue in batches
+    so the cost of conflating (and recompiling) is shared by all of the
+    records in a batch.
+    """
+    def __init__(self,
+                 delimiter: bytes = b'\r\n',
+                 batch_size: int = 1000,
+                 queue_size: int = 10000,
+                 source: Callable[[asyncio.Transport], Hashable] = _peer,
+                 classifier: Classifier = None,
+                 dedup: int = 0,
+                 framer: Callable[[], Framer] = None,
+                 read_size: int = 65536):
+        """
+
+        :param delimiter: the bytes that separate the records (unless there's
+            a framer)
+        :param batch_size: the maximum number of records conflated at once
+        :param queue_size: the maximum number of records waiting to be
+            conflated
+        :param source: a function that gets the key of the source at the
+            other end of a connection from its transport (by default, the
+            peer's address)
+        :param classifier: the classifier used to classify characters
+        :param dedup: the number of recent records to remember for each
+            source so that duplicates (rebids and retransmits) aren't
+            conflated again (0 to conflate every record)
+        :param framer: a function that creates the framer for a connection
+        :param read_size: the minimum amount of room in a framer's buffer
+            for each read from a connection
+        """
+        self._framer = (
+            framer if framer is not None
+            else lambda: DelimitedFramer(delimiter)
+        )
+        self._read_size = read_size
+        self._batch_size = batch_size
+        self._queue_size = queue_size
+        self._source = source
+        self._classifier = classifier
+        self._dedup = dedup
+        self._sources: Dict[Hashable, Source] = OrderedDict()
+        self._queue: asyncio.Queue = None
+        self._consumer: asyncio.Future = None
+        self._server = None
+        # the connections' unfinished attempts to put records on the queue
+        self._pending: Set[asyncio.Future] = set()
+
+    @property
+    def sources(self) -> Dict[Hashable, Source]:
+        """
+        Get the sources.
+
+        :return: the sources, by key
+        """
+        return self._sources
+
+    @property
+    def server(self):
+        """
+        Get the server that accepts the connections.
+
+        :return: the server (or `None` if the ingester hasn't been started)
+        """
+        return self._server
+
+    async def start(self, host: str, port: int):
+        """
+        Start accepting connections.
+
+        :param host: the host
+        :param port: the port (0 to pick any free port)
+        """
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._consumer = asyncio.ensure_future(self._consume())
+        self._server = await asyncio.get_event_loop().create_server(
+            lambda: _Connection(self), host, port)
+
+    async def drain(self):
+        """
+        Wait until every record received so far has been conflated.
+        """
+        await self._settle()
+        await self._queue.join()
+
+    async def close(self):
+        """
+        Stop accepting connections, then conflate whatever is left.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self._settle()
+        if self._consumer is not None:
+            await self._queue.put(None)
+            await self._consumer
+            self._consumer = None
+
+    async def _settle(self):
+        """
+        Wait until the connections have put every record they're holding on
+        the queue.
+        """
+        while self._pending:
+            await asyncio.wait(list(self._pending))
+
+    def _track(self, future: asyncio.Future):
+        """
+        Keep track of a connection's attempt to put records on the queue
+        (so that closing the ingester can wait for it).
+
+        :param future: the attempt
+        """
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    async def _consume(self):
+        """
+        Take records off the queue, in batches, and conflate them.
+        """
+        while True:
+            item = await self._queue.get()
+            batch = [item]
+            while item is not None and len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                batch.append(item)
+            try:
+                self.conflate([i for i in batch if i is not None])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if item is None:
+                return
+
+    def conflate(self, batch: List[Tuple[Hashable, bytes]]):
+        """
+        Conflate a batch of records into their sources' graphs.
+
+        :param batch: the records, with the keys of their sources
+        """
+        records: Dict[Hashable, List[bytes]] = OrderedDict()
+        for key, record in batch:
+            records.setdefault(key, []).append(record)
+        for key, _records in records.items():
+            source = self._sources.get(key)
+            if source is None:
+                source = Source(key)
+                if self._dedup:
+                    source.cache = RecordCache(self._dedup)
+                self._sources[key] = source
+            source.records += len(_records)
+            if source.cache is not None:
+                # Duplicates matched (and were conflated) the first time.
+                _records = source.cache.unique(_records)
+                if not _records:
+                    continue
+            if source.graph is None:
+                source.graph = Graph(_records[0], classifier=self._classifier)
+            # Check (and conflate) the records in one go.
+            if source.matcher is not None:
+                ok, _ = source.matcher.match_many(_records)
+                source.mismatches += len(_records) - int(ok.sum())
+            source.graph.conflate_many(_records)
+            source.matcher = source.graph.compile()
+
+
+async def serve(host: str,
+                port: int,
+                ingester: Ingester = None,
+                **kwargs) -> Ingester:
+    """
+    Start ingesting ALI records from TCP connections.
+
+    :param host: the host
+    :param port: the port (0 to pick any free port)
+    :param ingester: the ingester (if `None`, one is created with the
+        remaining keyword arguments)
+    :return: the (started) ingester
+    """
+    ingester = ingester if ingester is not None else Ingester(**kwargs)
+    await ingester.start(host, port)
+    return ingester
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: instruments
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Where does the time go?
+
+Instrumentation is off until :py:func:`instrument` turns it on.  While it's
+off, the hooks in the hot paths cost a single check of an empty list.
+
+.. code-block:: python
+
+    with instrument() as counters:
+        g = learn_from_file('ali.dat')
+    print(counters.records, counters.seconds)
+
+.. note::
+
+    The counters are shared by every thread, and work done by worker
+    processes (see the ``workers`` parameters) isn't counted.
+"""
+
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+#: the counters that are currently collecting (innermost last)
+ACTIVE: List['Counters'] = []
+
+
+class Counters(object):
+    """
+    Counters collect what happens while instrumentation is on.
+    """
+    __slots__ = (
+        'records', 'graphs', 'extensions', 'encodes', 'duplicates',
+        'matches', 'mismatches', 'seconds', 'calls', 'peak', 'snapshots',
+        '_trace'
+    )
+
+    def __init__(self, trace_memory: bool = False):
+        """
+
+        :param trace_memory: `True` to take a :py:mod:`tracemalloc` snapshot
+            at the end of each stage
+        """
+        self.records: int = 0  #: the number of records conflated
+        self.graphs: int = 0  #: the number of graphs conflated into others
+        #: the number of positions added to graphs by longer records
+        self.extensions: int = 0
+        self.encodes: int = 0  #: the number of characters encoded one by one
+        #: the number of duplicate records that didn't need conflating
+        self.duplicates: int = 0
+        self.matches: int = 0  #: the number of records checked by matchers
+        self.mismatches: int = 0  #: the number of those that didn't match
+        self.seconds: Dict[str, float] = {}  #: the time spent in each stage
+        self.calls: Dict[str, int] = {}  #: the number of times in each stage
+        #: the most memory traced at the end of any stage (in bytes)
+        self.peak: int = 0
+        #: the snapshots taken at the end of each stage, with the stages'
+        #: names
+        self.snapshots: List[Tuple[str, tracemalloc.Snapshot]] = []
+        self._trace = trace_memory
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(k, v) for k, v in self.as_dict().items()))
+
+    def as_dict(self) -> Dict[str, object]:
+        """
+        Get the counters (but not the snapshots) as a dictionary.
+
+        :return: the counters, by name
+        """
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if not name.startswith('_') and name != 'snapshots'
+        }
+
+
+def count(name: str, n: int = 1):
+    """
+    Add to a counter in every active set of counters.
+
+    :param name: the name of the counter
+    :param n: the amount to add
+    """
+    for counters in ACTIVE:
+        setattr(counters, name, getattr(counters, name) + n)
+
+
+class _Stage(object):
+    """
+    A stage times the code in a ``with`` block.
+    """
+    __slots__ = ('_name', '_started')
+
+    def __init__(self, name: str):
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self._started
+        for counters in ACTIVE:
+            counters.seconds[self._name] = (
+                counters.seconds.get(self._name, 0.0) + elapsed)
+            counters.calls[self._name] = counters.calls.get(self._name, 0) + 1
+            if counters._trace and tracemalloc.is_tracing():
+                counters.peak = max(
+                    counters.peak, tracemalloc.get_traced_memory()[1])
+                counters.snapshots.append(
+                    (self._name, tracemalloc.take_snapshot()))
+
+
+class _Nothing(object):
+    """
+    A stand-in for a stage (when instrumentation is off).
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NOTHING = _Nothing()
+
+
+def stage(name: str):
+    """
+    Time a stage (if instrumentation is on).
+
+    .. code-block:: python
+
+        with stage('parse'):
+            ...
+
+    :param name: the name of the stage
+    :return: a context manager
+    """
+    return _Stage(name) if ACTIVE else _NOTHING
+
+
+class instrument(object):
+    """
+    Turn instrumentation on for the code in a ``with`` block.  Blocks may be
+    nested, in which case the outer blocks' counters include everything the
+    inner blocks' counters do.
+    """
+    __slots__ = ('_counters', '_started')
+
+    def __init__(self, trace_memory: bool = False):
+        """
+
+        :param trace_memory: `True` to trace memory (with
+            :py:mod:`tracemalloc`) and take a snapshot at the end of each
+            stage
+        """
+        self._counters = Counters(trace_memory=trace_memory)
+        self._started = False
+
+    def __enter__(self) -> Counters:
+        if self._counters._trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        ACTIVE.append(self._counters)
+        return self._counters
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        ACTIVE.remove(self._counters)
+        if self._started:
+            self._counters.peak = max(
+                self._counters.peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            self._started = False
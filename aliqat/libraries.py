@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: libraries
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Which one of these does this record look like?
+"""
+
+from collections import OrderedDict
+from operator import itemgetter
+from typing import (
+    Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+)
+import numpy as np
+from .graphs import (
+    CharClass, Classifier, DEFAULT_CLASSIFIER, Graph, NO_LITERAL
+)
+from .matchers import Matcher
+
+_FREE: int = -1  # the anchor value of a position that isn't an anchor
+_DIGIT: int = 0x100  # the anchor value of a position that only holds digits
+#: the greatest number of probes for the templates of a length
+MAX_PROBES: int = 16
+# A probe is only narrowed (with another position) while it still covers at
+# least this fraction of the templates it's meant to cover.
+_NARROW: float = 0.25
+
+
+class _Entry(NamedTuple):
+    """
+    A template in the library.
+    """
+    graph: Graph  #: the graph
+    matcher: Matcher  #: the compiled graph
+    anchors: np.ndarray  #: the template's anchor value at each position
+
+
+def _getter(positions: Tuple[int, ...]) -> Callable[[list], tuple]:
+    """
+    Get a function that picks the values at some positions out of a list.
+
+    :param positions: the positions
+    :return: the function
+    """
+    if len(positions) == 1:
+        i = positions[0]
+        return lambda b: (b[i],)
+    return itemgetter(*positions)
+
+
+class _Probe(object):
+    """
+    A probe indexes templates by their anchor values at a few positions
+    (which are anchors in every template it indexes).
+    """
+    __slots__ = ('positions', 'getter', 'index')
+
+    def __init__(self, positions: Tuple[int, ...]):
+        """
+
+        :param positions: the positions
+        """
+        self.positions = positions
+        self.getter = _getter(positions)
+        #: the keys of the templates, by their values at the positions
+        self.index: Dict[tuple, List[Hashable]] = {}
+
+
+class _Bucket(object):
+    """
+    The templates of a single length.
+    """
+    __slots__ = ('probes', 'loose', 'where', 'stale', '_loose')
+
+    def __init__(self):
+        self.probes: List[_Probe] = []
+        #: the anchor values of the templates no probe indexes
+        self.loose: Dict[Hashable, np.ndarray] = OrderedDict()
+        #: the probe (if any) that indexes each template, and its signature
+        self.where: Dict[Hashable, Tuple[Optional[_Probe], tuple]] = (
+            OrderedDict())
+        #: Should the probes be chosen again?
+        self.stale = False
+        self._loose: Optional[np.ndarray] = None  # the loose anchor values
+
+    def place(self, key: Hashable, anchors: np.ndarray):
+        """
+        Index a template with the first probe whose positions are all
+        anchors in it (or else leave it loose).
+
+        :param key: the template's key
+        :param anchors: the template's anchor values
+        """
+        for probe in self.probes:
+            values = anchors[list(probe.positions)]
+            if (values != _FREE).all():
+                signature = tuple(values.tolist())
+                probe.index.setdefault(signature, []).append(key)
+                self.where[key] = (probe, signature)
+                return
+        self.loose[key] = anchors
+        self.where[key] = (None, ())
+        self._loose = None
+        # If too many templates are loose, the probes no longer suit them.
+        if len(self.loose) > max(8, len(self.where) // 8):
+            self.stale = True
+
+    def unplace(self, key: Hashable):
+        """
+        Remove a template from the index.
+
+        :param key: the template's key
+        """
+        probe, signature = self.where.pop(key)
+        if probe is None:
+            del self.loose[key]
+            self._loose = None
+            return
+        keys = probe.index[signature]
+        keys.remove(key)
+        if not keys:
+            del probe.index[signature]
+
+    def match_loose(self, values: np.ndarray) -> List[Hashable]:
+        """
+        Get the keys of the templates no probe indexes whose anchor values
+        match a record's.
+
+        :param values: the record's values
+        :return: the keys
+        """
+        if not self.loose:
+            return []
+        if self._loose is None:
+            self._loose = np.array(list(self.loose.values()))
+        fits = ((self._loose == _FREE) | (self._loose == values)).all(axis=1)
+        keys = list(self.loose)
+        return [keys[i] for i in np.flatnonzero(fits).tolist()]
+
+
+class GraphLibrary(object):
+    """
+    A graph library holds many templates (learned graphs) and finds the one
+    that best matches a record without checking every template.
+
+    Each template has anchor positions: the positions that hold literals and
+    the ones that only ever hold digits.  A record can only match a template
+    exactly if it has the template's length and the same values at the
+    template's anchors.  For the templates of each length, the library
+    chooses a few probes, each a handful of positions that are anchors in as
+    many of the templates as possible, and indexes each template with the
+    first probe whose positions are all anchors in it.  Looking up a record
+    costs one dictionary lookup for each probe (however many templates there
+    are) and the library only measures the distance to the templates it
+    finds (and the few that no probe indexes).
+
+    If the library's classifier has a :py:class:`aliqat.graphs.Lattice`, only
+    the literals are anchors.
+    """
+    def __init__(self,
+                 signature_size: int = 16,
+                 classifier: Classifier = None):
+        """
+
+        :param signature_size: the maximum number of positions in a probe
+        :param classifier: the classifier used to classify the characters in
+            records' signatures
+        """
+        self._signature_size = signature_size
+        self._classifier = (
+            classifier if classifier is not None else DEFAULT_CLASSIFIER
+        )
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._buckets: Dict[int, _Bucket] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def __getitem__(self, key: Hashable) -> Graph:
+        return self._entries[key].graph
+
+    def add(self, key: Hashable, graph: Graph):
+        """
+        Add a template to the library (replacing any template that already
+        has the key).
+
+        .. note::
+
+            The library compiles the graph when it's added, so it won't see
+            records that are conflated into the graph later.  (Add it again
+            to update it.)
+
+        :param key: the key that identifies the template
+        :param graph: the template
+        """
+        if key in self._entries:
+            self.remove(key)
+        masks, literals = graph.masks, graph.literals
+        # The anchor values are whatever a record that matches the template
+        # would produce (see :py:meth:`_values`).
+        is_literal = (literals != NO_LITERAL) & (literals <= 0xff)
+        is_digit = (masks == CharClass.DIGIT) & (
+            self._classifier.lattice is None)
+        anchors = np.where(
+            is_digit, _DIGIT, np.where(is_literal, literals, _FREE)
+        ).astype(np.int16)
+        self._entries[key] = _Entry(
+            graph=graph, matcher=graph.compile(), anchors=anchors)
+        bucket = self._buckets.get(len(graph))
+        if bucket is None:
+            bucket = self._buckets[len(graph)] = _Bucket()
+        bucket.place(key, anchors)
+
+    def remove(self, key: Hashable):
+        """
+        Remove a template from the library.
+
+        :param key: the key that identifies the template
+        :raises KeyError: if there is no such template
+        """
+        entry = self._entries.pop(key)
+        length = len(entry.graph)
+        bucket = self._buckets[length]
+        bucket.unplace(key)
+        if not bucket.where:
+            del self._buckets[length]  # Clean up after ourselves.
+
+    def probes(self, length: int) -> int:
+        """
+        Get the number of lookups it takes to find the candidates for a
+        record.
+
+        :param length: the length of the record
+        :return: the number of lookups
+        """
+        bucket = self._bucket(length)
+        return len(bucket.probes) if bucket is not None else 0
+
+    def _bucket(self, length: int) -> Optional[_Bucket]:
+        """
+        Get the templates of a length (choosing their probes again, if
+        they've gone stale).
+
+        :param length: the length
+        :return: the templates (if there are any)
+        """
+        bucket = self._buckets.get(length)
+        if bucket is not None and bucket.stale:
+            bucket = self._buckets[length] = self._choose(bucket)
+        return bucket
+
+    def _choose(self, bucket: _Bucket) -> _Bucket:
+        """
+        Choose the probes for the templates of a length.  Each probe starts
+        with the position that's an anchor in the most templates not yet
+        indexed, then adds positions (that are anchors in the most of those
+        templates) for as long as it still covers a good share of them.
+
+        :param bucket: the templates
+        :return: the templates, with their new probes
+        """
+        keys = list(bucket.where)
+        anchors = np.array([self._entries[k].anchors for k in keys])
+        anchored = anchors != _FREE
+        chosen = _Bucket()
+        left = np.arange(len(keys))
+        while len(left) and len(chosen.probes) < MAX_PROBES:
+            covered, positions = left, []
+            while len(positions) < self._signature_size:
+                counts = anchored[covered].sum(axis=0)
+                counts[positions] = 0
+                p = int(counts.argmax())
+                if counts[p] == 0 or (
+                        positions and counts[p] < _NARROW * len(left)):
+                    break
+                positions.append(p)
+                covered = covered[anchored[covered, p]]
+            if not positions:
+                break  # None of them has any anchors.
+            chosen.probes.append(_Probe(tuple(sorted(positions))))
+            left = np.setdiff1d(left, covered, assume_unique=True)
+        for k, a in zip(keys, anchors):
+            chosen.place(k, a)
+        chosen.stale = False
+        return chosen
+
+    def _values(self, record: str or bytes) -> np.ndarray:
+        """
+        Get the value at each position of a record that's compared with the
+        templates' anchor values.
+
+        :param record: the record
+        :return: the values
+        """
+        if isinstance(record, str):
+            # Characters that can't be encoded can't match the literals.
+            record = record.encode('latin-1', errors='replace')
+        values = np.frombuffer(record, dtype=np.uint8).astype(np.int16)
+        if self._classifier.lattice is None:
+            classes = np.frombuffer(
+                self._classifier.classify(record), dtype=np.uint8)
+            values[classes == CharClass.DIGIT] = _DIGIT
+        return values
+
+    def candidates(self, record: str or bytes) -> List[Hashable]:
+        """
+        Get the keys of the templates whose anchor values match a record's.
+
+        :param record: the record
+        :return: the keys of the candidate templates
+        """
+        bucket = self._bucket(len(record))
+        if bucket is None:
+            return []
+        values = self._values(record)
+        listed = values.tolist()
+        keys: List[Hashable] = []
+        for probe in bucket.probes:
+            keys.extend(probe.index.get(probe.getter(listed), ()))
+        # The templates that no probe indexes are checked directly.
+        keys.extend(bucket.match_loose(values))
+        return keys
+
+    def find(self,
+             record: str or bytes,
+             fallback: bool = True) -> Optional[Tuple[Hashable, int]]:
+        """
+        Find the template that best matches a record, which is the one (among
+        the candidates) from which the record's distance is shortest.
+
+        :param record: the record
+        :param fallback: `True` to consider every template of the record's
+            length if no template's anchor values match the record's
+        :return: a tuple containing the key of the best-matching template and
+            the record's distance from it (see
+            :py:meth:`aliqat.matchers.Matcher.distance`), or `None` if there
+            are no candidates
+        """
+        keys = self.candidates(record)
+        if not keys and fallback:
+            bucket = self._buckets.get(len(record))
+            keys = list(bucket.where) if bucket is not None else []
+        best: Optional[Tuple[Hashable, int]] = None
+        for key in keys:
+            d = self._entries[key].matcher.distance(record)
+            if best is None or d < best[1]:
+                best = (key, d)
+                if d == 0:
+                    break  # It doesn't get any better than this.
+        return best
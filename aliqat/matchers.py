@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: matchers
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Does this record look like the others?
+"""
+
+from typing import Iterable, Tuple
+import numpy as np
+from .graphs import CharClass, Graph, NO_LITERAL, encode_ragged, encode_records
+from .instruments import ACTIVE as _INSTRUMENTED, count as _count, stage
+
+
+class Matcher(object):
+    """
+    A matcher checks records against a compiled snapshot of a
+    :py:class:`Graph`.  A record matches if conflating it into the graph
+    wouldn't change the graph: every character's class is covered by the
+    position's class mask, every position that holds a literal holds that
+    exact character, and the record is no longer than the graph.  (Positions
+    beyond the end of a shorter record are treated as empty.)
+
+    Single records are checked by classifying them through the classifier's
+    lookup table and comparing the results with the graph's masks as big
+    integers, so each check is a handful of operations regardless of the
+    record's length.  (If the classifier's masks are wider than a byte,
+    single records are checked like a batch of one.)
+    """
+    __slots__ = (
+        '_width', '_classifier', '_table', '_masks', '_literals',
+        '_is_literal', '_forbidden', '_literal_mask', '_literal_value',
+        '_optional', '_absent', '_unabsent'
+    )
+
+    def __init__(self, graph: Graph):
+        """
+
+        :param graph: the graph
+        """
+        self._width = len(graph)
+        self._classifier = graph._classifier
+        self._table = self._classifier.table
+        self._masks = graph.masks
+        self._literals = graph.literals
+        self._is_literal = self._literals != NO_LITERAL
+        self._forbidden = self._literal_mask = self._literal_value = None
+        if self._table is not None:
+            self._compile_bytes()
+        # For each position, figure out the first position (at or after it)
+        # that can't be absent.
+        self._optional = (
+            (self._masks & CharClass.EMPTY).astype(bool) & ~self._is_literal
+        )
+        self._absent = [self._width] * (self._width + 1)
+        # ...and how many positions (at or after it) can't be absent.
+        self._unabsent = [0] * (self._width + 1)
+        for i in range(self._width - 1, -1, -1):
+            if self._optional[i]:
+                self._absent[i] = self._absent[i + 1]
+                self._unabsent[i] = self._unabsent[i + 1]
+            else:
+                self._absent[i] = i
+                self._unabsent[i] = self._unabsent[i + 1] + 1
+
+    def _compile_bytes(self):
+        """
+        Compile the big integers that check (bytes-like) records whose
+        characters are classified into single bytes.
+        """
+        # Literals beyond the first 256 code points can't be matched by bytes
+        # so, as far as bytes are concerned, their positions forbid
+        # everything.
+        wide = self._is_literal & (self._literals > 0xff)
+        self._forbidden = int.from_bytes(
+            np.where(wide, 0xff, ~self._masks).astype(np.uint8).tobytes(),
+            'big')
+        narrow = self._is_literal & ~wide
+        self._literal_mask = int.from_bytes(
+            np.where(narrow, 0xff, 0).astype(np.uint8).tobytes(), 'big')
+        self._literal_value = int.from_bytes(
+            np.where(narrow, self._literals, 0).astype(np.uint8).tobytes(),
+            'big')
+
+    def __len__(self):
+        return self._width
+
+    def match(self, record: str or bytes) -> Tuple[bool, int]:
+        """
+        Check a single record.
+
+        :param record: the record
+        :return: a tuple containing a flag that indicates whether or not the
+            record matches and the first offending position (or -1 if the
+            record matches)
+        """
+        narrow = self._table is not None
+        if narrow and isinstance(record, str):
+            try:
+                record = record.encode('latin-1')
+            except UnicodeEncodeError:
+                narrow = False
+        if not narrow:
+            # This one will have to go the long way.
+            ok, first = self.match_many([record])
+            return bool(ok[0]), int(first[0])
+        if _INSTRUMENTED:
+            ok, first = self._match(record)
+            _count('matches')
+            _count('mismatches', 0 if ok else 1)
+            return ok, first
+        return self._match(record)
+
+    def _match(self, record: bytes) -> Tuple[bool, int]:
+        """
+        Check a single (bytes-like) record.
+
+        :param record: the record
+        :return: the result (see :py:meth:`match`)
+        """
+        bad, m = self._bad(record)
+        if bad:
+            # The highest bit that's set belongs to the first bad position.
+            return False, m - 1 - (bad.bit_length() - 1) // 8
+        n = len(record)
+        if n > self._width:
+            return False, self._width
+        if self._absent[n] < self._width:
+            return False, self._absent[n]
+        return True, -1
+
+    def distance(self, record: str or bytes) -> int:
+        """
+        Count the positions at which a single record doesn't match.  (Every
+        character beyond the end of the graph counts as one.)
+
+        :param record: the record
+        :return: the number of offending positions
+        """
+        n = len(record)
+        narrow = self._table is not None
+        if narrow and isinstance(record, str):
+            try:
+                record = record.encode('latin-1')
+            except UnicodeEncodeError:
+                narrow = False
+        if not narrow:
+            # This one will have to go the long way.
+            return int(
+                self.violations(encode_records([record], n)).sum()
+            ) + max(n - self._width - 1, 0)
+        bad, m = self._bad(record)
+        d = m - bad.to_bytes(m, 'big').count(0) if bad else 0
+        if n > self._width:
+            return d + n - self._width
+        return d + self._unabsent[n]
+
+    def _bad(self, record: bytes) -> Tuple[int, int]:
+        """
+        Compare the characters of a single record (or as many of them as
+        there are positions in the graph) with the graph.
+
+        :param record: the record
+        :return: a tuple containing an integer in which every byte that
+            represents an offending position is non-zero (the first position
+            is the most significant byte) and the number of positions that
+            were compared
+        """
+        n = len(record)
+        if n == self._width:
+            head, m = record, n
+            forbidden, literal_value, literal_mask = (
+                self._forbidden, self._literal_value, self._literal_mask
+            )
+        else:
+            m = min(n, self._width)
+            head = record[:m]
+            shift = (self._width - m) * 8
+            forbidden, literal_value, literal_mask = (
+                self._forbidden >> shift,
+                self._literal_value >> shift,
+                self._literal_mask >> shift
+            )
+        bad = int.from_bytes(
+            head.translate(self._table)
+            if isinstance(head, bytes) else self._classifier.classify(head),
+            'big'
+        ) & forbidden
+        if literal_mask:
+            bad |= (int.from_bytes(head, 'big') ^ literal_value) & literal_mask
+        return bad, m
+
+    def match_many(self,
+                   records: Iterable[str or bytes]) -> Tuple[np.ndarray,
+                                                             np.ndarray]:
+        """
+        Check a batch of records (which may have different lengths).
+
+        :param records: the records
+        :return: a tuple containing an array of flags that indicate whether
+            or not each record matches and an array of the first offending
+            position in each record (or -1 for the ones that match)
+        """
+        with stage('encode'):
+            codes, lengths = encode_ragged(records)
+        with stage('match'):
+            return self._match_codes(codes, lengths)
+
+    def _match_codes(self,
+                     codes: np.ndarray,
+                     lengths: np.ndarray = None) -> Tuple[np.ndarray,
+                                                          np.ndarray]:
+        """
+        Check a batch of records, encoded as a 2-D array of code points.
+
+        :param codes: the code points (one row per record)
+        :param lengths: the length of each record (if the records are padded)
+        :return: the results
+        """
+        bad = self.violations(codes, lengths)
+        failed = bad.any(axis=1)
+        if _INSTRUMENTED:
+            _count('matches', len(failed))
+            _count('mismatches', int(failed.sum()))
+        # (A graph with no positions has nothing to point at.)
+        first = (
+            bad.argmax(axis=1) if bad.shape[1]
+            else np.zeros(len(bad), dtype=np.int64))
+        return ~failed, np.where(failed, first, -1)
+
+    def violations(self,
+                   codes: np.ndarray,
+                   lengths: np.ndarray = None) -> np.ndarray:
+        """
+        Find every position at which each record (encoded as a 2-D array of
+        code points) doesn't match.
+
+        :param codes: the code points (one row per record)
+        :param lengths: the length of each record (if the records are padded,
+            in which case the codes beyond the end of each record are
+            ignored)
+        :return: an array of flags with one row per record and one column per
+            position (plus an extra column, if the records are longer than
+            the graph, that flags the excess)
+        """
+        n = min(codes.shape[1], self._width)
+        classes = self._classifier.classify_codes(codes[:, :n])
+        longer = codes.shape[1] > self._width
+        bad = np.zeros(
+            (codes.shape[0], self._width + 1 if longer else self._width),
+            dtype=bool)
+        bad[:, :n] = (
+            ((classes & ~self._masks[:n]) != 0) |
+            (self._is_literal[:n] & (codes[:, :n] != self._literals[:n]))
+        )
+        # The missing positions are treated as empty.
+        bad[:, n:self._width] = ~self._optional[n:]
+        if lengths is not None and len(lengths) and lengths.min() < n:
+            absent = np.arange(n) >= lengths[:, np.newaxis]
+            bad[:, :n][absent] = ~np.broadcast_to(
+                self._optional[:n], absent.shape)[absent]
+        if longer:
+            bad[:, self._width] = (
+                True if lengths is None else lengths > self._width)
+        return bad
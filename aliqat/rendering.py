@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: rendering
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Show me all of them (and what changed).
+
+Rendering a graph as a string (see :py:meth:`aliqat.graphs.Graph.__str__`)
+looks up each position's glyph in a table indexed by mask, so rendering many
+graphs at once costs a few array operations and a single decode.
+"""
+
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+import numpy as np
+from .graphs import Classifier, Graph, NO_LITERAL, render_codes
+
+MISSING: str = '·'  #: stands in for positions beyond the end of a graph
+CHANGED: str = '^'  #: marks the columns in which two graphs differ
+SAME: str = ' '  #: marks the columns in which two graphs agree
+
+
+def render_many(graphs: Iterable[Graph]) -> List[str]:
+    """
+    Render graphs as strings.
+
+    :param graphs: the graphs
+    :return: the strings (in the same order as the graphs)
+    """
+    graphs = list(graphs)
+    if not graphs:
+        return []
+    views = [g._views() for g in graphs]
+    classifier = _shared(graphs)
+    if classifier is not None:
+        masks, literals = (
+            np.concatenate([v[i] for v in views]) for i in range(2))
+        codes = render_codes(masks, literals, classifier)
+    else:
+        # The graphs' masks mean different things, so they're rendered one
+        # by one.
+        codes = np.concatenate([
+            render_codes(*v, classifier=g._classifier)
+            for g, v in zip(graphs, views)
+        ])
+    text = codes.tobytes().decode('utf-32-le')
+    bounds = np.cumsum([0] + [len(v[0]) for v in views]).tolist()
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+class Diff(NamedTuple):
+    """
+    A position-by-position comparison of two graphs.
+    """
+    left: str  #: the first graph, rendered
+    right: str  #: the second graph, rendered
+    markers: str  #: marks the columns in which the graphs differ
+    columns: Tuple[int, ...]  #: the columns in which the graphs differ
+
+    def __str__(self):
+        return '\n'.join((self.left, self.right, self.markers))
+
+    def __bool__(self):
+        return bool(self.columns)
+
+
+def diff(a: Graph, b: Graph) -> Diff:
+    """
+    Compare two graphs position by position.  (A position that's beyond the
+    end of one graph but not the other counts as a difference.)
+
+    :param a: the first graph
+    :param b: the second graph
+    :return: the comparison
+    """
+    return diff_many([(a, b)])[0]
+
+
+def diff_many(pairs: Iterable[Tuple[Graph, Graph]]) -> List[Diff]:
+    """
+    Compare many pairs of graphs position by position.
+
+    :param pairs: the pairs of graphs
+    :return: the comparisons (in the same order as the pairs)
+    :raises ValueError: if the graphs' classifiers use different lattices
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    classifier = _shared([g for pair in pairs for g in pair])
+    if classifier is None:
+        raise ValueError('The graphs use different lattices.')
+    left = _pad([a for a, _ in pairs], classifier)
+    right = _pad([b for _, b in pairs], classifier)
+    width = max(left[0].shape[1], right[0].shape[1])
+    left, right = (_widen(p, width) for p in (left, right))
+    # Positions differ if they're present in one graph but not the other, or
+    # if their masks or literals differ.
+    changed = (
+        (left[2] != right[2]) |
+        (left[2] & ((left[0] != right[0]) | (left[1] != right[1])))
+    )
+    present = left[2] | right[2]
+    text = [_text(*side, classifier=classifier) for side in (left, right)]
+    markers = np.where(changed, ord(CHANGED), ord(SAME)).astype('<u4')
+    markers = markers.tobytes().decode('utf-32-le')
+    diffs: List[Diff] = []
+    for i in range(len(pairs)):
+        # Each row is as wide as the wider graph in its pair.
+        n = int(present[i].sum())
+        start = i * width
+        diffs.append(Diff(
+            left=text[0][start:start + n],
+            right=text[1][start:start + n],
+            markers=markers[start:start + n],
+            columns=tuple(np.flatnonzero(changed[i]).tolist())
+        ))
+    return diffs
+
+
+def _shared(graphs: Sequence[Graph]) -> Classifier or None:
+    """
+    Find a classifier whose masks mean the same thing as every graph's.
+
+    :param graphs: the graphs
+    :return: the classifier (or `None` if the graphs use different
+        lattices)
+    """
+    classifier = graphs[0]._classifier
+    lattice = classifier.lattice
+    for g in graphs:
+        if g._classifier.lattice != lattice:
+            return None
+    return classifier
+
+
+def _pad(graphs: Sequence[Graph],
+         classifier: Classifier) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stack graphs' masks and literals into 2-D arrays, one row per graph,
+    padding the shorter graphs.
+
+    :param graphs: the graphs
+    :param classifier: the classifier that assigned the masks
+    :return: the masks, the literals and whether each position is present
+    """
+    lengths = np.array([len(g) for g in graphs], dtype=np.intp)
+    width = int(lengths.max())
+    masks = np.zeros((len(graphs), width), dtype=classifier.dtype)
+    literals = np.full((len(graphs), width), NO_LITERAL, dtype=np.uint16)
+    for i, g in enumerate(graphs):
+        m, l = g._views()
+        masks[i, :len(m)] = m
+        literals[i, :len(l)] = l
+    present = np.arange(width) < lengths[:, np.newaxis]
+    return masks, literals, present
+
+
+def _widen(padded: Tuple[np.ndarray, np.ndarray, np.ndarray],
+           width: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Widen padded graphs (see :py:func:`_pad`).
+
+    :param padded: the padded graphs
+    :param width: the width
+    :return: the widened graphs
+    """
+    extra = width - padded[0].shape[1]
+    if not extra:
+        return padded
+    masks, literals, present = padded
+    return (
+        np.pad(masks, ((0, 0), (0, extra)), 'constant'),
+        np.pad(literals, ((0, 0), (0, extra)), 'constant',
+               constant_values=NO_LITERAL),
+        np.pad(present, ((0, 0), (0, extra)), 'constant')
+    )
+
+
+def _text(masks: np.ndarray,
+          literals: np.ndarray,
+          present: np.ndarray,
+          classifier: Classifier) -> str:
+    """
+    Render padded graphs (see :py:func:`_pad`) as a single string, row after
+    row, with the missing positions filled in.
+
+    :param masks: the masks
+    :param literals: the literals
+    :param present: whether each position is present
+    :param classifier: the classifier that assigned the masks
+    :return: the string
+    """
+    codes = np.where(
+        present, render_codes(masks, literals, classifier), ord(MISSING))
+    return codes.astype('<u4').tobytes().decode('utf-32-le')
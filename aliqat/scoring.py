@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: scoring
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Which of these records look least like the others?
+
+.. code-block:: python
+
+    scorer = OutlierScorer(graph, k=20)
+    for score in scorer.score(records):
+        ...
+    for score in scorer.worst():
+        print(score.distance, score.record)
+"""
+
+import heapq
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+import numpy as np
+from .graphs import Graph, _chunks, encode_ragged
+from .instruments import stage
+
+# the offending positions of each record in a batch
+_Positions = List[Tuple[int, ...]]
+
+
+class Score(NamedTuple):
+    """
+    How far a record falls outside a graph.
+    """
+    index: int  #: the record's position among the records scored
+    record: str or bytes  #: the record
+    #: the number of offending positions (see
+    #: :py:meth:`aliqat.matchers.Matcher.distance`)
+    distance: int
+    #: the offending positions (where the graph's length stands for every
+    #: character beyond the end of the graph)
+    positions: Tuple[int, ...]
+
+
+class OutlierScorer(object):
+    """
+    An outlier scorer checks records against a graph in vectorized batches
+    and keeps the (bounded) list of the worst ones it's seen.
+    """
+    def __init__(self, graph: Graph, k: int = 100, chunk_size: int = 10000):
+        """
+
+        :param graph: the graph
+        :param k: the number of worst records to keep
+        :param chunk_size: the number of records scored at once
+        :raises ValueError: if `k` is less than 1
+        """
+        if k < 1:
+            raise ValueError('At least one record must be kept.')
+        self._matcher = graph.compile()
+        self._k = k
+        self._chunk_size = chunk_size
+        # the worst records, as a min-heap of (distance, -index, score)
+        self._heap: List[Tuple[int, int, Score]] = []
+        self._scored = 0
+
+    @property
+    def scored(self) -> int:
+        """
+        Get the number of records scored.
+
+        :return: the number of records
+        """
+        return self._scored
+
+    def score(self, records: Iterable[str or bytes]) -> Iterator[Score]:
+        """
+        Score records.
+
+        :param records: the records
+        :return: an iterator over the records' scores (in order)
+        """
+        for chunk in _chunks(records, self._chunk_size):
+            distances, positions = self.score_many(chunk)
+            start = self._scored - len(chunk)
+            for i, record in enumerate(chunk):
+                yield Score(
+                    index=start + i, record=record,
+                    distance=int(distances[i]), positions=positions[i])
+
+    def score_many(self,
+                   records: List[str or bytes]) -> Tuple[np.ndarray,
+                                                         _Positions]:
+        """
+        Score a batch of records (and keep the worst of them).
+
+        :param records: the records
+        :return: a tuple containing an array of the records' distances and a
+            list of their offending positions
+        """
+        with stage('score'):
+            codes, lengths = encode_ragged(records)
+            bad = self._matcher.violations(codes, lengths)
+            width = len(self._matcher)
+            # Every character beyond the end of the graph counts.
+            distances = bad.sum(axis=1) + np.maximum(lengths - width - 1, 0)
+            rows, cols = np.nonzero(bad)
+            bounds = np.searchsorted(rows, np.arange(len(records) + 1))
+            cols = cols.tolist()
+            positions = [
+                tuple(cols[a:b])
+                for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+            ]
+            self._keep(records, distances, positions)
+        self._scored += len(records)
+        return distances, positions
+
+    def _keep(self,
+              records: List[str or bytes],
+              distances: np.ndarray,
+              positions: _Positions):
+        """
+        Keep the worst records of a batch.
+
+        :param records: the records
+        :param distances: their distances
+        :param positions: their offending positions
+        """
+        heap = self._heap
+        # Only the records worse than the best of the worst can get in.  (The
+        # earlier of two equally bad records is kept.)
+        floor = heap[0][0] if len(heap) >= self._k else 0
+        for i in np.flatnonzero(distances > floor).tolist():
+            d = int(distances[i])
+            if len(heap) >= self._k and d <= heap[0][0]:
+                continue
+            index = self._scored + i
+            item = (d, -index, Score(
+                index=index, record=records[i], distance=d,
+                positions=positions[i]))
+            if len(heap) < self._k:
+                heapq.heappush(heap, item)
+            else:
+                heapq.heapreplace(heap, item)
+
+    def worst(self) -> List[Score]:
+        """
+        Get the worst records scored so far.  (Records that match the graph
+        aren't outliers, so they aren't among them.)
+
+        :return: the scores of the worst records (worst first)
+        """
+        return [s for _, _, s in sorted(self._heap, reverse=True)]
+
+    def reset(self):
+        """
+        Forget the worst records (and the number of records scored).
+        """
+        self._heap = []
+        self._scored = 0
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: similarity
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+How alike are all of these graphs?
+
+The distance between two graphs is the number of character class bits in
+which their masks differ at each position (as a fraction of the bits in a
+mask) plus, with a configurable weight, the number of positions at which
+their literals differ, normalized by the length of the longer graph (and the
+weight) so that it's between 0 and 1.  Positions beyond the end of the
+shorter graph are treated as empty.
+
+Counting the differing bits of every pair of graphs is a matrix product (the
+number of bits in which two masks differ is the number set in either, less
+twice the number set in both), as is counting the literals they share, so
+the distances are computed a block of graphs at a time and memory is bounded
+by the block size rather than the number of graphs.
+"""
+
+from typing import Iterator, List, Sequence, Tuple
+import numpy as np
+from .graphs import CharClass, Graph, NO_LITERAL
+
+
+class _Packed(object):
+    """
+    Graphs' masks and literals, padded to the same length.
+    """
+    __slots__ = ('masks', 'literals', 'lengths', 'bits', 'columns', 'width')
+
+    def __init__(self, graphs: Sequence[Graph]):
+        """
+
+        :param graphs: the graphs
+        :raises ValueError: if the graphs use different lattices
+        """
+        lattice = graphs[0]._classifier.lattice if graphs else None
+        if any(g._classifier.lattice != lattice for g in graphs):
+            raise ValueError('The graphs use different lattices.')
+        classifier = graphs[0]._classifier if graphs else None
+        self.bits = classifier.bits if classifier is not None else 0
+        self.lengths = np.array([len(g) for g in graphs], dtype=np.float32)
+        width = int(self.lengths.max()) if graphs else 0
+        self.masks = np.full(
+            (len(graphs), width), CharClass.EMPTY,
+            dtype=classifier.dtype if classifier is not None else np.uint8)
+        self.literals = np.full(
+            (len(graphs), width), NO_LITERAL, dtype=np.uint16)
+        for i, g in enumerate(graphs):
+            m, l = g._views()
+            self.masks[i, :len(m)] = m
+            self.literals[i, :len(l)] = l
+        # Give each distinct (position, literal) pair its own column.
+        has = self.literals != NO_LITERAL
+        keys = (
+            np.arange(width, dtype=np.int64) * (NO_LITERAL + 1) +
+            self.literals
+        )
+        uniq, inverse = np.unique(keys[has], return_inverse=True)
+        self.columns = np.full(self.literals.shape, -1, dtype=np.int64)
+        self.columns[has] = inverse.ravel()
+        self.width = len(uniq)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def block(self, start: int, stop: int) -> Tuple[np.ndarray, ...]:
+        """
+        Unpack a block of graphs.
+
+        :param start: the first graph
+        :param stop: the graph after the last one
+        :return: a tuple containing the mask bits, the number of bits set in
+            each graph, the literal indicators, the number of literals in
+            each graph and the (position, literal) indicators
+        """
+        masks = self.masks[start:stop]
+        bits = (
+            (masks[..., np.newaxis] >> np.arange(self.bits, dtype=masks.dtype))
+            & 1
+        ).reshape(len(masks), -1).astype(np.float32)
+        has = (self.literals[start:stop] != NO_LITERAL).astype(np.float32)
+        onehot = np.zeros((len(masks), self.width), dtype=np.float32)
+        rows, cols = np.nonzero(self.columns[start:stop] >= 0)
+        onehot[rows, self.columns[start:stop][rows, cols]] = 1
+        return bits, bits.sum(axis=1), has, has.sum(axis=1), onehot
+
+
+def _distances(a: Tuple[np.ndarray, ...],
+               b: Tuple[np.ndarray, ...],
+               lengths_a: np.ndarray,
+               lengths_b: np.ndarray,
+               bits: int,
+               literal_weight: float) -> np.ndarray:
+    """
+    Compute the distances between two blocks of graphs.
+
+    :param a: the first block (see :py:meth:`_Packed.block`)
+    :param b: the second block
+    :param lengths_a: the lengths of the graphs in the first block
+    :param lengths_b: the lengths of the graphs in the second block
+    :param bits: the number of bits in a mask
+    :param literal_weight: the weight of a literal that differs
+    :return: the distances (one row for each graph in the first block)
+    """
+    bits_a, set_a, has_a, n_a, onehot_a = a
+    bits_b, set_b, has_b, n_b, onehot_b = b
+    differ = set_a[:, np.newaxis] + set_b - 2 * (bits_a @ bits_b.T)
+    # Positions at which either graph holds a literal, less the ones at which
+    # both hold the same one.
+    literals = (
+        n_a[:, np.newaxis] + n_b - has_a @ has_b.T - onehot_a @ onehot_b.T
+    )
+    longer = np.maximum(lengths_a[:, np.newaxis], lengths_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        d = (differ / bits + literal_weight * literals) / (
+            longer * (1 + literal_weight))
+    d[longer == 0] = 0
+    return d
+
+
+def distance_blocks(graphs: Sequence[Graph],
+                    literal_weight: float = 1.0,
+                    block_size: int = 512) -> Iterator[Tuple[int, int,
+                                                             np.ndarray]]:
+    """
+    Compute the distances between every pair of graphs, a block at a time.
+    Only the blocks on or above the diagonal are computed (since the
+    distances are symmetric).
+
+    :param graphs: the graphs
+    :param literal_weight: the weight of a literal that differs (relative to
+        a mask that differs in every bit)
+    :param block_size: the number of graphs in a block
+    :return: an iterator over tuples containing the index of the first graph
+        in the block's rows, the index of the first graph in its columns, and
+        the block of distances
+    :raises ValueError: if the graphs use different lattices
+    """
+    packed = _Packed(list(graphs))
+    n = len(packed)
+    for i in range(0, n, block_size):
+        rows = packed.block(i, i + block_size)
+        for j in range(i, n, block_size):
+            columns = rows if j == i else packed.block(j, j + block_size)
+            yield i, j, _distances(
+                rows, columns,
+                packed.lengths[i:i + block_size],
+                packed.lengths[j:j + block_size],
+                packed.bits, literal_weight)
+
+
+def distance_matrix(graphs: Sequence[Graph],
+                    literal_weight: float = 1.0,
+                    block_size: int = 512,
+                    out: np.ndarray = None) -> np.ndarray:
+    """
+    Compute the distances between every pair of graphs.
+
+    :param graphs: the graphs
+    :param literal_weight: the weight of a literal that differs (relative to
+        a mask that differs in every bit)
+    :param block_size: the number of graphs in a block
+    :param out: the (square) array in which to put the distances (which may
+        be a :py:class:`numpy.memmap`, if there are too many graphs to keep
+        their distances in memory)
+    :return: the distances (with one row and one column for each graph)
+    :raises ValueError: if the graphs use different lattices
+    """
+    graphs = list(graphs)
+    n = len(graphs)
+    out = out if out is not None else np.empty((n, n), dtype=np.float32)
+    for i, j, block in distance_blocks(graphs, literal_weight, block_size):
+        out[i:i + block.shape[0], j:j + block.shape[1]] = block
+        if j != i:
+            out[j:j + block.shape[1], i:i + block.shape[0]] = block.T
+    return out
+
+
+def similarity_matrix(graphs: Sequence[Graph],
+                      literal_weight: float = 1.0,
+                      block_size: int = 512) -> np.ndarray:
+    """
+    Compute the similarities (one less the distances) between every pair of
+    graphs.
+
+    :param graphs: the graphs
+    :param literal_weight: the weight of a literal that differs
+    :param block_size: the number of graphs in a block
+    :return: the similarities (with one row and one column for each graph)
+    :raises ValueError: if the graphs use different lattices
+    """
+    out = distance_matrix(graphs, literal_weight, block_size)
+    np.subtract(1, out, out=out)
+    return out
+
+
+def close_pairs(graphs: Sequence[Graph],
+                max_distance: float = 0.0,
+                literal_weight: float = 1.0,
+                block_size: int = 512) -> List[Tuple[int, int, float]]:
+    """
+    Find the pairs of graphs that are (nearly) duplicates, without keeping
+    every distance in memory.
+
+    :param graphs: the graphs
+    :param max_distance: the greatest distance between a close pair
+    :param literal_weight: the weight of a literal that differs
+    :param block_size: the number of graphs in a block
+    :return: the indices of each close pair (the lower first) and their
+        distance, in order
+    :raises ValueError: if the graphs use different lattices
+    """
+    pairs: List[Tuple[int, int, float]] = []
+    for i, j, block in distance_blocks(graphs, literal_weight, block_size):
+        rows, cols = np.nonzero(block <= max_distance)
+        keep = (i + rows) < (j + cols)
+        pairs.extend(zip(
+            (i + rows[keep]).tolist(), (j + cols[keep]).tolist(),
+            block[rows[keep], cols[keep]].tolist()))
+    pairs.sort()
+    return pairs
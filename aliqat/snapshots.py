@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: snapshots
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Put the graphs away now, and get them back (quickly) later.
+
+A snapshot file holds many serialized graphs (see
+:py:meth:`aliqat.graphs.Graph.to_bytes`), each identified by a string key.
+The file is laid out as follows (every integer is little-endian):
+
+* a header: the magic bytes, the format version, the number of graphs and
+  the offsets of the index and the keys;
+* the graphs, one after another, each starting on an 8-byte boundary;
+* the index: the offset and size of each graph (two 64-bit integers apiece);
+* the keys: the length of each key (a 32-bit integer) followed by the key
+  itself (encoded as UTF-8).
+
+Readers map the file into memory and only deserialize the graphs they ask
+for.
+"""
+
+from collections import OrderedDict
+import mmap
+import struct
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+from .graphs import Classifier, Graph
+
+SNAPSHOT_MAGIC: bytes = b'AQSN'  #: the bytes at the start of a snapshot file
+SNAPSHOT_VERSION: int = 1  #: the version of the snapshot file format
+# magic, version, (padding), the number of graphs, the index offset, the keys
+# offset
+_HEADER = struct.Struct('<4sH2xQQQ')
+_ENTRY = struct.Struct('<QQ')  # the offset and size of a graph
+_KEY = struct.Struct('<I')  # the length of a key
+_ALIGNMENT: int = 8  #: graphs start on multiples of this many bytes
+
+
+def write_snapshot(path: str,
+                   graphs: Mapping[str, Graph] or Iterable[Tuple[str, Graph]]
+                   ) -> int:
+    """
+    Write graphs to a snapshot file.  The graphs are written as they come, so
+    they needn't all be in memory at once.
+
+    :param path: the path to the file
+    :param graphs: the graphs, by key (a mapping, or an iterable of key-graph
+        pairs), which are stored as strings
+    :return: the number of graphs written
+    :raises ValueError: if a key (as a string) appears more than once
+    """
+    items = graphs.items() if isinstance(graphs, Mapping) else graphs
+    entries: List[Tuple[int, int]] = []
+    keys: List[bytes] = []
+    seen = set()
+    with open(path, 'wb') as f:
+        # We'll come back for the header when we know what goes in it.
+        f.write(b'\0' * _HEADER.size)
+        offset = _HEADER.size
+        for key, graph in items:
+            # Keys are stored as strings, so 1 and '1' are the same key.
+            name = str(key)
+            if name in seen:
+                raise ValueError('The key {!r} appears more than once.'.format(
+                    key))
+            seen.add(name)
+            pad = -offset % _ALIGNMENT
+            data = graph.to_bytes()
+            f.write(b'\0' * pad)
+            f.write(data)
+            entries.append((offset + pad, len(data)))
+            keys.append(name.encode('utf-8'))
+            offset += pad + len(data)
+        index_offset = offset + -offset % _ALIGNMENT
+        f.write(b'\0' * (index_offset - offset))
+        f.write(b''.join(_ENTRY.pack(*e) for e in entries))
+        keys_offset = index_offset + _ENTRY.size * len(entries)
+        f.write(b''.join(_KEY.pack(len(k)) + k for k in keys))
+        f.seek(0)
+        f.write(_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(entries), index_offset,
+            keys_offset))
+    return len(entries)
+
+
+class Snapshot(object):
+    """
+    A snapshot reads graphs from a snapshot file (see
+    :py:func:`write_snapshot`) as they're needed.  Opening a snapshot only
+    reads its header, so it takes the same (short) time regardless of how
+    many graphs the file holds.
+
+    Snapshots can be used as context managers (which close them).
+    """
+    def __init__(self, path: str, classifier: Classifier = None):
+        """
+
+        :param path: the path to the file
+        :param classifier: the classifier given to the graphs (by default,
+            the ones they were written with)
+        :raises ValueError: if the file isn't a snapshot
+        """
+        self._classifier = classifier
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError('The file is too short to be a snapshot.')
+            (magic, version, self._count,
+             self._index_offset, self._keys_offset) = _HEADER.unpack_from(
+                self._mm)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError('The file is not a snapshot.')
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(
+                    'Version {} snapshots are not supported.'.format(version))
+            if (self._index_offset + _ENTRY.size * self._count >
+                    len(self._mm)):
+                raise ValueError('The file is truncated.')
+        except ValueError:
+            self._mm.close()
+            raise
+        self._keys: Dict[str, int] = None  # (We'll read these when we must.)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key: str):
+        return key in self._index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index())
+
+    def __getitem__(self, key: str) -> Graph:
+        return self.graph(self._index()[key])
+
+    @property
+    def closed(self) -> bool:
+        """
+        Has this snapshot been closed?
+
+        :return: `True` if the snapshot has been closed
+        """
+        return self._mm.closed
+
+    def close(self):
+        """
+        Close the snapshot.
+        """
+        self._mm.close()
+
+    def keys(self) -> List[str]:
+        """
+        Get the keys of the graphs, in the order in which they were written.
+
+        :return: the keys
+        """
+        return list(self._index())
+
+    def items(self) -> Iterator[Tuple[str, Graph]]:
+        """
+        Read every graph, in the order in which they were written.
+
+        :return: an iterator over the keys and graphs
+        """
+        for i, key in enumerate(self._index()):
+            yield key, self.graph(i)
+
+    def graph(self, i: int) -> Graph:
+        """
+        Read a graph by its position in the file (which doesn't require
+        reading the keys).
+
+        :param i: the position of the graph
+        :return: the graph
+        :raises IndexError: if there's no such graph
+        """
+        if not -self._count <= i < self._count:
+            raise IndexError('The snapshot holds {} graphs.'.format(
+                self._count))
+        offset, size = _ENTRY.unpack_from(
+            self._mm, self._index_offset + _ENTRY.size * (i % self._count))
+        with memoryview(self._mm) as view:
+            return Graph.from_bytes(
+                view[offset:offset + size], classifier=self._classifier)
+
+    def _index(self) -> Dict[str, int]:
+        """
+        Get the position of each graph, by key (reading the keys if they
+        haven't been read yet).
+
+        :return: the positions, by key
+        """
+        if self._keys is None:
+            keys: Dict[str, int] = {}
+            offset = self._keys_offset
+            for i in range(self._count):
+                (n,) = _KEY.unpack_from(self._mm, offset)
+                offset += _KEY.size
+                keys[self._mm[offset:offset + n].decode('utf-8')] = i
+                offset += n
+            self._keys = keys
+        return self._keys
+
+
+def merge_snapshots(paths: Iterable[str], path: str) -> int:
+    """
+    Merge snapshot files (learned on different nodes, say) into one.  Graphs
+    that have the same key are conflated.  Conflation is associative (and
+    commutative), so the merged graph is the same one that would have been
+    learned from all of their records on a single node.
+
+    The inputs are read one at a time, so the memory used depends on the
+    number of distinct keys (not the number of files).
+
+    :param paths: the paths to the snapshot files
+    :param path: the path to the merged snapshot file (which may be one of
+        the inputs)
+    :return: the number of graphs written
+    :raises ValueError: if graphs that have the same key use different
+        classifiers
+    """
+    merged: Dict[str, Graph] = OrderedDict()
+    for p in paths:
+        with Snapshot(p) as snapshot:
+            for key, graph in snapshot.items():
+                current = merged.get(key)
+                if current is None:
+                    merged[key] = graph
+                    continue
+                if not current._classifier.same_as(graph._classifier):
+                    raise ValueError(
+                        'The graphs for {!r} use different '
+                        'classifiers.'.format(key))
+                current.conflate(graph)
+    return write_snapshot(path, merged)
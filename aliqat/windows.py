@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: windows
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Has the format changed lately?
+
+A windowed graph counts the records seen over the last so many records (or
+seconds) and compares the masks derived from the counts with a reference
+graph.  Records that leave the window are subtracted from the counts, so
+keeping the window current costs time in proportion to the records that
+enter and leave it (not the records in it).
+
+.. code-block:: python
+
+    window = WindowedGraph(reference, size=10000, on_drift=alert)
+    for batch in feed:
+        window.update(batch)
+"""
+
+from collections import deque
+import time
+from typing import Callable, Deque, Iterable, NamedTuple, Tuple
+import numpy as np
+from .counting import CountingGraph, LITERALS
+from .graphs import Graph, NO_LITERAL, encode_ragged
+
+
+class Drift(NamedTuple):
+    """
+    A change in how a window's records compare with the reference graph.
+    """
+    #: the positions at which the window has seen classes (or characters,
+    #: where the reference graph holds a literal) that the reference graph
+    #: hasn't
+    positions: Tuple[int, ...]
+    #: the number of records in the window whose lengths don't match the
+    #: reference graph's
+    misfits: int
+    records: int  #: the number of records in the window
+    when: float  #: the time at which the change was seen
+
+    def __bool__(self):
+        return bool(self.positions) or self.misfits > 0
+
+
+class _Batch(object):
+    """
+    The records (in the window) that arrived together.
+    """
+    __slots__ = ('times', 'fits', 'codes')
+
+    def __init__(self, times: np.ndarray, fits: np.ndarray, codes: np.ndarray):
+        """
+
+        :param times: the time at which each record arrived
+        :param fits: whether each record's length matches the window's
+        :param codes: the code points of the records that fit (one row
+            apiece)
+        """
+        self.times = times
+        self.fits = fits
+        self.codes = codes
+
+
+class WindowedGraph(object):
+    """
+    A windowed graph keeps per-position character class counts over the
+    most recent records and reports a :py:class:`Drift` when the records
+    start (or stop) having classes that the reference graph doesn't, or
+    characters other than the ones the reference graph holds as literals.
+    (A window that's seen fewer classes than the reference graph hasn't
+    drifted.)
+
+    Records whose lengths don't match the reference graph's can't be counted
+    position by position, so they're counted as misfits (which are also
+    drift).
+    """
+    def __init__(self,
+                 reference: Graph,
+                 size: int = None,
+                 seconds: float = None,
+                 threshold: float = 0.0,
+                 on_drift: Callable[[Drift], None] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+
+        :param reference: the reference graph
+        :param size: the maximum number of records in the window
+        :param seconds: the maximum age of the records in the window
+        :param threshold: the fraction of the window's records in which a
+            class must be seen before it counts as drift (see
+            :py:meth:`aliqat.counting.CountingGraph.graph`)
+        :param on_drift: a function called with each drift
+        :param clock: the function that tells the time
+        :raises ValueError: if there's neither a size nor a number of seconds
+        """
+        if size is None and seconds is None:
+            raise ValueError('A size or a number of seconds is required.')
+        if size is not None and size < 1:
+            raise ValueError('The size must be at least 1.')
+        self._size = size
+        self._seconds = seconds
+        self._threshold = threshold
+        self._on_drift = on_drift
+        self._clock = clock
+        self._reference = reference
+        self._allowed, self._literals = reference.masks, reference.literals
+        self._counts = CountingGraph(
+            len(reference), classifier=reference._classifier)
+        self._batches: Deque[_Batch] = deque()
+        self._records = 0
+        self._misfits = 0
+        self._last = Drift(positions=(), misfits=0, records=0, when=0.0)
+
+    def __len__(self):
+        return len(self._allowed)
+
+    @property
+    def reference(self) -> Graph:
+        """
+        Get the reference graph.
+
+        :return: the reference graph
+        """
+        return self._reference
+
+    @property
+    def records(self) -> int:
+        """
+        Get the number of records in the window.
+
+        :return: the number of records
+        """
+        return self._records
+
+    @property
+    def misfits(self) -> int:
+        """
+        Get the number of records in the window whose lengths don't match the
+        reference graph's.
+
+        :return: the number of misfits
+        """
+        return self._misfits
+
+    @property
+    def drift(self) -> Drift:
+        """
+        Get the most recent drift (which is empty if the window hasn't
+        drifted).
+
+        :return: the drift
+        """
+        return self._last
+
+    def masks(self) -> np.ndarray:
+        """
+        Derive the character class masks from the window's counts.
+
+        :return: the character class mask at each position
+        """
+        return self._counts.masks(self._threshold)
+
+    def graph(self) -> Graph:
+        """
+        Derive a graph from the window's counts.
+
+        :return: the graph
+        :raises ValueError: if there are no (fitting) records in the window
+        """
+        return self._counts.graph(self._threshold)
+
+    def update(self,
+               records: Iterable[str or bytes],
+               now: float = None) -> Drift or None:
+        """
+        Add records to the window (retiring the ones that no longer belong
+        in it).
+
+        :param records: the records
+        :param now: the time at which the records arrived (by default, the
+            clock's time)
+        :return: the drift, if the records changed it
+        """
+        now = now if now is not None else self._clock()
+        codes, lengths = encode_ragged(records)
+        if len(lengths):
+            fits = lengths == len(self)
+            codes = (
+                codes[fits, :len(self)] if fits.any()
+                else np.zeros((0, len(self)), dtype=codes.dtype)
+            )
+            self._counts._count_codes(codes)
+            self._batches.append(_Batch(
+                np.full(len(lengths), now, dtype=np.float64), fits, codes))
+            self._records += len(lengths)
+            self._misfits += len(lengths) - int(fits.sum())
+        return self.expire(now)
+
+    def expire(self, now: float = None) -> Drift or None:
+        """
+        Retire the records that no longer belong in the window (because
+        they're too old, or because there are too many).
+
+        :param now: the time (by default, the clock's time)
+        :return: the drift, if retiring the records changed it
+        """
+        now = now if now is not None else self._clock()
+        excess = self._records - self._size if self._size is not None else 0
+        while self._batches:
+            batch = self._batches[0]
+            n = len(batch.times)
+            k = 0
+            if excess > 0:
+                k = min(excess, n)
+            if self._seconds is not None:
+                # The records in a batch are in order of arrival.
+                k = max(k, int(np.searchsorted(
+                    batch.times, now - self._seconds, side='left')))
+            if k == 0:
+                break
+            self._retire(k)
+            excess -= k
+        return self._check(now)
+
+    def rebase(self, reference: Graph = None):
+        """
+        Replace the reference graph (so the window's current shape becomes
+        the norm).
+
+        :param reference: the new reference graph (by default, the graph
+            derived from the window)
+        :raises ValueError: if the new reference graph's length doesn't match
+            the window's (or if there's no new reference graph and no records
+            in the window to derive one from)
+        """
+        reference = reference if reference is not None else self.graph()
+        if len(reference) != len(self):
+            raise ValueError(
+                'The reference graph must have a length of {}.'.format(
+                    len(self)))
+        self._reference = reference
+        self._allowed, self._literals = reference.masks, reference.literals
+        self._check(self._last.when)
+
+    def _retire(self, k: int):
+        """
+        Subtract the oldest records from the counts.
+
+        :param k: the number of records to retire from the oldest batch
+        """
+        batch = self._batches[0]
+        fitting = int(batch.fits[:k].sum())
+        if fitting:
+            self._counts._count_codes(
+                batch.codes[:fitting],
+                np.full(fitting, -1, dtype=np.int64))
+        self._records -= k
+        self._misfits -= k - fitting
+        if k == len(batch.times):
+            self._batches.popleft()
+            return
+        batch.times = batch.times[k:]
+        batch.fits = batch.fits[k:]
+        batch.codes = batch.codes[fitting:]
+
+    def _check(self, now: float) -> Drift or None:
+        """
+        Compare the window with the reference graph.
+
+        :param now: the time
+        :return: the drift, if it's changed
+        """
+        positions: Tuple[int, ...] = ()
+        total = self._counts.total
+        if total:
+            support = max(self._threshold * total, 1)
+            bad = (self._counts._masks(support) & ~self._allowed) != 0
+            # Where the reference graph holds a literal, every other character
+            # is drift.  (Literals beyond the counted code points are never
+            # seen as literals.)
+            literals = self._literals
+            seen = self._counts._literals[
+                np.arange(len(self)), np.minimum(literals, LITERALS - 1)]
+            seen[literals >= LITERALS] = 0
+            bad |= (literals != NO_LITERAL) & (total - seen >= support)
+            positions = tuple(np.flatnonzero(bad).tolist())
+        last = self._last
+        if positions == last.positions and (
+                bool(self._misfits) == bool(last.misfits)):
+            return None
+        self._last = Drift(
+            positions=positions, misfits=self._misfits,
+            records=self._records, when=now)
+        if self._on_drift is not None:
+            self._on_drift(self._last)
+        return self._last
+
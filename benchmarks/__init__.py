@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: benchmarks
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+How fast is it?  Run ``python -m benchmarks --help`` to find out.
+"""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: __main__
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Run the benchmarks.
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+from .suite import CASES, COUNTS, LENGTHS, Result, compare, grid
+
+
+def _header(baseline: bool) -> str:
+    """
+    Format the header of the table of results.
+
+    :param baseline: `True` if the results are compared with a baseline
+    :return: the header
+    """
+    header = '{:<20} {:>9} {:>6} {:>9} {:>8} {:>12} {:>9}'.format(
+        'case', 'count', 'length', 'records', 'seconds', 'records/s',
+        'peak KiB')
+    return header + (' {:>8}'.format('baseline') if baseline else '')
+
+
+def _row(r: Result, ratio: float = None) -> str:
+    """
+    Format a row in the table of results.
+
+    :param r: the result
+    :param ratio: the ratio of the result's rate to the baseline's
+    :return: the row
+    """
+    row = '{:<20} {:>9} {:>6} {:>8}{} {:>8.3f} {:>12,.0f} {:>9,.1f}'.format(
+        r.case, r.count, r.length, r.records, ' ' if r.complete else '*',
+        r.seconds, r.rate, r.peak / 2 ** 10)
+    return row + (' {:>7.2f}x'.format(ratio) if ratio is not None else '')
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Run the benchmarks from the command line.
+
+    :param argv: the command-line arguments
+    :return: the exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Measure how quickly graphs are built from synthetic ALI '
+                    'records.')
+    parser.add_argument(
+        '--case', action='append', choices=sorted(CASES), dest='cases',
+        help='a case to run (repeat for more; by default, all of them)')
+    parser.add_argument(
+        '--count', action='append', type=int, dest='counts',
+        help='a record count (repeat for more; by default, {})'.format(
+            ', '.join(str(c) for c in COUNTS)))
+    parser.add_argument(
+        '--length', action='append', type=int, dest='lengths',
+        help='a record length (repeat for more; by default, {})'.format(
+            ', '.join(str(n) for n in LENGTHS)))
+    parser.add_argument(
+        '--noise', type=float, default=0.0,
+        help='the fraction of characters replaced by random characters')
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='the seed for the random number generator')
+    parser.add_argument(
+        '--chunk-size', type=int, default=10000,
+        help='the number of records processed at a time')
+    parser.add_argument(
+        '--max-seconds', type=float, default=10.0,
+        help='the time each benchmark may spend processing records (0 for '
+             'no limit)')
+    parser.add_argument(
+        '--json', metavar='PATH',
+        help='write the results to a JSON file (to use as a baseline later)')
+    parser.add_argument(
+        '--baseline', metavar='PATH',
+        help='compare the results with ones written earlier by --json')
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = [Result(**r) for r in json.load(f)]
+    print(_header(baseline is not None))
+    results: List[Result] = []
+    for r in grid(
+            cases=args.cases, counts=args.counts, lengths=args.lengths,
+            noise=args.noise, seed=args.seed, chunk_size=args.chunk_size,
+            max_seconds=args.max_seconds or None):
+        results.append(r)
+        print(_row(r, compare([r], baseline)[0] if baseline else None),
+              flush=True)
+    if not all(r.complete for r in results):
+        print('* ran out of time (the rate is for the records processed)')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([r._asdict() for r in results], f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: generator
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Make up ALI records (quickly, and the same way every time).
+"""
+
+from itertools import chain, cycle
+from typing import Iterator, List, NamedTuple, Sequence
+import numpy as np
+
+DIGITS: np.ndarray = np.frombuffer(b'0123456789', dtype=np.uint8)
+UPPER: np.ndarray = np.frombuffer(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)
+ALNUM: np.ndarray = np.concatenate((DIGITS, UPPER))
+#: the characters that noise is made of
+PRINTABLE: np.ndarray = np.arange(0x20, 0x7f, dtype=np.uint8)
+SPACE: int = 0x20
+
+_ALPHABETS = {'digit': DIGITS, 'alpha': UPPER, 'alnum': ALNUM}
+
+
+class Field(NamedTuple):
+    """
+    A field in a synthetic record layout.
+    """
+    kind: str  #: 'digit', 'alpha', 'alnum', 'literal' or 'blank'
+    width: int  #: the width of the field
+    text: str = ''  #: the text of a literal field
+    #: `True` if the field's values vary in length (alphabetic fields are
+    #: left-justified and numeric fields are right-justified)
+    padded: bool = False
+
+
+#: the start of a typical ALI record
+ALI_LAYOUT: List[Field] = [
+    Field('literal', 1, '('), Field('digit', 3), Field('literal', 1, ')'),
+    Field('digit', 3), Field('literal', 1, '-'), Field('digit', 4),
+    Field('blank', 1),
+    Field('digit', 2), Field('literal', 1, ':'), Field('digit', 2),
+    Field('blank', 1),
+    Field('digit', 2), Field('literal', 1, '/'), Field('digit', 2),
+    Field('blank', 1),
+    Field('alpha', 4), Field('blank', 1),
+    Field('digit', 6, padded=True), Field('blank', 1),
+    Field('alpha', 20, padded=True), Field('blank', 1),
+    Field('alpha', 20, padded=True), Field('blank', 1),
+    Field('literal', 4, 'ESN:'), Field('digit', 4), Field('blank', 1)
+]
+
+#: the fields that pad a typical ALI record out to its length
+ALI_FILLER: List[Field] = [
+    Field('alnum', 10, padded=True), Field('blank', 1),
+    Field('alpha', 16, padded=True), Field('blank', 2),
+    Field('digit', 5, padded=True), Field('blank', 1)
+]
+
+
+def layout(length: int,
+           fields: Sequence[Field] = ALI_LAYOUT,
+           filler: Sequence[Field] = ALI_FILLER) -> List[Field]:
+    """
+    Lay out a record of a given length.
+
+    :param length: the length of the record
+    :param fields: the fields at the start of the record
+    :param filler: the fields that are repeated to fill the rest of the
+        record
+    :return: the record's fields (the last of which may be cut short)
+    """
+    fields_: List[Field] = []
+    remaining = length
+    source = chain(fields, cycle(filler))
+    while remaining > 0:
+        f = next(source, Field('blank', remaining))
+        if f.width > remaining:
+            f = Field(f.kind, remaining, f.text[:remaining], f.padded)
+        fields_.append(f)
+        remaining -= f.width
+    return fields_
+
+
+def generate(count: int,
+             fields: Sequence[Field],
+             noise: float = 0.0,
+             seed: int = 0) -> np.ndarray:
+    """
+    Generate records.
+
+    :param count: the number of records
+    :param fields: the records' layout
+    :param noise: the fraction of characters replaced by random printable
+        characters
+    :param seed: the seed for the random number generator
+    :return: a 2-D array of bytes with one row per record
+    """
+    rng = np.random.RandomState(seed)
+    length = sum(f.width for f in fields)
+    out = np.empty((count, length), dtype=np.uint8)
+    start = 0
+    for f in fields:
+        cols = out[:, start:start + f.width]
+        start += f.width
+        if f.kind == 'literal':
+            cols[:] = np.frombuffer(f.text.encode('latin-1'), dtype=np.uint8)
+            continue
+        if f.kind == 'blank':
+            cols[:] = SPACE
+            continue
+        alphabet = _ALPHABETS[f.kind]
+        cols[:] = alphabet[rng.randint(0, len(alphabet), cols.shape)]
+        if f.padded:
+            # Pick a length for each value, then pad it.
+            lengths = rng.randint(1, f.width + 1, (count, 1))
+            positions = np.arange(f.width)
+            cols[
+                positions >= lengths if f.kind != 'digit'
+                else positions < f.width - lengths
+            ] = SPACE
+    if noise > 0:
+        hits = rng.random_sample(out.shape) < noise
+        out[hits] = PRINTABLE[rng.randint(0, len(PRINTABLE), hits.sum())]
+    return out
+
+
+def chunks(count: int,
+           fields: Sequence[Field],
+           noise: float = 0.0,
+           seed: int = 0,
+           chunk_size: int = 100000) -> Iterator[np.ndarray]:
+    """
+    Generate records in chunks (so that lots of them don't need lots of
+    memory).  The records are the same regardless of the chunk size.
+
+    :param count: the number of records
+    :param fields: the records' layout
+    :param noise: the fraction of characters replaced by random printable
+        characters
+    :param seed: the seed for the random number generator
+    :param chunk_size: the (maximum) number of records in each chunk
+    :return: an iterator over the chunks
+    """
+    # Records are generated in fixed blocks (each with its own seed) and then
+    # cut into chunks, so the chunk size doesn't change the records.
+    pending: List[np.ndarray] = []
+    size = 0
+    for start in range(0, count, _BLOCK):
+        block = generate(
+            min(_BLOCK, count - start), fields, noise,
+            seed=(seed * 1000003 + start // _BLOCK) % 2 ** 32)
+        pending.append(block)
+        size += len(block)
+        while size >= chunk_size or (size and start + _BLOCK >= count):
+            rows = np.concatenate(pending) if len(pending) > 1 else pending[0]
+            yield rows[:chunk_size]
+            rest = rows[chunk_size:]
+            pending = [rest] if len(rest) else []
+            size = len(rest)
+
+
+_BLOCK: int = 10000  #: the number of records generated from each seed
+
+
+def records(count: int,
+            fields: Sequence[Field],
+            noise: float = 0.0,
+            seed: int = 0) -> List[bytes]:
+    """
+    Generate records as bytes.
+
+    :param count: the number of records
+    :param fields: the records' layout
+    :param noise: the fraction of characters replaced by random printable
+        characters
+    :param seed: the seed for the random number generator
+    :return: the records
+    """
+    rows = generate(count, fields, noise, seed)
+    data = rows.tobytes()
+    width = rows.shape[1]
+    return [data[i:i + width] for i in range(0, len(data), width)]
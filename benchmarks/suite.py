@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. currentmodule:: suite
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+On your marks...
+"""
+
+import time
+import tracemalloc
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence
+)
+import numpy as np
+from aliqat.graphs import Graph
+from .generator import Field, chunks, layout as ali_layout
+
+# A case is set up once (with the first record) and returns a function that
+# processes a chunk of records.
+Case = Callable[[bytes], Callable[[List[bytes]], object]]
+
+
+def _init(first: bytes) -> Callable[[List[bytes]], object]:
+    def run(records: List[bytes]):
+        for r in records:
+            Graph(r)
+    return run
+
+
+def _conflate(first: bytes) -> Callable[[List[bytes]], object]:
+    graph = Graph(first)
+
+    def run(records: List[bytes]):
+        for r in records:
+            graph.conflate(Graph(r))
+    return run
+
+
+def _conflate_many(first: bytes) -> Callable[[List[bytes]], object]:
+    graph = Graph(first)
+
+    def run(records: List[bytes]):
+        graph.conflate_many(records)
+    return run
+
+
+def _encode(first: bytes) -> Callable[[List[bytes]], object]:
+    encode = Graph._encode
+
+    def run(records: List[bytes]):
+        for r in records:
+            for c in r.decode('latin-1'):
+                encode(c)
+    return run
+
+
+def _str(first: bytes) -> Callable[[List[bytes]], object]:
+    graph = Graph(first)
+
+    def run(records: List[bytes]):
+        # Render a graph that grows a little with every record, as a job that
+        # reports its progress would.
+        for r in records:
+            graph.conflate(r)
+            str(graph)
+    return run
+
+
+#: the benchmark cases, by name
+CASES: Dict[str, Case] = {
+    'Graph.__init__': _init,
+    'Graph.conflate': _conflate,
+    'Graph.conflate_many': _conflate_many,
+    'Graph._encode': _encode,
+    'Graph.__str__': _str
+}
+
+#: the default record counts
+COUNTS: List[int] = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+#: the default record lengths
+LENGTHS: List[int] = [80, 256, 512]
+
+
+class Result(NamedTuple):
+    """
+    The result of a benchmark.
+    """
+    case: str  #: the name of the case
+    count: int  #: the number of records asked for
+    length: int  #: the length of the records
+    records: int  #: the number of records processed before time ran out
+    seconds: float  #: the time spent processing them
+    peak: int  #: the most memory (in bytes) allocated at once
+
+    @property
+    def rate(self) -> float:
+        """
+        Get the number of records processed per second.
+
+        :return: the rate
+        """
+        return self.records / self.seconds if self.seconds else float('inf')
+
+    @property
+    def complete(self) -> bool:
+        """
+        Were all of the records processed before time ran out?
+
+        :return: `True` if all of the records were processed
+        """
+        return self.records == self.count
+
+
+def measure(case: str,
+            count: int,
+            fields: Sequence[Field],
+            noise: float = 0.0,
+            seed: int = 0,
+            chunk_size: int = 10000,
+            max_seconds: float = None) -> Result:
+    """
+    Run a benchmark.
+
+    Records are generated a chunk at a time, outside of the clock, and each
+    chunk is processed in slices that start small and double in size (so a
+    slow case doesn't blow through the time limit on its first chunk).
+
+    Tracing memory slows some cases down several times over, so the peak is
+    measured afterwards by setting the case up again and running it over
+    (about a second's worth of) the first records while tracing.
+
+    :param case: the name of the case (see :py:data:`CASES`)
+    :param count: the number of records
+    :param fields: the records' layout
+    :param noise: the fraction of characters replaced by random characters
+    :param seed: the seed for the random number generator
+    :param chunk_size: the (maximum) number of records processed at a time
+    :param max_seconds: stop (after a slice) once this much time has been
+        spent processing records
+    :return: the result
+    """
+    length = sum(f.width for f in fields)
+    run = None
+    first: List[bytes] = []
+    records = 0
+    seconds = 0.0
+    step = _FIRST_SLICE
+    for rows in chunks(count, fields, noise, seed, chunk_size):
+        data = rows.tobytes()
+        batch = [data[i:i + length] for i in range(0, len(data), length)]
+        del rows, data
+        if run is None:
+            run = CASES[case](batch[0])
+            first = batch
+        i = 0
+        while i < len(batch):
+            started = time.perf_counter()
+            run(batch[i:i + step])
+            seconds += time.perf_counter() - started
+            records += len(batch[i:i + step])
+            i += step
+            step = min(step * 2, chunk_size)
+            if max_seconds is not None and seconds >= max_seconds:
+                break
+        if max_seconds is not None and seconds >= max_seconds:
+            break
+    if not records:
+        return Result(case, count, length, 0, seconds, 0)
+    # Trace about a second's worth (tracing takes about five times as long).
+    sample = first[:max(1, min(
+        chunk_size, records, int(records / seconds / 5) if seconds else records
+    ))]
+    run = CASES[case](sample[0])
+    tracemalloc.start()
+    try:
+        run(sample)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Result(case, count, length, records, seconds, peak)
+
+
+_FIRST_SLICE: int = 100  #: the number of records in the first slice
+
+
+def grid(cases: Iterable[str] = None,
+         counts: Iterable[int] = None,
+         lengths: Iterable[int] = None,
+         layout: Callable[[int], Sequence[Field]] = ali_layout,
+         **kwargs) -> Iterator[Result]:
+    """
+    Run every combination of cases, record counts and record lengths.
+
+    :param cases: the names of the cases (by default, all of them)
+    :param counts: the record counts (by default, :py:data:`COUNTS`)
+    :param lengths: the record lengths (by default, :py:data:`LENGTHS`)
+    :param layout: a function that lays out a record of a given length
+    :param kwargs: any other keyword arguments for :py:func:`measure`
+    :return: an iterator over the results (as each benchmark finishes)
+    """
+    for case in (cases if cases is not None else CASES):
+        for count in (counts if counts is not None else COUNTS):
+            for length in (lengths if lengths is not None else LENGTHS):
+                yield measure(case, count, layout(length), **kwargs)
+
+
+def compare(results: Iterable[Result],
+            baseline: Iterable[Result]) -> List[float]:
+    """
+    Compare results with a baseline.
+
+    :param results: the results
+    :param baseline: the baseline results
+    :return: the ratio of each result's rate to the baseline's rate for the
+        same case, count and length (or `NaN` if the baseline doesn't have
+        one)
+    """
+    rates = {(b.case, b.count, b.length): b.rate for b in baseline}
+    return [
+        r.rate / rates[(r.case, r.count, r.length)]
+        if rates.get((r.case, r.count, r.length)) else float(np.nan)
+        for r in results
+    ]
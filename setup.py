@@ -32,14 +32,17 @@ setup(
   name='aliqat',
   description="aliqat",
   long_description=long_description,
-  packages=find_packages(exclude=["*.tests", "*.tests.*", "tests.*", "tests"]),
+  packages=find_packages(exclude=["*.tests", "*.tests.*", "tests.*", "tests",
+                                  "benchmarks", "benchmarks.*"]),
   version=version,
   install_requires=[
-    # Include your dependencies here.
-    # Here are a couple of examples...
-    # 'numpy>=1.13.3,<2',
-    # 'measurement>=1.8.0,<2'
+    'numpy>=1.13.3'
   ],
+  entry_points={
+    'console_scripts': [
+      'aliqat=aliqat.cli:main'
+    ]
+  },
   python_requires=">=3.6",
   license='MIT',
   author='Pat Daburu',
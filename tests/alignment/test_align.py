@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.alignment import _align, align, conflate_aligned
+from aliqat.graphs import Graph, encode_ragged
+
+RECORDS = [
+    '(512)555-1234 SMITH',
+    ' (713)555-9876 SMITH',
+    '  (210)555-0000 SMITH',
+    '(512)555-1111 SMITH'
+]
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of aligning records with graphs.
+    """
+    @parameterized.expand([
+        (' (512)555-1234', (-1,) + tuple(range(13))),
+        ('512)555-1234', tuple(range(1, 13))),
+        ('(512)555-1234', tuple(range(13))),
+        ('', ())
+    ])
+    def test_align_shifted_linesUp(self, record, expected):
+        """
+        Arrange: Create a graph.
+        Act: Line up a record that's been shifted.
+        Assert: Each character is lined up with the position it belongs in.
+        """
+        self.assertEqual(expected, align(Graph('(512)555-1234'), record))
+
+    def test_conflateAligned_shifted_fieldsKept(self):
+        """
+        Arrange: Create a graph from a record.
+        Act: Conflate records whose fields have been shifted (in batches of
+            different sizes).
+        Assert: The fields keep their classes (and literals).
+        """
+        for batch_size in (1, 2, 10):
+            g = Graph(RECORDS[0])
+            conflate_aligned(g, RECORDS[1:], batch_size=batch_size)
+            self.assertEqual('∅∅(ℝ1ℝ)555-ℝℝℝℝ SMITH', str(g))
+
+    def test_conflateAligned_matchesShifted(self):
+        """
+        Arrange: Create a graph from a record.
+        Act: Conflate records whose fields have been shifted.
+        Assert: The graph matches every record.
+        """
+        g = Graph(RECORDS[0])
+        g.conflate_aligned(RECORDS[1:])
+        matcher = g.compile()
+        for record in RECORDS:
+            self.assertTrue(matcher.match(record.rjust(len(g)))[0])
+
+    def test_conflateAligned_emptyGraph_grows(self):
+        """
+        Arrange: Create an empty graph.
+        Act: Conflate some records.
+        Assert: The graph has positions for the longest record.
+        """
+        g = Graph('')
+        g.conflate_aligned(['ab', 'abc', ''])
+        self.assertEqual(3, len(g))
+
+    def test_conflateAligned_sameLength_likeConflate(self):
+        """
+        Arrange: Create two graphs from the same record.
+        Act: Conflate records of the same shape into one with and into the
+            other without alignment.
+        Assert: The graphs are the same.
+        """
+        records = ['(713)555-9876 JONES', '(210)555-0000 DOEJO']
+        a, b = Graph(RECORDS[0]), Graph(RECORDS[0])
+        a.conflate_aligned(records)
+        b.conflate_many(records)
+        self.assertEqual(str(b), str(a))
+        self.assertEqual(list(b.literals), list(a.literals))
+
+    def test_align_mixedLengths_likeOneAtATime(self):
+        """
+        Arrange: Create a graph.
+        Act: Line up a batch of records of very different lengths.
+        Assert: Each record is lined up just as it is on its own (so the
+            others don't widen its band).
+        """
+        g = Graph(RECORDS[0])
+        records = RECORDS + ['(512)', ' (512)555-1234 SMITH JONES', '']
+        codes, lengths = encode_ragged(records)
+        aligned, (rows, gaps, chars) = _align(g, codes, lengths, 1)
+        for i, record in enumerate(records):
+            _codes, _lengths = encode_ragged([record])
+            _aligned, (_, _gaps, _chars) = _align(g, _codes, _lengths, 1)
+            self.assertEqual(_aligned[0].tolist(), aligned[i].tolist())
+            self.assertEqual(
+                sorted(zip(_gaps.tolist(), _chars.tolist())),
+                sorted(zip(gaps[rows == i].tolist(),
+                           chars[rows == i].tolist())))
+
+    def test_conflateAligned_negativeBand_raises(self):
+        """
+        Arrange: Create a graph.
+        Act: Conflate records with a negative band.
+        Assert: A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            Graph('abc').conflate_aligned(['abc'], band=-1)
+
+    def test_align_negativeBand_raises(self):
+        """
+        Arrange: Create a graph.
+        Act: Line up a record with a negative band.
+        Assert: A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            align(Graph('abc'), 'abc', band=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+from parameterized import parameterized
+from aliqat.graphs import conflate_batch
+from benchmarks.generator import chunks, generate, layout, records
+from benchmarks.suite import CASES, measure
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the synthetic ALI record generator (and the benchmarks that use
+    it).
+    """
+    @parameterized.expand([(80,), (256,), (512,), (5,)])
+    def test_layout_length_correct(self, length: int):
+        """
+        Arrange: Pick a record length.
+        Act: Lay out a record of that length.
+        Assert: The fields add up to the length.
+        """
+        self.assertEqual(length, sum(f.width for f in layout(length)))
+
+    def test_generate_sameSeed_sameRecords(self):
+        """
+        Arrange: Pick a layout.
+        Act: Generate records twice with the same seed.
+        Assert: The records are the same.
+        """
+        fields = layout(80)
+        self.assertTrue(
+            (generate(100, fields, 0.01, 7) ==
+             generate(100, fields, 0.01, 7)).all())
+
+    def test_chunks_chunkSize_sameRecords(self):
+        """
+        Arrange: Pick a layout.
+        Act: Generate records in chunks of different sizes.
+        Assert: The records are the same.
+        """
+        fields = layout(80)
+        a = np.concatenate(list(chunks(25000, fields, chunk_size=7000)))
+        b = np.concatenate(list(chunks(25000, fields, chunk_size=30000)))
+        self.assertEqual((25000, 80), a.shape)
+        self.assertTrue((a == b).all())
+
+    def test_records_noNoise_literalsKept(self):
+        """
+        Arrange: Generate records without noise.
+        Act: Learn a graph from them.
+        Assert: The layout's literals are learned.
+        """
+        fields = layout(128)
+        literals = conflate_batch(records(1000, fields)).literals
+        start = 0
+        for f in fields:
+            if f.kind == 'literal':
+                self.assertEqual(
+                    f.text,
+                    ''.join(map(chr, literals[start:start + f.width])))
+            start += f.width
+
+    @parameterized.expand([(case,) for case in CASES])
+    def test_measure_case_allRecords(self, case: str):
+        """
+        Arrange: Pick a benchmark case.
+        Act: Measure it over a few records.
+        Assert: All of the records are processed.
+        """
+        r = measure(case, 150, layout(80), chunk_size=100)
+        self.assertEqual(150, r.records)
+        self.assertTrue(r.complete)
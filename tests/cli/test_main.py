@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from aliqat.cli import main
+from aliqat.graphs import Graph
+from aliqat.snapshots import Snapshot, write_snapshot
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the command-line interface.
+    """
+    def _path(self) -> str:
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_main_merge_writesOutput(self):
+        """
+        Arrange: Write two snapshots.
+        Act: Merge them from the command line.
+        Assert: The merged snapshot is written.
+        """
+        a, b, out = self._path(), self._path(), self._path()
+        write_snapshot(a, {'x': Graph('abc1'), 'y': Graph('12')})
+        write_snapshot(b, {'x': Graph('abd2')})
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(0, main(['merge', a, b, '-o', out]))
+        with Snapshot(out) as snapshot:
+            self.assertEqual(['x', 'y'], snapshot.keys())
+            self.assertEqual('ab', str(snapshot['x'])[:2])
+
+    def test_main_mergeMissingInput_fails(self):
+        """
+        Arrange: Pick a path to a file that doesn't exist.
+        Act: Merge it from the command line.
+        Assert: The exit code indicates failure.
+        """
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(1, main([
+                'merge', os.path.join(tempfile.gettempdir(), 'nope.graphs'),
+                '-o', self._path()
+            ]))
+        self.assertIn('error', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from parameterized import parameterized
+from aliqat.clustering import Clusterer
+from aliqat.graphs import conflate_batch
+
+PHONES = ['(512)555-1234', '(713)555-9876', '(210)555-0000']
+STREETS = ['WPH2 12345 MAIN ST', 'WPH2 67890 ELM  ST', 'WPH2 24680 OAK  ST']
+DATES = ['01/02/2019 RESD', '11/30/2020 BUSN']
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of clustering records into families.
+    """
+    def test_addMany_mixedLayouts_familyForEach(self):
+        """
+        Arrange: Mix records of several layouts.
+        Act: Cluster them.
+        Assert: There's a family (with a graph that fits only its own
+            layout) for each layout.
+        """
+        records = [
+            r for rows in zip(PHONES, STREETS, DATES + ['']) for r in rows
+            if r
+        ]
+        clusterer = Clusterer()
+        families = clusterer.add_many(records)
+        self.assertEqual(3, len(clusterer))
+        self.assertEqual(
+            [0, 1, 2, 0, 1, 2, 0, 1], [f.index for f in families])
+        for family, layout in zip(clusterer.families,
+                                  (PHONES, STREETS, DATES)):
+            self.assertEqual(len(layout), family.records)
+            self.assertEqual(str(conflate_batch(layout)), str(family.graph))
+
+    def test_add_similarRecord_joinsFamily(self):
+        """
+        Arrange: Cluster some records.
+        Act: Add a record that differs from one family in a single position.
+        Assert: The record joins the family and widens its graph.
+        """
+        clusterer = Clusterer(max_distance=0.1)
+        clusterer.add_many(STREETS)
+        family = clusterer.add('WPH2 13579 ELM AST')
+        self.assertEqual(0, family.index)
+        self.assertEqual(4, family.records)
+        self.assertTrue(family.graph.compile().match('WPH2 13579 ELM AST')[0])
+
+    def test_addMany_sharedPrefix_postingsBounded(self):
+        """
+        Arrange: Make up many layouts that share a prefix.
+        Act: Cluster records of every layout (twice over).
+        Assert: Each layout gets a family, and no band's postings grow past
+            the limit (so looking up the shared bands costs no more as the
+            families grow).
+        """
+        rng = random.Random(5)
+        chars = {'A': 'ABCDEFGHIJ', '9': '0123456789', '-': '-'}
+        layouts = [
+            ''.join(rng.choice('A9-') for _ in range(24)) for _ in range(100)
+        ]
+
+        def record(layout):
+            return '(555)555-1234 ' + ''.join(
+                rng.choice(chars[c]) for c in layout)
+        clusterer = Clusterer(postings=8)
+        first = clusterer.add_many([record(l) for l in layouts])
+        again = clusterer.add_many([record(l) for l in layouts])
+        self.assertEqual(len(set(layouts)), len(clusterer))
+        self.assertEqual([f.index for f in first], [f.index for f in again])
+        self.assertEqual(
+            8, max(len(f) for f in clusterer._index.values()))
+
+    @parameterized.expand([
+        (0.0, 2),
+        (0.5, 1)
+    ])
+    def test_add_distance_respectsMaximum(self, max_distance, families):
+        """
+        Arrange: Cluster a record.
+        Act: Add a record that differs from it in some positions.
+        Assert: The record starts a new family only if it's too far away.
+        """
+        clusterer = Clusterer(max_distance=max_distance)
+        clusterer.add('(512)555-1234')
+        clusterer.add('(512)555-12AB')
+        self.assertEqual(families, len(clusterer))
+
+    def test_addMany_emptyRecords_shareFamily(self):
+        """
+        Arrange: Nothing.
+        Act: Cluster some empty records.
+        Assert: They share a family.
+        """
+        clusterer = Clusterer()
+        clusterer.add_many(['', '', ''])
+        self.assertEqual([3], [f.records for f in clusterer.families])
+
+    @parameterized.expand([
+        ({'band_width': 0},),
+        ({'probes': 0},),
+        ({'postings': 0},)
+    ])
+    def test_init_invalid_raises(self, kwargs):
+        """
+        Arrange: Nothing.
+        Act: Create a clusterer with an invalid argument.
+        Assert: A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            Clusterer(**kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
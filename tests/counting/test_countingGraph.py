@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.counting import CountingGraph
+from aliqat.graphs import CharClass, conflate_batch
+
+RECORDS = [
+    '911 MAIN ST  A1',
+    '912 OAK AVE  B2',
+    '913 ELM ST   C3',
+    '914 PINE RD  D4',
+    '915 MAIN ST  E5'
+]  #: some records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`CountingGraph` class.
+    """
+    @parameterized.expand([
+        (RECORDS,),
+        (RECORDS[:1],),
+        (['a1!', 'a1!', 'b1?', ' 1 '],),
+        (['Z€9', 'Z€8'],)
+    ])
+    def test_countingGraph_noThreshold_matchesConflate(self, records):
+        """
+        Arrange: Count the records.
+        Act: Derive a graph without a threshold.
+        Assert: The graph matches the one produced by conflating the
+        records (except for literals beyond the first 256 code points).
+
+        :param records: the records
+        """
+        cg = CountingGraph(len(records[0]))
+        cg.update(records)
+        expected = conflate_batch(records)
+        g = cg.graph()
+        self.assertEqual(expected.masks.tolist(), g.masks.tolist())
+        self.assertEqual(
+            [l if l < 0x100 else None for l in expected.literals.tolist()],
+            [l if l < 0x100 else None for l in g.literals.tolist()])
+
+    def test_countingGraph_threshold_ignoresNoise(self):
+        """
+        Arrange: Count many clean records and a single garbled one.
+        Act: Derive graphs with and without a threshold.
+        Assert: Only the graph without a threshold reflects the noise.
+        """
+        cg = CountingGraph(len(RECORDS[0]))
+        cg.update(RECORDS * 200)
+        cg.update(['9#1 M@IN ST  A1'])
+        self.assertEqual(conflate_batch(RECORDS).masks.tolist(),
+                         cg.graph(threshold=0.001).masks.tolist())
+        self.assertEqual(str(conflate_batch(RECORDS)),
+                         str(cg.graph(threshold=0.001)))
+        self.assertEqual(CharClass.ANY, cg.graph().masks[1])
+
+    def test_countingGraph_weights_matchRepeats(self):
+        """
+        Arrange: Count some records, repeating them.
+        Act: Count the same records once apiece, with weights.
+        Assert: The counts are the same.
+        """
+        repeated = CountingGraph(len(RECORDS[0]))
+        repeated.update(RECORDS[:1] * 3 + RECORDS[1:2] * 2 + RECORDS[2:])
+        weighted = CountingGraph(len(RECORDS[0]))
+        weighted.update(RECORDS, [3, 2, 1, 1, 1])
+        self.assertEqual(repeated.total, weighted.total)
+        self.assertEqual(repeated.class_counts.tolist(),
+                         weighted.class_counts.tolist())
+        self.assertEqual(repeated.literal_counts.tolist(),
+                         weighted.literal_counts.tolist())
+        with self.assertRaises(ValueError):
+            weighted.update(RECORDS, [1])
+
+    @parameterized.expand([
+        (None,),
+        ([2, -1, 3, 1, 1],)
+    ])
+    def test_countingGraph_batchSizes_sameCounts(self, weights):
+        """
+        Arrange: Count some records one at a time.
+        Act: Count the same records in a small batch and in a large one.
+        Assert: The counts are the same.
+        """
+        weights = weights or [1] * len(RECORDS)
+        single = CountingGraph(len(RECORDS[0]))
+        for record, weight in zip(RECORDS, weights):
+            single.update([record], [weight])
+        small = CountingGraph(len(RECORDS[0]))
+        small.update(RECORDS, weights)
+        large = CountingGraph(len(RECORDS[0]))
+        large.update(RECORDS * 100, weights * 100)
+        self.assertEqual(small.literal_counts.tolist(),
+                         single.literal_counts.tolist())
+        self.assertEqual(small.class_counts.tolist(),
+                         single.class_counts.tolist())
+        self.assertEqual((small.literal_counts * 100).tolist(),
+                         large.literal_counts.tolist())
+        self.assertEqual((small.class_counts * 100).tolist(),
+                         large.class_counts.tolist())
+
+    def test_countingGraph_merge_addsCounts(self):
+        """
+        Arrange: Count two halves of the records in separate graphs.
+        Act: Merge them.
+        Assert: The counts match counting all the records in one graph.
+        """
+        a, b, c = (CountingGraph(len(RECORDS[0])) for _ in range(3))
+        a.update(RECORDS[:2])
+        b.update(RECORDS[2:])
+        c.update(RECORDS)
+        a.merge(b)
+        self.assertEqual(c.total, a.total)
+        self.assertEqual(c.class_counts.tolist(), a.class_counts.tolist())
+        self.assertEqual(c.literal_counts.tolist(),
+                         a.literal_counts.tolist())
+
+    def test_countingGraph_largeCounts_noOverflow(self):
+        """
+        Arrange: Count a record with a weight that nearly fills 32 bits.
+        Act: Count it again and merge the graph with a copy of itself.
+        Assert: The counts don't wrap around.
+        """
+        cg = CountingGraph(1)
+        cg.update(['a'], [2 ** 31 - 1])
+        cg.update(['a'] * 2, [2 ** 31 - 1] * 2)
+        cg.merge(cg)
+        expected = 6 * (2 ** 31 - 1)
+        self.assertEqual(expected, int(cg.literal_counts[0, ord('a')]))
+        self.assertEqual(expected, int(cg.class_counts[0].max()))
+        self.assertEqual(expected, cg.total)
+
+    def test_countingGraph_topLiterals_correct(self):
+        """
+        Arrange: Count some records.
+        Act: Get the top literals.
+        Assert: The most frequent literals (and their counts) are correct.
+        """
+        cg = CountingGraph(2)
+        cg.update(['a1', 'b1', 'a2', 'a1'])
+        codes, counts = cg.top_literals(2)
+        self.assertEqual([ord('a'), ord('b')], codes[0].tolist())
+        self.assertEqual([3, 1], counts[0].tolist())
+        self.assertEqual([ord('1'), ord('2')], codes[1].tolist())
+        self.assertEqual([3, 1], counts[1].tolist())
+
+    def test_countingGraph_empty_raisesValueError(self):
+        """
+        Arrange: Create a counting graph.
+        Act: Derive a graph without counting anything.
+        Assert: A :py:class:`ValueError` is raised.
+        """
+        with self.assertRaises(ValueError):
+            CountingGraph(3).graph()
+
+
+if __name__ == '__main__':
+    unittest.main()
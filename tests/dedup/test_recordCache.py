@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from aliqat.counting import CountingGraph
+from aliqat.dedup import RecordCache
+from aliqat.graphs import conflate_batch
+from aliqat.instruments import instrument
+
+RECORDS = [
+    b'(512)555-1234',
+    b'(713)555-9876',
+    b'(512)555-1234',
+    b'(281)555-0000',
+    b'(512)555-1234',
+    b'(713)555-9876'
+]  #: some records (with duplicates)
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`RecordCache` class.
+    """
+    def test_recordCache_filter_skipsDuplicates(self):
+        """
+        Arrange: Create a cache.
+        Act: Filter some records with duplicates.
+        Assert: Each record is passed on once, and the conflated graph is
+            the same.
+        """
+        cache = RecordCache()
+        with instrument() as counters:
+            unique = cache.unique(RECORDS)
+        self.assertEqual(
+            [RECORDS[0], RECORDS[1], RECORDS[3]], unique)
+        self.assertEqual(3, cache.hits)
+        self.assertEqual(3, cache.misses)
+        self.assertEqual(3, counters.duplicates)
+        self.assertEqual(
+            str(conflate_batch(RECORDS)), str(conflate_batch(unique)))
+
+    def test_recordCache_flush_countsOccurrences(self):
+        """
+        Arrange: Count some records with duplicates.
+        Act: Flush the counts (twice).
+        Assert: The counts are correct, then reset.
+        """
+        cache = RecordCache()
+        cache.unique(RECORDS)
+        self.assertEqual(
+            {RECORDS[0]: 3, RECORDS[1]: 2, RECORDS[3]: 1},
+            dict(cache.flush()))
+        self.assertEqual([], cache.flush())
+        self.assertIn(bytearray(RECORDS[0]), cache)
+
+    def test_recordCache_capacity_forgetsLeastRecent(self):
+        """
+        Arrange: Create a cache that remembers two records.
+        Act: Add three distinct records, then the first again.
+        Assert: The first record is forgotten (so it's new again), but its
+            count isn't lost.
+        """
+        cache = RecordCache(capacity=2)
+        self.assertEqual(
+            [RECORDS[0], RECORDS[1], RECORDS[3], RECORDS[0]],
+            cache.unique([RECORDS[0], RECORDS[1], RECORDS[3], RECORDS[0]]))
+        self.assertEqual(2, len(cache))
+        self.assertEqual(4, sum(n for _, n in cache.flush()))
+
+    def test_recordCache_feed_matchesCountingGraph(self):
+        """
+        Arrange: Count some records with duplicates.
+        Act: Feed the counts to a counting graph.
+        Assert: The counts match a counting graph that saw every record.
+        """
+        cache = RecordCache()
+        cache.unique(RECORDS + [b'too long for the graph'])
+        fed = CountingGraph(len(RECORDS[0]))
+        others = cache.feed(fed)
+        expected = CountingGraph(len(RECORDS[0]))
+        expected.update(RECORDS)
+        self.assertEqual(expected.total, fed.total)
+        self.assertEqual(expected.literal_counts.tolist(),
+                         fed.literal_counts.tolist())
+        self.assertEqual([(b'too long for the graph', 1)], others)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from aliqat.fields import Field, FieldParser, infer_fields
+from aliqat.graphs import CharClass, conflate_batch
+
+RECORDS = [
+    '(512)555-1234 JOHN   SMITH',
+    '(713)555-9876 MARY   JONES',
+    '(281)555-0000 ED     LI   '
+]  #: some records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:func:`infer_fields` function and the
+    :py:class:`FieldParser` class.
+    """
+    def setUp(self):
+        self.graph = conflate_batch(RECORDS)
+
+    def test_inferFields_correct(self):
+        """
+        Arrange: Learn a graph from some records.
+        Act: Infer the fields.
+        Assert: The fields are correct.
+        """
+        padded = CharClass.ALPHA | CharClass.EMPTY
+        self.assertEqual([
+            Field(0, 1, CharClass.ANY, '('),
+            Field(1, 4, CharClass.DIGIT, None),
+            Field(4, 9, CharClass.ANY, ')555-'),
+            Field(9, 13, CharClass.DIGIT, None),
+            Field(13, 14, CharClass.EMPTY, ' '),
+            Field(14, 18, padded, None),
+            Field(18, 21, CharClass.EMPTY, '   '),
+            Field(21, 26, padded, None)
+        ], infer_fields(self.graph))
+
+    def test_inferFields_paddedColumnsJoinNeighbours(self):
+        """
+        Arrange: Learn a graph from records with a left-justified field.
+        Act: Infer the fields.
+        Assert: The padded columns belong to the same field as the others.
+        """
+        g = conflate_batch(['AB  |', 'XYCD|', 'Q   |'])
+        fields = infer_fields(g)
+        self.assertEqual(
+            [(0, 4), (4, 5)], [(f.start, f.stop) for f in fields])
+        self.assertTrue(fields[0].is_padded)
+        self.assertTrue(fields[1].is_literal)
+
+    def test_fieldParser_parse_zeroCopy(self):
+        """
+        Arrange: Create a parser from a graph.
+        Act: Parse a bytes record.
+        Assert: The fields are memoryviews of the record with the expected
+        contents.
+        """
+        parser = FieldParser.from_graph(self.graph)
+        record = bytearray(b'(999)555-1111 BOB    X    ')
+        fields = parser.parse(record)
+        self.assertTrue(all(isinstance(f, memoryview) for f in fields))
+        self.assertEqual(
+            [b'999', b'1111', b'BOB ', b'X    '],
+            [f.tobytes() for f in fields])
+        record[1] = ord('8')  # The fields are views, so they see this.
+        self.assertEqual(b'899', fields[0].tobytes())
+        self.assertEqual(
+            ('999', '1111', 'BOB ', 'X    '),
+            parser.parse('(999)555-1111 BOB    X    '))
+
+    def test_fieldParser_parseBlock_correct(self):
+        """
+        Arrange: Create a parser from a graph.
+        Act: Parse a block of records.
+        Assert: Each field's array holds the field from every record.
+        """
+        parser = FieldParser.from_graph(self.graph, literals=True)
+        block = ''.join(RECORDS).encode()
+        columns = parser.parse_block(block, len(RECORDS[0]))
+        self.assertEqual(len(parser.fields), len(columns))
+        self.assertEqual(
+            [b'512', b'713', b'281'],
+            [row.tobytes() for row in columns[1]])
+        self.assertEqual(
+            [b')555-'] * 3, [row.tobytes() for row in columns[2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
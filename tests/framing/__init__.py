@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Created by pat on 3/10/18
+"""
+.. currentmodule:: __init__.py
+.. moduleauthor:: Pat Daburu <pat@daburu.net>
+
+Say something descriptive about the '__init__.py' module.
+"""
\ No newline at end of file
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+from parameterized import parameterized
+from aliqat.framing import (
+    DelimitedFramer, FixedFramer, Framer, StxEtxFramer
+)
+
+RECORDS = [
+    b'(512)555-1234 JOHN',
+    b'(713)555-9876 MARY ANN',
+    b'(281)555-0000'
+]  #: some records (of different lengths)
+
+
+def _frame(framer: Framer, data: bytes, chunk: int):
+    """
+    Feed a framer a few bytes at a time, copying the records it returns.
+    """
+    records = []
+    for i in range(0, len(data), chunk):
+        records.extend(bytes(r) for r in framer.feed(data[i:i + chunk]))
+    records.extend(bytes(r) for r in framer.flush())
+    return records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the framers.
+    """
+    @parameterized.expand([
+        (1,),
+        (2,),
+        (7,),
+        (1000,)
+    ])
+    def test_delimitedFramer_chunks_sameRecords(self, chunk):
+        """
+        Arrange: Join records with CRLFs (and a blank line).
+        Act: Frame them, a few bytes at a time, with a tiny buffer.
+        Assert: The records come back (without the blank line), and the last
+            one doesn't need a delimiter.
+
+        :param chunk: the number of bytes fed at once
+        """
+        data = b'\r\n'.join(RECORDS[:2]) + b'\r\n\r\n' + RECORDS[2]
+        self.assertEqual(
+            RECORDS, _frame(DelimitedFramer(size=4), data, chunk))
+
+    @parameterized.expand([
+        (1,),
+        (3,),
+        (1000,)
+    ])
+    def test_stxEtxFramer_noise_discarded(self, chunk):
+        """
+        Arrange: Frame records with STX and ETX (and an LRC byte), with noise
+            between the frames and a frame that's interrupted.
+        Act: Frame them, a few bytes at a time.
+        Assert: Only the complete frames come back, and the rest is counted
+            as discarded.
+
+        :param chunk: the number of bytes fed at once
+        """
+        data = (
+            b'\x02' + RECORDS[0] + b'\x03L' +
+            b'~~' + b'\x02garbled' +
+            b'\x02' + RECORDS[1] + b'\x03L' +
+            b'\r\n\x02' + RECORDS[2] + b'\x03L' + b'\x02cut off'
+        )
+        framer = StxEtxFramer(trailer=1)
+        self.assertEqual(RECORDS, _frame(framer, data, chunk))
+        self.assertEqual(
+            len(b'~~\x02garbled\r\n\x02cut off'), framer.discarded)
+
+    @parameterized.expand([
+        (b'', 5),
+        (b'\r\n', 3),
+        (b'\n', 100)
+    ])
+    def test_fixedFramer_delimiter_sameRecords(self, delimiter, chunk):
+        """
+        Arrange: Join fixed-length records with a delimiter.
+        Act: Frame them, a few bytes at a time.
+        Assert: The records come back.
+
+        :param delimiter: the delimiter
+        :param chunk: the number of bytes fed at once
+        """
+        records = [r.ljust(24) for r in RECORDS]
+        data = delimiter.join(records)
+        self.assertEqual(
+            records, _frame(FixedFramer(24, delimiter, size=8), data, chunk))
+
+    def test_framer_readInto_zeroCopy(self):
+        """
+        Arrange: Put delimited records in a stream.
+        Act: Read the stream directly into the framer's buffer.
+        Assert: The records come back as views of the framer's buffer.
+        """
+        stream = io.BytesIO(b'\n'.join(RECORDS))
+        framer = DelimitedFramer(b'\n', size=16)
+        records = []
+        while True:
+            n = stream.readinto(framer.buffer(8)[:8])
+            framed = framer.commit(n) if n else framer.flush()
+            self.assertTrue(all(isinstance(r, memoryview) for r in framed))
+            records.extend(bytes(r) for r in framed)
+            if not n:
+                break
+        self.assertEqual(RECORDS, records)
+        self.assertEqual(0, len(framer))
+
+    @parameterized.expand([
+        (1,),
+        (3,),
+        (1000,)
+    ])
+    def test_delimitedFramer_runOn_discardedAndResynced(self, chunk):
+        """
+        Arrange: Put a record that's too long between good ones.
+        Act: Frame the records (a few bytes at a time).
+        Assert: The long record is discarded (and counted), the others come
+            through, and the buffer stays bounded.
+        """
+        long = b'X' * 100
+        data = b'\r\n'.join([RECORDS[0], long, RECORDS[1], RECORDS[2]])
+        framer = DelimitedFramer(size=8, max_frame=32)
+        self.assertEqual(
+            [RECORDS[0], RECORDS[1], RECORDS[2]], _frame(framer, data, chunk))
+        self.assertEqual(len(long) + 2, framer.discarded)
+        self.assertLessEqual(len(framer._buffer), 2 * (32 + chunk))
+
+    @parameterized.expand([
+        (1,),
+        (5,),
+        (1000,)
+    ])
+    def test_stxEtxFramer_noEtx_discardedAndResynced(self, chunk):
+        """
+        Arrange: Send a frame that never ends, then good frames.
+        Act: Frame the stream (a few bytes at a time).
+        Assert: The unfinished frame is discarded and the good frames come
+            through.
+        """
+        data = (
+            b'\x02' + b'Y' * 200 +
+            b''.join(b'\x02' + r + b'\x03' for r in RECORDS)
+        )
+        framer = StxEtxFramer(size=8, max_frame=64)
+        self.assertEqual(RECORDS, _frame(framer, data, chunk))
+        self.assertEqual(201, framer.discarded)
+        self.assertLessEqual(len(framer._buffer), 2 * (64 + chunk))
+
+    def test_framer_badArguments_raise(self):
+        """
+        Arrange: Nothing.
+        Act: Create framers with an empty delimiter and a zero length.
+        Assert: ValueErrors are raised.
+        """
+        with self.assertRaises(ValueError):
+            DelimitedFramer(b'')
+        with self.assertRaises(ValueError):
+            FixedFramer(0)
+        with self.assertRaises(ValueError):
+            FixedFramer(10, b'\r\n', max_frame=11)
+        with self.assertRaises(ValueError):
+            StxEtxFramer(max_frame=0)
+
+    def test_framer_base_abstract(self):
+        """
+        Arrange: Nothing.
+        Act: Create a framer that doesn't say where the frames are.
+        Assert: A TypeError is raised.
+        """
+        with self.assertRaises(TypeError):
+            Framer()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import CharClass, Classifier, Graph
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`Classifier` class.
+    """
+    @parameterized.expand([
+        ('a', CharClass.ALPHA),
+        ('Z', CharClass.ALPHA),
+        ('é', CharClass.ALPHA),
+        ('7', CharClass.DIGIT),
+        (' ', CharClass.EMPTY),
+        ('\r', CharClass.EMPTY),
+        ('\n', CharClass.EMPTY),
+        ('!', CharClass.SPECIAL),
+        ('.', CharClass.SPECIAL),
+        ('#', CharClass.ANY),
+        ('€', CharClass.ANY),
+        ('Ж', CharClass.ALPHA)
+    ])
+    def test_classifier_classifyChar_correct(self, c, cc):
+        """
+        Arrange: Create a classifier.
+        Act: Classify a single character.
+        Assert: The character class matches the second parameter (cc).
+
+        :param c: the character
+        :param cc: the expected character class
+        """
+        self.assertEqual(cc, Classifier().classify_char(c))
+
+    @parameterized.expand([
+        ('911 MAIN ST\r\n',),
+        ('(555) 867-5309 # é',),
+        ('Ж€ mixed 42',),
+        ('',)
+    ])
+    def test_classifier_classify_matchesClassifyChar(self, s):
+        """
+        Arrange: Create a classifier.
+        Act: Classify a whole string (and its bytes, if it has any).
+        Assert: The result matches classifying each character individually.
+
+        :param s: the string
+        """
+        classifier = Classifier()
+        expected = bytes(classifier.classify_char(c) for c in s)
+        self.assertEqual(expected, classifier.classify(s))
+        try:
+            b = s.encode('latin-1')
+        except UnicodeEncodeError:
+            return
+        self.assertEqual(expected, classifier.classify(b))
+        self.assertEqual(expected, classifier.classify(memoryview(b)))
+
+    def test_classifier_customCharacters_correct(self):
+        """
+        Arrange: Create a classifier with custom empty and special characters.
+        Act: Classify some characters.
+        Assert: The custom characters are classified accordingly.
+        """
+        classifier = Classifier(empty=' _', special='#')
+        self.assertEqual(CharClass.EMPTY, classifier.classify_char('_'))
+        self.assertEqual(CharClass.SPECIAL, classifier.classify_char('#'))
+        self.assertEqual(CharClass.ANY, classifier.classify_char('!'))
+        self.assertEqual(CharClass.ANY, classifier.classify_char('\r'))
+
+    def test_graph_customClassifier_conflatesWithClassifier(self):
+        """
+        Arrange: Create graphs with a custom classifier.
+        Act: Conflate them.
+        Assert: The conflated graph reflects the custom classification.
+        """
+        classifier = Classifier(special='#')
+        g = Graph('#', classifier=classifier)
+        g.conflate(Graph('$'))
+        self.assertEqual(CharClass.ANY.char, str(g))
+        g = Graph('#', classifier=classifier)
+        g.conflate_many(['@'])
+        self.assertEqual(CharClass.ANY.char, str(g))
+        g = Graph('#', classifier=classifier)
+        g.conflate(Graph(' '))
+        self.assertEqual(
+            CharClass.from_int(CharClass.SPECIAL | CharClass.EMPTY), str(g))
+
+
+if __name__ == '__main__':
+    unittest.main()
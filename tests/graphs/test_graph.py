@@ -3,9 +3,12 @@
 
 # Created by pat on 3/10/18
 
+import pickle
 import unittest
 from parameterized import parameterized
-from aliqat.graphs import CharClass, Graph
+from aliqat.graphs import (
+    CharClass, Classifier, Graph, NO_LITERAL, conflate_batch
+)
 
 
 class TestSuite(unittest.TestCase):
@@ -134,6 +137,214 @@ class TestSuite(unittest.TestCase):
                 "a={}; b={}; c={}; d={}".format(
                     repr(_a), repr(_b), repr(_c), repr(_d)))
 
+    @parameterized.expand([
+        (['911 MAIN ST', '911 MAIN ST', '911 MAIN ST'],),
+        (['911 MAIN ST', '912 OAK  AV', '913 ELM  ST'],),
+        (['A1!', 'b2?', ' 3#', '\r4<'],),
+        (['Z€9', 'Z€8', 'Zé7'],),
+        (['abc'],)
+    ])
+    def test_graph_conflateMany_matchesConflate(self, records):
+        """
+        Arrange: Create two graphs from the first record.
+        Act: Conflate the remaining records into one graph one at a time, and
+        into the other graph as a batch.
+        Assert: The graphs match.
+
+        :param records: the records
+        """
+        serial = Graph(records[0])
+        for record in records[1:]:
+            serial.conflate(Graph(record))
+        batch = Graph(records[0])
+        batch.conflate_many(records[1:])
+        self.assertEqual(str(serial), str(batch))
+
+    @parameterized.expand([
+        (['abc', 'abcd', 'ab'],),
+        (['ab', 'abcd', 'abc'],),
+        ([b'12:34', b'12', b'12:34 X'],),
+        (['Z€9', 'Z€', 'Z€9é'],),
+        (['ab', ''],)
+    ])
+    def test_graph_conflateRagged_matchesPadded(self, records):
+        """
+        Arrange: Create records of different lengths.
+        Act: Conflate them one at a time, as a batch and as graphs.
+        Assert: The graphs match the one conflated from the records padded
+        with empty characters (except that the padded positions hold no
+        literals).
+
+        :param records: the records
+        """
+        width = max(len(r) for r in records)
+        pad = ' ' if isinstance(records[0], str) else b' '
+        expected = conflate_batch(
+            [r + pad * (width - len(r)) for r in records])
+        masks = expected.masks
+        literals = expected.literals
+        for r in records:
+            literals[len(r):] = NO_LITERAL
+        serial = Graph(records[0])
+        for record in records[1:]:
+            serial.conflate(record)
+        graphs = Graph(records[0])
+        for record in records[1:]:
+            graphs.conflate(Graph(record))
+        batch = Graph(records[0])
+        batch.conflate_many(records[1:])
+        for g in [serial, graphs, batch, conflate_batch(records)]:
+            self.assertEqual(masks.tolist(), g.masks.tolist())
+            self.assertEqual(literals.tolist(), g.literals.tolist())
+
+    def test_graph_minSize_emptyPositions(self):
+        """
+        Arrange: Pick a record.
+        Act: Create a graph with a minimum size larger than the record.
+        Assert: The graph has the minimum size and the positions beyond the
+        record are empty.
+        """
+        g = Graph('a1', min_size=4)
+        self.assertEqual(4, len(g))
+        self.assertEqual(
+            ['a', '1', CharClass.EMPTY, CharClass.EMPTY], list(g))
+        self.assertTrue(g.compile().match('a1')[0])
+        self.assertEqual(2, len(Graph('ab', min_size=1)))
+
+    def test_conflateBatch_chunked_matchesConflate(self):
+        """
+        Arrange: Create a list of records.
+        Act: Conflate the records in small chunks.
+        Assert: The result matches conflating the records one at a time.
+        """
+        records = ['{:03d}-{}'.format(i, 'AB'[i % 2]) for i in range(25)]
+        serial = Graph(records[0])
+        for record in records[1:]:
+            serial.conflate(Graph(record))
+        batch = conflate_batch(records, chunk_size=4)
+        self.assertEqual(str(serial), str(batch))
+
+    def test_conflateBatch_parallel_matchesSerial(self):
+        """
+        Arrange: Create a list of records.
+        Act: Conflate the records serially and in parallel.
+        Assert: The results match.
+        """
+        records = ['{:03d}-{}'.format(i, 'AB'[i % 2]) for i in range(250)]
+        serial = conflate_batch(records, chunk_size=16)
+        parallel = conflate_batch(records, chunk_size=16, workers=2)
+        self.assertEqual(str(serial), str(parallel))
+        self.assertEqual(serial.literals.tolist(),
+                         parallel.literals.tolist())
+
+    @parameterized.expand([
+        (bytes,), (bytearray,), (memoryview,)
+    ])
+    def test_graph_bytes_matchesStr(self, t):
+        """
+        Arrange: Create graphs from strings and from bytes-like records.
+        Act: Conflate more strings and bytes-like records into them.
+        Assert: The graphs match.
+
+        :param t: the bytes-like type
+        """
+        records = ['911 MAIN ST', '912 OAK  AV', '913 ELM  ST', '9']
+        expected = Graph(records[0])
+        for record in records[1:]:
+            expected.conflate(Graph(record))
+        g = Graph(t(records[0].encode()))
+        for record in records[1:]:
+            g.conflate(t(record.encode()))
+        self.assertEqual(str(expected), str(g))
+        self.assertEqual(expected.literals.tolist(), g.literals.tolist())
+        g = Graph(t(records[0].encode()))
+        g.conflate_many([t(record.encode()) for record in records[1:3]])
+        g.conflate(Graph(t(records[3].encode())))
+        self.assertEqual(str(expected), str(g))
+
+    def test_graph_conflateRecord_matchesConflateGraph(self):
+        """
+        Arrange: Create two graphs.
+        Act: Conflate records into one of them and graphs of the same records
+        into the other.
+        Assert: The graphs match.
+        """
+        records = ['a1!', 'b€?', 'a1', 'a1!!']
+        g1, g2 = Graph(records[0]), Graph(records[0])
+        for record in records[1:]:
+            g1.conflate(record)
+            g2.conflate(Graph(record))
+        self.assertEqual(str(g2), str(g1))
+
+    def test_graph_slots_noInstanceDict(self):
+        """
+        Arrange: Create a graph.
+        Act: Try to set an attribute that isn't declared in the slots.
+        Assert: An :py:class:`AttributeError` is raised.
+        """
+        g = Graph('abc')
+        with self.assertRaises(AttributeError):
+            g.foo = 'bar'
+
+    def test_graph_masksAndLiterals_correct(self):
+        """
+        Arrange: Create a graph and conflate a record into it.
+        Act: Get the masks and literals.
+        Assert: The masks and literals reflect the conflation.
+        """
+        g = Graph('a1!')
+        g.conflate(Graph('a2!'))
+        self.assertEqual(
+            [CharClass.ALPHA, CharClass.DIGIT, CharClass.SPECIAL],
+            g.masks.tolist())
+        self.assertEqual([ord('a'), NO_LITERAL, ord('!')],
+                         g.literals.tolist())
+
+    def test_graph_pickle_roundTrips(self):
+        """
+        Arrange: Create graphs with the default and a custom classifier.
+        Act: Pickle and unpickle them.
+        Assert: The unpickled graphs match the originals.
+        """
+        for classifier in [None, Classifier(special='#')]:
+            g = Graph('a1!', classifier=classifier)
+            g.conflate(Graph('b1?'))
+            _g = pickle.loads(pickle.dumps(g))
+            self.assertEqual(str(g), str(_g))
+            self.assertEqual(g.masks.tolist(), _g.masks.tolist())
+            self.assertEqual(g.literals.tolist(), _g.literals.tolist())
+            self.assertEqual(
+                g._classifier.special, _g._classifier.special)
+
+    def test_graph_toBytes_roundTrips(self):
+        """
+        Arrange: Create graphs with the default and a custom classifier.
+        Act: Serialize and deserialize them.
+        Assert: The deserialized graphs match the originals.
+        """
+        for classifier in [None, Classifier(special='#')]:
+            g = Graph('a1!\u20ac', classifier=classifier)
+            g.conflate(Graph('b1?\u20ac'))
+            _g = Graph.from_bytes(g.to_bytes())
+            self.assertEqual(str(g), str(_g))
+            self.assertEqual(g.masks.tolist(), _g.masks.tolist())
+            self.assertEqual(g.literals.tolist(), _g.literals.tolist())
+            self.assertEqual(
+                g._classifier.special, _g._classifier.special)
+
+    @parameterized.expand([
+        (b'',), (b'AQGR',), (b'NOPE' + bytes(8),),
+        (Graph('abc').to_bytes()[:-1],)
+    ])
+    def test_graph_fromBytesBadData_raisesValueError(self, data):
+        """
+        Arrange: Create some bytes that aren't a serialized graph.
+        Act: Deserialize them.
+        Assert: A value error is raised.
+        """
+        with self.assertRaises(ValueError):
+            Graph.from_bytes(data)
+
 
 if __name__ == '__main__':
     unittest.main()
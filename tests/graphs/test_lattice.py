@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+import unittest
+import numpy as np
+from parameterized import parameterized
+from aliqat.counting import CountingGraph
+from aliqat.graphs import (
+    CharClass, ClassDef, Classifier, Graph, Lattice, NO_GLYPH, NO_LITERAL,
+    conflate_batch
+)
+from aliqat.rendering import render_many
+
+HEX = ClassDef('HEX', 'h', 'ABCDEF')
+UPPER = ClassDef('UPPER', 'A', predicate='upper')
+LOWER = ClassDef('LOWER', 'a', predicate='lower')
+DIGIT = ClassDef('DIGIT', 'ℝ', predicate='digit')
+DASH = ClassDef('DASH', '‐', '-')
+#: a lattice with five classes (so its masks fit in a byte)
+LATTICE = Lattice([HEX, UPPER, LOWER, DIGIT, DASH])
+#: the same classes, followed by enough separators to need 16-bit masks
+WIDE = Lattice(
+    [HEX, UPPER, LOWER, DIGIT, DASH] +
+    [ClassDef('SEP{}'.format(i), c, c) for i, c in enumerate('/:.,;()#@')])
+RECORDS = [
+    'AB-12 call 911',
+    'FF-99 CALL 911',
+    'C0-7a call 911 (x)',
+    'zz/01 #@ 911'
+]  #: some records (of different lengths)
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`Lattice` class.
+    """
+    @parameterized.expand([
+        ('A', 'HEX'),
+        ('G', 'UPPER'),
+        ('é', 'LOWER'),
+        ('7', 'DIGIT'),
+        ('-', 'DASH'),
+        (' ', 'EMPTY'),
+        ('!', 'ANY')
+    ])
+    def test_lattice_classifyChar_firstClass(self, c, name):
+        """
+        Arrange: Create a classifier with a lattice.
+        Act: Classify a single character.
+        Assert: The character belongs to the first class that contains it.
+
+        :param c: the character
+        :param name: the name of the expected class
+        """
+        classifier = Classifier(lattice=LATTICE)
+        self.assertEqual(LATTICE.mask(name), classifier.classify_char(c))
+        self.assertEqual(
+            LATTICE.mask(name),
+            classifier.classify_codes(np.array([ord(c)]))[0])
+
+    @parameterized.expand([
+        (LATTICE, np.uint8, 6),
+        (WIDE, np.uint16, 15),
+        (Lattice([ClassDef('C{}'.format(i), 'c') for i in range(20)]),
+         np.uint32, 21)
+    ])
+    def test_lattice_bits_widenMasks(self, lattice, dtype, bits):
+        """
+        Arrange: Create a lattice.
+        Act: Create a graph with it.
+        Assert: The masks are as wide as they need to be.
+
+        :param lattice: the lattice
+        :param dtype: the expected type of the masks
+        :param bits: the expected number of bits
+        """
+        g = Graph('Ab-1', classifier=Classifier(lattice=lattice))
+        self.assertEqual(bits, lattice.bits)
+        self.assertEqual(np.dtype(dtype), g.masks.dtype)
+
+    @parameterized.expand([
+        (LATTICE,),
+        (WIDE,)
+    ])
+    def test_lattice_conflate_matchesMatcher(self, lattice):
+        """
+        Arrange: Create a classifier with a lattice.
+        Act: Conflate records one at a time and in a batch.
+        Assert: The graphs are the same, and every record matches.
+
+        :param lattice: the lattice
+        """
+        classifier = Classifier(lattice=lattice)
+        g = Graph(RECORDS[0], classifier=classifier)
+        for r in RECORDS[1:]:
+            g.conflate(r)
+        batch = conflate_batch(RECORDS, classifier=classifier)
+        self.assertEqual(g.masks.tolist(), batch.masks.tolist())
+        self.assertEqual(g.literals.tolist(), batch.literals.tolist())
+        self.assertEqual(lattice.mask('HEX', 'LOWER'), g.masks[0])
+        matcher = g.compile()
+        for r in RECORDS:
+            self.assertEqual((True, -1), matcher.match(r))
+            self.assertEqual(0, matcher.distance(r))
+        self.assertEqual((False, 0), matcher.match('-B-12 call 911'))
+        self.assertEqual(1, matcher.distance('-B-12 call 911'))
+
+    def test_lattice_toBytes_roundTrips(self):
+        """
+        Arrange: Learn a graph with a 16-bit lattice.
+        Act: Serialize it, then deserialize it.
+        Assert: The graph (and its lattice) survive.
+        """
+        g = conflate_batch(RECORDS, classifier=Classifier(lattice=WIDE))
+        _g = Graph.from_bytes(g.to_bytes())
+        self.assertEqual(WIDE, _g._classifier.lattice)
+        self.assertEqual(g.masks.tolist(), _g.masks.tolist())
+        self.assertEqual(g.literals.tolist(), _g.literals.tolist())
+        self.assertEqual(str(g), str(_g))
+        with self.assertRaises(ValueError):
+            Graph.from_bytes(g.to_bytes(), classifier=Classifier())
+
+    def test_lattice_pickle_roundTrips(self):
+        """
+        Arrange: Create a classifier with a lattice.
+        Act: Pickle it, then unpickle it.
+        Assert: The classifier classifies characters the same way.
+        """
+        classifier = Classifier(empty=' _', lattice=WIDE)
+        _classifier = pickle.loads(pickle.dumps(classifier))
+        self.assertTrue(classifier.same_as(_classifier))
+        self.assertFalse(classifier.same_as(Classifier(lattice=LATTICE)))
+
+    def test_lattice_glyphs_generated(self):
+        """
+        Arrange: Create a lattice with a glyph for a combination of classes.
+        Act: Get the glyphs of some masks.
+        Assert: Classes and the given combination get their glyphs, and
+            other combinations get generated ones.
+        """
+        both = LATTICE.mask('HEX', 'DIGIT')
+        lattice = Lattice(LATTICE.classes, glyphs={both: 'x'})
+        self.assertEqual('h', lattice.glyph(lattice.mask('HEX')))
+        self.assertEqual('x', lattice.glyph(both))
+        self.assertEqual(GLYPH_EMPTY, lattice.glyph(CharClass.EMPTY))
+        self.assertEqual(
+            chr(0x2800 + lattice.mask('UPPER', 'LOWER')),
+            lattice.glyph(lattice.mask('UPPER', 'LOWER')))
+        self.assertEqual(
+            chr(0xf0000 + WIDE.mask('SEP0', 'SEP1')),
+            WIDE.glyph(WIDE.mask('SEP0', 'SEP1')))
+        g = Graph('Ab', classifier=Classifier(lattice=lattice))
+        g.conflate('Cd')
+        self.assertEqual('ha', str(g))
+
+    def test_lattice_wideGlyphs_distinct(self):
+        """
+        Arrange: Create a lattice of more than 16 bits.
+        Act: Get the glyphs of masks that involve the highest classes.
+        Assert: The masks that can be rendered get distinct glyphs, and the
+            ones that can't are rendered as NO_GLYPH (or, strictly, raise a
+            ValueError).
+        """
+        lattice = Lattice(
+            [ClassDef('C{}'.format(i), 'c', chr(ord('A') + i))
+             for i in range(20)])
+        masks = [
+            lattice.mask('C0', 'C1'),
+            0xfffe, 0xffff,
+            lattice.mask('C14', 'C15'),
+            lattice.mask('C0', 'C14', 'C15')
+        ]
+        glyphs = [lattice.glyph(m) for m in masks]
+        self.assertEqual(len(masks), len(set(glyphs)))
+        self.assertNotIn('\ufffd', glyphs)
+        self.assertEqual('c', lattice.glyph(lattice.mask('C19')))
+        self.assertEqual(
+            NO_GLYPH, lattice.glyph(lattice.mask('C18', 'C19')))
+        with self.assertRaises(ValueError):
+            lattice.glyph(lattice.mask('C18', 'C19'), strict=True)
+        unnamed = Graph('AT', classifier=Classifier(lattice=lattice))
+        unnamed.conflate('BS')
+        self.assertEqual(0x180000, int(unnamed.masks[1]))
+        self.assertEqual([str(unnamed)], render_many([unnamed]))
+        self.assertEqual(NO_GLYPH, str(unnamed)[1])
+        g = Graph('x', classifier=Classifier(lattice=Lattice(
+            lattice.classes, glyphs={lattice.mask('C18', 'C19'): 'z'})))
+        masks, literals = g._views()
+        masks[0], literals[0] = lattice.mask('C18', 'C19'), NO_LITERAL
+        del masks, literals
+        self.assertEqual('z', str(g))
+
+    def test_lattice_countingGraph_matchesConflation(self):
+        """
+        Arrange: Create a counting graph with a 16-bit lattice.
+        Act: Count some records, then derive a graph.
+        Assert: The graph matches the one learned by conflation.
+        """
+        classifier = Classifier(lattice=WIDE)
+        records = [r for r in RECORDS if len(r) == len(RECORDS[0])]
+        counting = CountingGraph(len(RECORDS[0]), classifier=classifier)
+        counting.update(records)
+        g = conflate_batch(records, classifier=classifier)
+        self.assertEqual(g.masks.tolist(), counting.graph().masks.tolist())
+
+    def test_lattice_differentLattices_raises(self):
+        """
+        Arrange: Create graphs with different lattices.
+        Act: Conflate one into the other.
+        Assert: A ValueError is raised.
+        """
+        g = Graph('AB', classifier=Classifier(lattice=LATTICE))
+        with self.assertRaises(ValueError):
+            g.conflate(Graph('AB'))
+
+    @parameterized.expand([
+        ([],),
+        ([ClassDef('C{}'.format(i), 'c') for i in range(32)],),
+        ([HEX, HEX],),
+        ([ClassDef('EMPTY', 'e')],),
+        ([ClassDef('LONG', 'xx')],),
+        ([ClassDef('ODD', 'o', predicate='odd')],)
+    ])
+    def test_lattice_badClasses_raises(self, classes):
+        """
+        Arrange: Define some classes incorrectly.
+        Act: Create a lattice.
+        Assert: A ValueError is raised.
+
+        :param classes: the classes
+        """
+        with self.assertRaises(ValueError):
+            Lattice(classes)
+
+
+GLYPH_EMPTY = '∅'  #: the glyph of the empty class
+
+
+if __name__ == '__main__':
+    unittest.main()
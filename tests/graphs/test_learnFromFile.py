@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import Graph, conflate_batch, learn_from_file
+
+RECORDS = [
+    '911 MAIN ST   A1',
+    '912 OAK AVE   B2',
+    '913 ELM ST    C3',
+    '914 PINE RD  !D4',
+    '915 MAIN ST   E5'
+]  #: some records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:func:`learn_from_file` function.
+    """
+    def setUp(self):
+        self.expected = Graph(RECORDS[0])
+        for record in RECORDS[1:]:
+            self.expected.conflate(Graph(record))
+
+    def _write(self, data: bytes) -> str:
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    @parameterized.expand([
+        (b'\r\n', 1), (b'\r\n', 2), (b'\r\n', 100), (b'\n', 3)
+    ])
+    def test_learnFromFile_delimited_matchesConflate(self, delimiter,
+                                                     chunk_size):
+        """
+        Arrange: Write the records to a file, separated by the delimiter
+        (with a trailing delimiter and a blank line thrown in).
+        Act: Learn a graph from the file.
+        Assert: The graph matches conflating the records one at a time.
+
+        :param delimiter: the delimiter
+        :param chunk_size: the number of records conflated in each pass
+        """
+        path = self._write(
+            delimiter.join(r.encode() for r in RECORDS[:2]) +
+            delimiter * 2 +
+            delimiter.join(r.encode() for r in RECORDS[2:]) +
+            delimiter)
+        g = learn_from_file(path, delimiter=delimiter, chunk_size=chunk_size)
+        self.assertEqual(str(self.expected), str(g))
+
+    @parameterized.expand([
+        (b'\r\n', False, 2), (b'\r\n', True, 2), (b'', False, 1),
+        (b'', False, 100), (b'|', True, 100)
+    ])
+    def test_learnFromFile_fixedLength_matchesConflate(self, delimiter,
+                                                       trailing, chunk_size):
+        """
+        Arrange: Write the records to a file, each followed by the delimiter
+        (except, perhaps, the last one).
+        Act: Learn a graph from the file.
+        Assert: The graph matches conflating the records one at a time.
+
+        :param delimiter: the delimiter
+        :param trailing: whether the last record is followed by the delimiter
+        :param chunk_size: the number of records conflated in each pass
+        """
+        data = delimiter.join(r.encode() for r in RECORDS)
+        path = self._write(data + delimiter if trailing else data)
+        g = learn_from_file(
+            path, record_length=len(RECORDS[0]), delimiter=delimiter,
+            chunk_size=chunk_size)
+        self.assertEqual(str(self.expected), str(g))
+
+    @parameterized.expand([
+        (None, b'\r\n', 2), (None, b'\n', 3), (len(RECORDS[0]), b'', 2),
+        (len(RECORDS[0]), b'\r\n', 3)
+    ])
+    def test_learnFromFile_parallel_matchesSerial(self, record_length,
+                                                  delimiter, workers):
+        """
+        Arrange: Write many records to a file.
+        Act: Learn graphs from the file serially and in parallel.
+        Assert: The graphs match.
+
+        :param record_length: the length of each record
+        :param delimiter: the delimiter
+        :param workers: the number of worker processes
+        """
+        path = self._write(
+            delimiter.join(r.encode() for r in RECORDS * 50))
+        serial = learn_from_file(
+            path, record_length=record_length, delimiter=delimiter,
+            chunk_size=7)
+        parallel = learn_from_file(
+            path, record_length=record_length, delimiter=delimiter,
+            chunk_size=7, workers=workers)
+        self.assertEqual(str(self.expected), str(serial))
+        self.assertEqual(serial.masks.tolist(), parallel.masks.tolist())
+        self.assertEqual(serial.literals.tolist(),
+                         parallel.literals.tolist())
+
+    @parameterized.expand([(None,), (2,)])
+    def test_learnFromFile_ragged_matchesConflateBatch(self, workers):
+        """
+        Arrange: Write records of different lengths to a file.
+        Act: Learn a graph from the file.
+        Assert: The graph matches the one conflated from the records.
+
+        :param workers: the number of worker processes
+        """
+        records = [b'abcd'] * 100 + [b'ab1'] * 100 + [b'a']
+        path = self._write(b'\r\n'.join(records))
+        g = learn_from_file(path, chunk_size=30, workers=workers)
+        expected = conflate_batch(records)
+        self.assertEqual(expected.masks.tolist(), g.masks.tolist())
+        self.assertEqual(expected.literals.tolist(), g.literals.tolist())
+
+    @parameterized.expand([
+        (b'', None), (b'\r\n\r\n', None),
+        (b'', 4), (b'abcd\r\nabc', 4), (b'abcd|abcd', 4)
+    ])
+    def test_learnFromFile_badFile_raisesValueError(self, data,
+                                                    record_length):
+        """
+        Arrange: Write a file that doesn't contain usable records.
+        Act: Learn a graph from the file.
+        Assert: A :py:class:`ValueError` is raised.
+
+        :param data: the file's contents
+        :param record_length: the length of each record
+        """
+        path = self._write(data)
+        with self.assertRaises(ValueError):
+            learn_from_file(path, record_length=record_length)
+
+    @parameterized.expand([
+        (0, b'', None), (0, b'\r\n', 2), (-1, b'', 2)
+    ])
+    def test_learnFromFile_badRecordLength_raisesValueError(
+            self, record_length, delimiter, workers):
+        """
+        Arrange: Write a file of records.
+        Act: Learn a graph from the file with a record length that isn't
+            positive.
+        Assert: A :py:class:`ValueError` is raised.
+
+        :param record_length: the length of each record
+        :param delimiter: the delimiter
+        :param workers: the number of worker processes
+        """
+        path = self._write(b'abcd\r\nabcd')
+        with self.assertRaises(ValueError):
+            learn_from_file(
+                path, record_length=record_length, delimiter=delimiter,
+                workers=workers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+from aliqat.framing import StxEtxFramer
+from aliqat.graphs import conflate_batch
+from aliqat.ingest import Ingester, serve
+
+RECORDS = {
+    'psap1': [b'911 MAIN ST', b'912 OAK  AV', b'913 ELM  ST'],
+    'psap2': [b'ATT:A1:0001', b'ATT:B2:0002', b'VZW:C3:0003']
+}  #: the records each (pretend) PSAP link sends
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`Ingester` class.
+    """
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def _run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def _send(self, ingester: Ingester, data: bytes, chunk: int = 5):
+        """
+        Send records to the ingester over a local socket, a few bytes at a
+        time.
+        """
+        port = ingester.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for i in range(0, len(data), chunk):
+            writer.write(data[i:i + chunk])
+            await writer.drain()
+        writer.close()
+
+    def test_ingester_serve_learnsGraphsPerSource(self):
+        """
+        Arrange: Start an ingester on a local socket.
+        Act: Send records to it from several connections.
+        Assert: The ingester learns a graph for each source that matches
+        conflating the source's records.
+        """
+        async def test():
+            ingester = await serve(
+                '127.0.0.1', 0, batch_size=2, queue_size=2, delimiter=b'\n')
+            for records in RECORDS.values():
+                await self._send(ingester, b'\n'.join(records) + b'\n\n')
+            # Give the server a moment to read what's been sent.
+            for _ in range(100):
+                if sum(s.records for s in ingester.sources.values()) == 6:
+                    break
+                await asyncio.sleep(0.01)
+            await ingester.drain()
+            await ingester.close()
+            return ingester
+        ingester = self._run(test())
+        self.assertEqual(2, len(ingester.sources))
+        self.assertEqual(
+            sorted(str(conflate_batch(r)) for r in RECORDS.values()),
+            sorted(str(s.graph) for s in ingester.sources.values()))
+        for source in ingester.sources.values():
+            self.assertEqual(3, source.records)
+            self.assertIsNotNone(source.matcher)
+
+    def test_ingester_conflate_countsMismatches(self):
+        """
+        Arrange: Create an ingester.
+        Act: Conflate batches of records, some of which don't match what came
+        before them.
+        Assert: The ingester's graph and mismatch count are correct.
+        """
+        ingester = Ingester()
+        ingester.conflate([('a', r) for r in RECORDS['psap1']])
+        ingester.conflate([('a', b'914 PINE ST'), ('a', b'9!5 OAK  AV'),
+                           ('a', b'916')])
+        source = ingester.sources['a']
+        self.assertEqual(6, source.records)
+        self.assertEqual(2, source.mismatches)
+        self.assertEqual(
+            str(conflate_batch(
+                RECORDS['psap1'] + [b'9!5 OAK  AV', b'916'])),
+            str(source.graph))
+
+    def test_ingester_dedup_skipsDuplicates(self):
+        """
+        Arrange: Create an ingester that skips duplicates.
+        Act: Conflate batches of records that repeat.
+        Assert: Every record is counted, only the new ones are conflated, and
+        the graph is correct.
+        """
+        ingester = Ingester(dedup=16)
+        ingester.conflate([('a', r) for r in RECORDS['psap1'] * 2])
+        ingester.conflate([('a', r) for r in RECORDS['psap1']])
+        source = ingester.sources['a']
+        self.assertEqual(9, source.records)
+        self.assertEqual(0, source.mismatches)
+        self.assertEqual(6, source.cache.hits)
+        self.assertEqual(
+            str(conflate_batch(RECORDS['psap1'])), str(source.graph))
+
+    def test_ingester_framer_cutsFrames(self):
+        """
+        Arrange: Start an ingester that reads STX/ETX frames.
+        Act: Send it framed records (with noise between them).
+        Assert: The ingester learns the graph from the framed records.
+        """
+        async def test():
+            ingester = await serve(
+                '127.0.0.1', 0, source=lambda transport: 'psap',
+                framer=StxEtxFramer)
+            await self._send(ingester, b'\r\n'.join(
+                b'\x02' + r + b'\x03' for r in RECORDS['psap2']), chunk=4)
+            for _ in range(100):
+                if ingester.sources and ingester.sources['psap'].records == 3:
+                    break
+                await asyncio.sleep(0.01)
+            await ingester.drain()
+            await ingester.close()
+            return ingester
+        source = self._run(test()).sources['psap']
+        self.assertEqual(3, source.records)
+        self.assertEqual(
+            str(conflate_batch(RECORDS['psap2'])), str(source.graph))
+
+    def test_ingester_fullQueue_keepsEveryRecord(self):
+        """
+        Arrange: Start an ingester with a tiny queue.
+        Act: Send it many records at once.
+        Assert: Every record is conflated (once the connection has waited for
+        room on the queue).
+        """
+        records = [b'%03d MAIN ST' % i for i in range(500)]
+
+        async def test():
+            ingester = await serve(
+                '127.0.0.1', 0, batch_size=3, queue_size=1, delimiter=b'\n',
+                source=lambda transport: 'psap')
+            await self._send(ingester, b'\n'.join(records), chunk=4096)
+            for _ in range(200):
+                if (ingester.sources and
+                        ingester.sources['psap'].records == len(records)):
+                    break
+                await asyncio.sleep(0.01)
+            await ingester.close()
+            return ingester
+        source = self._run(test()).sources['psap']
+        self.assertEqual(len(records), source.records)
+        self.assertEqual(str(conflate_batch(records)), str(source.graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from aliqat.graphs import Graph, conflate_batch
+from aliqat.instruments import ACTIVE, instrument, stage
+
+RECORDS = [
+    '(512)555-1234',
+    '(713)555-9876',
+    '(281)555-0000'
+]  #: some records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`instrument` context manager.
+    """
+    def test_instrument_conflate_counted(self):
+        """
+        Arrange: Learn a graph while instrumentation is on.
+        Act: Conflate a longer record and a graph into it.
+        Assert: The records, graphs and extensions are counted.
+        """
+        with instrument() as counters:
+            g = conflate_batch(RECORDS)
+            g.conflate(RECORDS[0] + ' X1')
+            g.conflate(Graph(RECORDS[1]))
+        self.assertEqual(len(RECORDS) + 2, counters.records)
+        self.assertEqual(1, counters.graphs)
+        self.assertEqual(3, counters.extensions)
+        self.assertEqual(1, counters.calls['conflate_batch'])
+        self.assertIn('encode', counters.seconds)
+
+    def test_instrument_match_counted(self):
+        """
+        Arrange: Compile a graph while instrumentation is on.
+        Act: Check some records.
+        Assert: The matches and mismatches are counted.
+        """
+        with instrument() as counters:
+            matcher = conflate_batch(RECORDS).compile()
+            matcher.match(RECORDS[0])
+            matcher.match('x' * len(RECORDS[0]))
+            matcher.match_many(RECORDS)
+        self.assertEqual(2 + len(RECORDS), counters.matches)
+        self.assertEqual(1, counters.mismatches)
+        self.assertEqual(1, counters.calls['compile'])
+
+    def test_instrument_nested_outerCountsAll(self):
+        """
+        Arrange: Nest two instrumented blocks.
+        Act: Encode characters in both of them.
+        Assert: The outer counters count both.
+        """
+        with instrument() as outer:
+            Graph._encode('a')
+            with instrument() as inner:
+                Graph._encode('1')
+                with stage('custom'):
+                    pass
+        self.assertEqual(2, outer.encodes)
+        self.assertEqual(1, inner.encodes)
+        self.assertEqual(1, outer.calls['custom'])
+        self.assertEqual([], ACTIVE)
+
+    def test_instrument_off_nothingCounted(self):
+        """
+        Arrange: Create counters, then leave the instrumented block.
+        Act: Learn a graph.
+        Assert: Nothing more is counted.
+        """
+        with instrument() as counters:
+            pass
+        conflate_batch(RECORDS)
+        self.assertEqual(0, counters.records)
+        self.assertEqual({}, counters.seconds)
+
+    def test_instrument_traceMemory_snapshotsTaken(self):
+        """
+        Arrange: Turn instrumentation on, tracing memory.
+        Act: Learn a graph.
+        Assert: Snapshots are taken and the peak is recorded.
+        """
+        with instrument(trace_memory=True) as counters:
+            conflate_batch(RECORDS)
+        self.assertTrue(counters.snapshots)
+        self.assertGreater(counters.peak, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
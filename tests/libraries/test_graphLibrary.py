@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import random
+import string
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import conflate_batch
+from aliqat.libraries import GraphLibrary, MAX_PROBES
+
+TEMPLATES = {
+    'att': ['ATT 911 A1', 'ATT 912 B2', 'ATT 913 C3'],
+    'vzw': ['VZW-911-A1', 'VZW-922-B2', 'VZW-933-C3'],
+    'tmo': ['TMO:ABC:12', 'TMO:DEF:34'],
+    'long': ['LONG FORMAT 1', 'LONG FORMAT 2']
+}  #: the records from which the templates are learned
+
+
+def _layouts(n: int, width: int = 80):
+    """
+    Make up some layouts (each of which has its own literals, digits,
+    letters and spaces at its own positions).
+
+    :param n: the number of layouts
+    :param width: the length of the records
+    :return: a function that makes up a record with each layout
+    """
+    rng = random.Random(1)
+    layouts = [
+        [(rng.choice('LDAS'), rng.choice(string.ascii_uppercase))
+         for _ in range(width)]
+        for _ in range(n)
+    ]
+    fields = {
+        'D': lambda c: rng.choice(string.digits),
+        'A': lambda c: rng.choice(string.ascii_uppercase),
+        'S': lambda c: ' ',
+        'L': lambda c: c
+    }
+    return lambda i: ''.join(fields[t](c) for t, c in layouts[i])
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`GraphLibrary` class.
+    """
+    def setUp(self):
+        self.library = GraphLibrary()
+        for key, records in TEMPLATES.items():
+            self.library.add(key, conflate_batch(records))
+
+    @parameterized.expand([
+        ('ATT 915 Z9', 'att', 0),
+        ('VZW-944-Z9', 'vzw', 0),
+        ('TMO:XYZ:99', 'tmo', 0),
+        ('LONG FORMAT 7', 'long', 0),
+        ('ATT 9X5 Z9', 'att', 1),
+        ('VZW-9445Z9', 'vzw', 1)
+    ])
+    def test_graphLibrary_find_correct(self, record, key, distance):
+        """
+        Arrange: Create a library of templates.
+        Act: Find the template that best matches a record.
+        Assert: The template and the distance are correct.
+
+        :param record: the record
+        :param key: the expected template's key
+        :param distance: the expected distance
+        """
+        self.assertEqual((key, distance), self.library.find(record))
+        self.assertEqual(
+            (key, distance), self.library.find(record.encode()))
+
+    def test_graphLibrary_candidates_excludeOtherSignatures(self):
+        """
+        Arrange: Create a library of templates.
+        Act: Get the candidates for a record.
+        Assert: Only the template with the record's signature is a candidate.
+        """
+        self.assertEqual(['att'], self.library.candidates('ATT 915 Z9'))
+        self.assertEqual([], self.library.candidates('XYZ 915 Z9'))
+        self.assertEqual([], self.library.candidates('ATT 915'))
+
+    def test_graphLibrary_noFallback_returnsNone(self):
+        """
+        Arrange: Create a library of templates.
+        Act: Find a template for a record whose signature matches none of
+        them, without falling back.
+        Assert: No template is found.
+        """
+        self.assertIsNone(self.library.find('XYZ 915 Z9', fallback=False))
+        self.assertIsNotNone(self.library.find('XYZ 915 Z9'))
+        self.assertIsNone(self.library.find('?'))
+
+    def test_graphLibrary_remove_removesTemplate(self):
+        """
+        Arrange: Create a library of templates.
+        Act: Remove a template.
+        Assert: The template is no longer found.
+        """
+        self.library.remove('att')
+        self.assertNotIn('att', self.library)
+        self.assertEqual(3, len(self.library))
+        self.assertEqual([], self.library.candidates('ATT 915 Z9'))
+        with self.assertRaises(KeyError):
+            self.library.remove('att')
+
+    def test_graphLibrary_replace_replacesTemplate(self):
+        """
+        Arrange: Create a library of templates.
+        Act: Add a template with a key that's already in the library.
+        Assert: The new template replaces the old one.
+        """
+        self.library.add('att', conflate_batch(['XYZ 911 A1']))
+        self.assertEqual(4, len(self.library))
+        self.assertEqual(['att'], self.library.candidates('XYZ 911 A1'))
+        self.assertEqual([], self.library.candidates('ATT 911 A1'))
+
+    def test_graphLibrary_manyTemplates_probesBounded(self):
+        """
+        Arrange: Create libraries of more and more templates, each with its
+        own layout.
+        Act: Get the candidates for records that match the templates.
+        Assert: The number of probes never exceeds the bound, each record's
+        template is always a candidate and there are hardly any others.
+        """
+        for n in [50, 200, 800]:
+            record = _layouts(n)
+            library = GraphLibrary()
+            for i in range(n):
+                library.add(i, conflate_batch([record(i) for _ in range(3)]))
+            candidates = [
+                (i, library.candidates(record(i))) for i in range(0, n, 10)
+            ]
+            self.assertLessEqual(library.probes(80), MAX_PROBES)
+            for i, keys in candidates:
+                self.assertIn(i, keys)
+            self.assertLessEqual(
+                sum(len(keys) for _, keys in candidates),
+                2 * len(candidates))
+            self.assertEqual(0, library.probes(79))
+
+    def test_graphLibrary_removeLoose_removesCandidate(self):
+        """
+        Arrange: Create a library of templates, then add a template that no
+        probe indexes.
+        Act: Remove the template.
+        Assert: It's a candidate before it's removed and not after.
+        """
+        self.library.add('blank', conflate_batch(['ABCDEFGHIJ', '          ']))
+        self.assertIn('blank', self.library.candidates('ZZZZZZZZZZ'))
+        self.library.remove('blank')
+        self.assertNotIn('blank', self.library.candidates('ZZZZZZZZZZ'))
+
+
+if __name__ == '__main__':
+    unittest.main()
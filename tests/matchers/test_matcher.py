@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import Graph, conflate_batch
+from aliqat.matchers import Matcher
+
+RECORDS = [
+    '911 MAIN  ',
+    '912 OAK   ',
+    '913 ELM ST'
+]  #: some records
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`Matcher` class.
+    """
+    @parameterized.expand([
+        ('913 ELM ST', True, -1),
+        ('915 OAK   ', True, -1),
+        ('913 ELM', True, -1),
+        ('815 OAK   ', False, 0),
+        ('9X5 OAK   ', False, 1),
+        ('91X OAK   ', False, 2),
+        ('915 OAK  1', False, 9),
+        ('915 OA1  1', False, 6),
+        ('915 X     ', False, 5),
+        ('915 OAK   Z', False, 10),
+        ('915 €     ', False, 4),
+        ('915 ', False, 4),
+        ('', False, 0)
+    ])
+    def test_matcher_match_correct(self, record, ok, first):
+        """
+        Arrange: Compile a graph learned from some records.
+        Act: Match a record (as a string, as bytes, and in a batch).
+        Assert: The results match the expected flag and position.
+
+        :param record: the record
+        :param ok: whether or not the record should match
+        :param first: the expected first offending position
+        """
+        m = conflate_batch(RECORDS).compile()
+        self.assertEqual((ok, first), m.match(record))
+        oks, firsts = m.match_many([record, record])
+        self.assertEqual([ok, ok], oks.tolist())
+        self.assertEqual([first, first], firsts.tolist())
+        try:
+            b = record.encode('latin-1')
+        except UnicodeEncodeError:
+            return
+        self.assertEqual((ok, first), m.match(b))
+        self.assertEqual((ok, first), m.match(memoryview(b)))
+
+    @parameterized.expand([
+        ('913 ELM ST', 0),
+        ('913 ELM', 0),
+        ('9X5 OAK   ', 1),
+        ('8X5 X     ', 4),
+        ('915 OAK   ZZ', 2),
+        ('915 €     ', 3),
+        ('9', 6)
+    ])
+    def test_matcher_distance_correct(self, record, distance):
+        """
+        Arrange: Compile a graph learned from some records.
+        Act: Measure a record's distance from the graph.
+        Assert: The distance is correct.
+
+        :param record: the record
+        :param distance: the expected distance
+        """
+        m = conflate_batch(RECORDS).compile()
+        self.assertEqual(distance, m.distance(record))
+
+    @parameterized.expand([
+        ('a€b', 'a€b', True, -1),
+        ('a€b', 'a$b', False, 1),
+        ('a€b', 'a€c', False, 2)
+    ])
+    def test_matcher_wideLiteral_correct(self, s, record, ok, first):
+        """
+        Arrange: Compile a graph holding a literal beyond the first 256 code
+        points.
+        Act: Match a record.
+        Assert: The results match the expected flag and position.
+
+        :param s: the graph's string
+        :param record: the record
+        :param ok: whether or not the record should match
+        :param first: the expected first offending position
+        """
+        m = Matcher(Graph(s))
+        self.assertEqual((ok, first), m.match(record))
+        self.assertEqual((False, 1), m.match(record.encode('utf-8')))
+
+    def test_matcher_matchMany_agreesWithConflation(self):
+        """
+        Arrange: Compile a graph learned from some records.
+        Act: Match a batch of records.
+        Assert: The records that match are exactly the ones that don't change
+        the graph when they're conflated into it.
+        """
+        g = conflate_batch(RECORDS)
+        records = [
+            '{}{} {:<6}'.format(a, b, c)
+            for a in '98'
+            for b in ['12', '1X', '01']
+            for c in ['OAK', 'ELM ST', 'O1K', '?']
+        ]
+        oks, _ = g.compile().match_many(records)
+        for record, ok in zip(records, oks.tolist()):
+            _g = Graph.from_arrays(g.masks, g.literals)
+            _g.conflate(Graph(record))
+            self.assertEqual(str(g) == str(_g), ok, record)
+
+    def test_matcher_matchManyRagged_agreesWithMatch(self):
+        """
+        Arrange: Compile a graph learned from some records.
+        Act: Match a batch of records with different lengths.
+        Assert: The results are the same as matching them one at a time.
+        """
+        g = conflate_batch(RECORDS + [RECORDS[0][:6]])
+        matcher = g.compile()
+        records = [r[:n] for r in RECORDS + ['9X1 OAK ST'] for n in (3, 6, 99)]
+        oks, firsts = matcher.match_many(records)
+        for record, ok, first in zip(records, oks.tolist(), firsts.tolist()):
+            self.assertEqual(matcher.match(record), (ok, first), record)
+
+    def test_matcher_matchManyEmpty_returnsEmpty(self):
+        """
+        Arrange: Compile a graph learned from some records.
+        Act: Match an empty batch.
+        Assert: The results are empty.
+        """
+        oks, firsts = conflate_batch(RECORDS).compile().match_many([])
+        self.assertEqual([], oks.tolist())
+        self.assertEqual([], firsts.tolist())
+
+    def test_matcher_zeroWidth_agreesWithMatch(self):
+        """
+        Arrange: Compile a graph with no positions.
+        Act: Match a batch of records.
+        Assert: The results are the same as matching them one at a time.
+        """
+        matcher = Graph('').compile()
+        for records in (['', 'a', ''], ['']):
+            oks, firsts = matcher.match_many(records)
+            self.assertEqual(
+                [matcher.match(r) for r in records],
+                list(zip(oks.tolist(), firsts.tolist())))
+
+
+if __name__ == '__main__':
+    unittest.main()
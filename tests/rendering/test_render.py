@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import Graph, conflate_batch
+from aliqat.rendering import diff, diff_many, render_many
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of bulk rendering and diffing.
+    """
+    @parameterized.expand([
+        ([['(512)555-1234'], ['(713)555-9876', '(512)555-1234'], ['']],),
+        ([['AB 12', 'A  1', 'AB  '], ['x'], ['hello', 'hi']],)
+    ])
+    def test_renderMany_graphs_matchStr(self, batches):
+        """
+        Arrange: Learn some graphs (of different lengths).
+        Act: Render them all at once.
+        Assert: Each string matches the graph's own string.
+        """
+        graphs = [conflate_batch(b) for b in batches]
+        self.assertEqual([str(g) for g in graphs], render_many(graphs))
+
+    def test_renderMany_nothing_empty(self):
+        """
+        Arrange: Nothing.
+        Act: Render no graphs.
+        Assert: There are no strings.
+        """
+        self.assertEqual([], render_many([]))
+
+    def test_diff_graphs_marksChangedColumns(self):
+        """
+        Arrange: Learn two graphs of different lengths.
+        Act: Compare them.
+        Assert: The columns that differ (including the missing one) are
+            marked.
+        """
+        a = Graph('(512)555-1234')
+        b = Graph('(512)555-12345')
+        b.conflate('(713)555-9876')
+        d = diff(a, b)
+        self.assertEqual(str(a) + '·', d.left)
+        self.assertEqual(str(b), d.right)
+        self.assertEqual((1, 3, 9, 10, 11, 12, 13), d.columns)
+        self.assertEqual(' ^ ^     ^^^^^', d.markers)
+        self.assertEqual(
+            '\n'.join((d.left, d.right, d.markers)), str(d))
+        self.assertTrue(d)
+
+    def test_diffMany_identical_noChanges(self):
+        """
+        Arrange: Learn some graphs.
+        Act: Compare each with a copy of itself.
+        Assert: Nothing is marked.
+        """
+        graphs = [Graph('ABC 123'), Graph('x'), Graph('')]
+        diffs = diff_many(
+            (g, Graph(str(g), classifier=g._classifier)) for g in graphs)
+        self.assertEqual([(), (), ()], [d.columns for d in diffs])
+        self.assertEqual(['ABC 123', 'x', ''], [d.left for d in diffs])
+        self.assertFalse(any(diffs))
+
+
+if __name__ == '__main__':
+    unittest.main()
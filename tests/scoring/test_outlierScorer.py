@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.graphs import conflate_batch
+from aliqat.scoring import OutlierScorer
+
+RECORDS = [
+    '(512)555-1234 JOHN',
+    '(713)555-9876 MARY',
+    '(281)555-0000 ALEX'
+]  #: records in the learned layout
+GRAPH = conflate_batch(RECORDS)  #: the learned graph
+SPILL = [
+    '(512)555-1234 JOHN',
+    '(51#)555-1234 JOHN',
+    '~~~~~~~~~~~~~~~~~~',
+    '(512)555-1234',
+    '(512)555-1234 JOHN SMITH',
+    '(5!2)555-!234 JOHN'
+]  #: records from a garbled spill
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`OutlierScorer` class.
+    """
+    @parameterized.expand([
+        (1,),
+        (2,),
+        (100,)
+    ])
+    def test_outlierScorer_score_matchesMatcher(self, chunk_size):
+        """
+        Arrange: Create a scorer.
+        Act: Score some records.
+        Assert: The distances match the matcher's, and the offending
+            positions are correct.
+
+        :param chunk_size: the number of records scored at once
+        """
+        matcher = GRAPH.compile()
+        scores = list(
+            OutlierScorer(GRAPH, chunk_size=chunk_size).score(SPILL))
+        self.assertEqual(list(range(len(SPILL))), [s.index for s in scores])
+        self.assertEqual(
+            [matcher.distance(r) for r in SPILL],
+            [s.distance for s in scores])
+        self.assertEqual((), scores[0].positions)
+        self.assertEqual((3,), scores[1].positions)
+        self.assertEqual((13, 14, 15, 16, 17), scores[3].positions)
+        self.assertEqual((18,), scores[4].positions)
+        self.assertEqual(6, scores[4].distance)
+
+    def test_outlierScorer_worst_keepsTopK(self):
+        """
+        Arrange: Create a scorer that keeps the three worst records.
+        Act: Score the records (in small chunks).
+        Assert: The worst three are kept, worst first.
+        """
+        scorer = OutlierScorer(GRAPH, k=3, chunk_size=2)
+        for _ in scorer.score(SPILL):
+            pass
+        self.assertEqual(len(SPILL), scorer.scored)
+        self.assertEqual(
+            [2, 4, 3], [s.index for s in scorer.worst()])
+        scorer.reset()
+        self.assertEqual([], scorer.worst())
+
+    def test_outlierScorer_matches_notOutliers(self):
+        """
+        Arrange: Create a scorer.
+        Act: Score records that match the graph.
+        Assert: None of them is among the worst.
+        """
+        scorer = OutlierScorer(GRAPH)
+        distances, positions = scorer.score_many(RECORDS)
+        self.assertEqual([0, 0, 0], distances.tolist())
+        self.assertEqual([(), (), ()], positions)
+        self.assertEqual([], scorer.worst())
+
+    def test_outlierScorer_scoreManyEmpty_returnsEmpty(self):
+        """
+        Arrange: Create a scorer.
+        Act: Score an empty batch.
+        Assert: There are no distances, positions or outliers.
+        """
+        scorer = OutlierScorer(GRAPH)
+        distances, positions = scorer.score_many([])
+        self.assertEqual([], distances.tolist())
+        self.assertEqual([], positions)
+        self.assertEqual(0, scorer.scored)
+        self.assertEqual([], scorer.worst())
+
+    def test_outlierScorer_noRoom_raises(self):
+        """
+        Arrange: Nothing.
+        Act: Create a scorer that keeps no records.
+        Assert: A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            OutlierScorer(GRAPH, k=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
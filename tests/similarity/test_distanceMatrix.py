@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+import numpy as np
+from parameterized import parameterized
+from aliqat.graphs import (
+    CharClass, Classifier, ClassDef, Graph, Lattice, NO_LITERAL,
+    conflate_batch
+)
+from aliqat.similarity import (
+    close_pairs, distance_blocks, distance_matrix, similarity_matrix
+)
+
+BATCHES = [
+    ['(512)555-1234'],
+    ['(713)555-9876', '(512)555-1234'],
+    ['(512)555-1234'],
+    ['AB 12', 'A  1', 'AB  '],
+    ['x'],
+    [''],
+    ['hello', 'hi'],
+    ['(512)555-12345']
+]
+
+
+def _distance(a: Graph, b: Graph, weight: float) -> float:
+    """
+    Compute the distance between two graphs the slow way.
+    """
+    longer = max(len(a), len(b))
+    if not longer:
+        return 0.0
+    bits = a._classifier.bits
+    (ma, la), (mb, lb) = a._views(), b._views()
+    total = 0.0
+    for i in range(longer):
+        x = int(ma[i]) if i < len(a) else CharClass.EMPTY
+        y = int(mb[i]) if i < len(b) else CharClass.EMPTY
+        total += bin(x ^ y).count('1') / bits
+        total += weight * (
+            (la[i] if i < len(a) else NO_LITERAL) !=
+            (lb[i] if i < len(b) else NO_LITERAL))
+    return total / (longer * (1 + weight))
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the pairwise distances between graphs.
+    """
+    @parameterized.expand([
+        (1.0, 512),
+        (0.5, 3),
+        (0.0, 1)
+    ])
+    def test_distanceMatrix_graphs_matchPairwise(self, weight, block_size):
+        """
+        Arrange: Learn some graphs (of different lengths).
+        Act: Compute their distances (in blocks of different sizes).
+        Assert: Each distance matches the one computed pair by pair.
+        """
+        graphs = [conflate_batch(b) for b in BATCHES]
+        d = distance_matrix(graphs, weight, block_size)
+        expected = np.array(
+            [[_distance(a, b, weight) for b in graphs] for a in graphs])
+        np.testing.assert_allclose(expected, d, atol=1e-6)
+        self.assertEqual(0, d[0, 2])
+        self.assertTrue(((d >= 0) & (d <= 1)).all())
+
+    def test_distanceMatrix_wideLattice_matchPairwise(self):
+        """
+        Arrange: Learn graphs with a lattice of more than eight classes.
+        Act: Compute their distances.
+        Assert: Each distance matches the one computed pair by pair.
+        """
+        lattice = Lattice(
+            [ClassDef('C{}'.format(i), 'c', chars=chr(ord('a') + i))
+             for i in range(12)])
+        classifier = Classifier(lattice=lattice)
+        graphs = [
+            conflate_batch(b, classifier=classifier)
+            for b in (['abc', 'bcd'], ['abc'], ['lkj', 'xyz'], ['a'])
+        ]
+        d = distance_matrix(graphs, block_size=2)
+        expected = np.array(
+            [[_distance(a, b, 1.0) for b in graphs] for a in graphs])
+        np.testing.assert_allclose(expected, d, atol=1e-6)
+
+    def test_distanceMatrix_out_filled(self):
+        """
+        Arrange: Learn some graphs and make an array for their distances.
+        Act: Compute their distances into the array.
+        Assert: The array holds the distances.
+        """
+        graphs = [conflate_batch(b) for b in BATCHES]
+        out = np.full((len(graphs), len(graphs)), -1, dtype=np.float64)
+        d = distance_matrix(graphs, block_size=3, out=out)
+        self.assertIs(out, d)
+        np.testing.assert_allclose(distance_matrix(graphs), out, atol=1e-6)
+
+    def test_distanceBlocks_graphs_upperTriangle(self):
+        """
+        Arrange: Learn some graphs.
+        Act: Compute their distances in blocks.
+        Assert: Only the blocks on or above the diagonal are computed.
+        """
+        graphs = [conflate_batch(b) for b in BATCHES]
+        corners = [(i, j) for i, j, _ in distance_blocks(graphs, 1.0, 3)]
+        self.assertEqual(
+            [(0, 0), (0, 3), (0, 6), (3, 3), (3, 6), (6, 6)], corners)
+
+    def test_similarityMatrix_graphs_complementDistances(self):
+        """
+        Arrange: Learn some graphs.
+        Act: Compute their similarities.
+        Assert: The similarities are one less the distances.
+        """
+        graphs = [conflate_batch(b) for b in BATCHES]
+        np.testing.assert_allclose(
+            1 - distance_matrix(graphs), similarity_matrix(graphs))
+
+    def test_closePairs_duplicates_found(self):
+        """
+        Arrange: Learn some graphs (two of which are the same).
+        Act: Find the close pairs.
+        Assert: The duplicates (and only they) are found.
+        """
+        graphs = [conflate_batch(b) for b in BATCHES]
+        self.assertEqual([(0, 2, 0.0)], close_pairs(graphs, block_size=2))
+        pairs = close_pairs(graphs, max_distance=0.1, block_size=2)
+        self.assertEqual([(0, 2), (0, 7), (2, 7)], [p[:2] for p in pairs])
+
+    def test_distanceMatrix_differentLattices_raises(self):
+        """
+        Arrange: Learn graphs with different lattices.
+        Act: Compute their distances.
+        Assert: A ValueError is raised.
+        """
+        lattice = Lattice([ClassDef('X', 'x', chars='x')])
+        graphs = [Graph('x'), Graph('x', classifier=Classifier(
+            lattice=lattice))]
+        with self.assertRaises(ValueError):
+            distance_matrix(graphs)
+
+    def test_distanceMatrix_nothing_empty(self):
+        """
+        Arrange: Nothing.
+        Act: Compute the distances between no graphs.
+        Assert: The matrix is empty.
+        """
+        self.assertEqual((0, 0), distance_matrix([]).shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from aliqat.graphs import Classifier, Graph, conflate_batch
+from aliqat.snapshots import Snapshot, merge_snapshots, write_snapshot
+
+GRAPHS = {
+    'phone': conflate_batch(['(512)555-1234', '(713)555-9876']),
+    'address': conflate_batch(['911 MAIN ST', '42 OAK AVE ']),
+    'custom': Graph('a#b', classifier=Classifier(special='#'))
+}  #: some graphs
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:func:`write_snapshot` function and the
+    :py:class:`Snapshot` class.
+    """
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_snapshot_roundTrips(self):
+        """
+        Arrange: Write some graphs to a snapshot.
+        Act: Read them back by key.
+        Assert: The graphs match the originals.
+        """
+        self.assertEqual(len(GRAPHS), write_snapshot(self.path, GRAPHS))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(GRAPHS), len(snapshot))
+            self.assertEqual(list(GRAPHS), snapshot.keys())
+            for key, graph in GRAPHS.items():
+                self.assertIn(key, snapshot)
+                self.assertEqual(str(graph), str(snapshot[key]))
+                self.assertEqual(
+                    graph.literals.tolist(), snapshot[key].literals.tolist())
+            self.assertEqual(
+                frozenset('#'), snapshot['custom']._classifier.special)
+        self.assertTrue(snapshot.closed)
+
+    def test_snapshot_graphByPosition_correct(self):
+        """
+        Arrange: Write some graphs to a snapshot.
+        Act: Read them back by position.
+        Assert: The graphs match the originals.
+        """
+        write_snapshot(self.path, GRAPHS.items())
+        with Snapshot(self.path) as snapshot:
+            for i, graph in enumerate(GRAPHS.values()):
+                self.assertEqual(str(graph), str(snapshot.graph(i)))
+            self.assertEqual(
+                str(GRAPHS['custom']), str(snapshot.graph(-1)))
+            with self.assertRaises(IndexError):
+                snapshot.graph(len(GRAPHS))
+
+    def test_writeSnapshot_duplicateKey_raisesValueError(self):
+        """
+        Arrange: Pick some graphs with a duplicate key.
+        Act: Write them to a snapshot.
+        Assert: A value error is raised.
+        """
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, [('a', GRAPHS['phone'])] * 2)
+        with self.assertRaises(ValueError):
+            write_snapshot(
+                self.path, [(1, GRAPHS['phone']), ('1', GRAPHS['custom'])])
+
+    def test_snapshot_notSnapshot_raisesValueError(self):
+        """
+        Arrange: Write a file that isn't a snapshot.
+        Act: Open it.
+        Assert: A value error is raised.
+        """
+        with open(self.path, 'wb') as f:
+            f.write(b'This is not a snapshot.' * 2)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    def test_mergeSnapshots_partials_matchConflate(self):
+        """
+        Arrange: Write graphs learned from parts of some records to snapshots.
+        Act: Merge the snapshots.
+        Assert: The merged graphs match the ones learned from all of the
+            records.
+        """
+        records = ['(512)555-1234', '(713)555-9876', '(281)555-0000']
+        paths = []
+        for i, record in enumerate(records):
+            fd, path = tempfile.mkstemp()
+            os.close(fd)
+            self.addCleanup(os.remove, path)
+            write_snapshot(path, {'a': Graph(record), str(i): Graph(record)})
+            paths.append(path)
+        self.assertEqual(4, merge_snapshots(paths, self.path))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(['a', '0', '1', '2'], snapshot.keys())
+            self.assertEqual(
+                str(conflate_batch(records)), str(snapshot['a']))
+            self.assertEqual(records[2], str(snapshot['2']))
+
+    def test_mergeSnapshots_differentClassifiers_raisesValueError(self):
+        """
+        Arrange: Write graphs with the same key but different classifiers.
+        Act: Merge them.
+        Assert: A value error is raised.
+        """
+        write_snapshot(self.path, {'a': Graph('a#b')})
+        fd, other = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, other)
+        write_snapshot(other, {'a': GRAPHS['custom']})
+        with self.assertRaises(ValueError):
+            merge_snapshots([self.path, other], self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+from parameterized import parameterized
+from aliqat.counting import CountingGraph
+from aliqat.graphs import conflate_batch
+from aliqat.windows import WindowedGraph
+
+OLD = [
+    '(512)555-1234 JOHN',
+    '(713)555-9876 MARY',
+    '(281)555-0000 ALEX'
+]  #: records in the old layout
+NEW = [
+    '512-555-1234  JOHN',
+    '713-555-9876  MARY'
+]  #: records in the new layout (which is just as long)
+REFERENCE = conflate_batch(OLD)  #: the graph learned from the old layout
+
+
+class TestSuite(unittest.TestCase):
+    """
+    Tests of the :py:class:`WindowedGraph` class.
+    """
+    def test_windowedGraph_newLayout_drifts(self):
+        """
+        Arrange: Create a window over the last three records.
+        Act: Add records in the old layout, then the new one, then the old
+            one again.
+        Assert: A drift is reported when the new layout arrives and when it
+            has left the window.
+        """
+        drifts = []
+        window = WindowedGraph(REFERENCE, size=3, on_drift=drifts.append)
+        self.assertIsNone(window.update(OLD))
+        drift = window.update(NEW[:1])
+        self.assertTrue(drift)
+        self.assertEqual((0, 3, 4, 7, 8, 12), drift.positions)
+        self.assertEqual(3, drift.records)
+        self.assertIsNone(window.update(NEW[1:]))
+        self.assertFalse(window.update(OLD))
+        self.assertEqual([drift, window.drift], drifts)
+
+    @parameterized.expand([
+        (1,),
+        (2,),
+        (5,)
+    ])
+    def test_windowedGraph_retire_matchesCounting(self, size):
+        """
+        Arrange: Create a window over the last few records.
+        Act: Add records in batches.
+        Assert: The derived graph matches one counted from the records that
+            are still in the window.
+
+        :param size: the size of the window
+        """
+        records = (OLD + NEW) * 2
+        window = WindowedGraph(REFERENCE, size=size)
+        for i in range(0, len(records), 2):
+            window.update(records[i:i + 2])
+            kept = records[max(0, i + 2 - size):i + 2]
+            expected = CountingGraph(len(REFERENCE))
+            expected.update(kept)
+            self.assertEqual(len(kept), window.records)
+            self.assertEqual(
+                expected.graph().masks.tolist(),
+                window.graph().masks.tolist())
+            self.assertEqual(
+                expected.graph().literals.tolist(),
+                window.graph().literals.tolist())
+
+    def test_windowedGraph_seconds_expiresOldRecords(self):
+        """
+        Arrange: Create a window over the last ten seconds.
+        Act: Add records in the new layout, then let them age.
+        Assert: The drift clears once they've expired.
+        """
+        window = WindowedGraph(REFERENCE, seconds=10)
+        self.assertTrue(window.update(NEW, now=100.0))
+        self.assertIsNone(window.update(OLD, now=105.0))
+        drift = window.expire(now=110.5)
+        self.assertFalse(drift)
+        self.assertEqual(3, window.records)
+
+    def test_windowedGraph_misfits_drift(self):
+        """
+        Arrange: Create a window.
+        Act: Add a record that's too short.
+        Assert: The window reports the misfit.
+        """
+        window = WindowedGraph(REFERENCE, size=2)
+        drift = window.update(['(512)555-1234'])
+        self.assertEqual(1, drift.misfits)
+        self.assertEqual((), drift.positions)
+        self.assertFalse(window.update(OLD[:2]))
+
+    def test_windowedGraph_rebase_acceptsNewLayout(self):
+        """
+        Arrange: Fill a window with the new layout.
+        Act: Rebase the window on its own graph.
+        Assert: The window no longer drifts.
+        """
+        window = WindowedGraph(REFERENCE, size=10)
+        window.update(NEW)
+        window.rebase()
+        self.assertFalse(window.drift)
+        self.assertIsNone(window.update(NEW))
+        with self.assertRaises(ValueError):
+            window.rebase(conflate_batch(['too short']))
+
+    def test_windowedGraph_noBounds_raises(self):
+        """
+        Arrange: Nothing.
+        Act: Create a window without a size or a number of seconds.
+        Assert: A ValueError is raised.
+        """
+        with self.assertRaises(ValueError):
+            WindowedGraph(REFERENCE)
+
+
+if __name__ == '__main__':
+    unittest.main()